@@ -41,6 +41,9 @@ class BANLayer(nn.Module):
         if self.h_out <= self.c:
             v_ = self.v_net(v)
             q_ = self.q_net(q)
+            if v_.size(0) == 1 and q_.size(0) > 1:
+                # one drug against many proteins: project the drug once, then broadcast
+                v_ = v_.expand(q_.size(0), -1, -1)
             att_maps = torch.einsum('xhyk,bvk,bqk->bhvq', (self.h_mat, v_, q_)) + self.h_bias
         else:
             v_ = self.v_net(v).transpose(1, 2).unsqueeze(3)
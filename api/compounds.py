@@ -1,9 +1,9 @@
+import math
 from flask import Blueprint, jsonify, request
-from services.compound_service import CompoundService
+from services.container import compound_service, target_service
 from config import Config
 
 compounds_bp = Blueprint('compounds', __name__)
-compound_service = CompoundService()
 
 @compounds_bp.route('/compounds', methods=['GET'])
 def get_compounds():
@@ -97,6 +97,77 @@ def search_compounds():
             'message': str(e)
         }), 500
 
+@compounds_bp.route('/compounds/similarity', methods=['GET', 'POST'])
+def similarity_search():
+    """
+    化合物相似性检索（Morgan指纹 Tanimoto 系数）
+    
+    Parameters (JSON body or query string):
+        - smiles: 查询分子SMILES
+        - threshold: 最低相似度（默认0.5，截断到 [0, 1]）
+        - limit: 最多返回数量（默认50）
+    """
+    try:
+        data = request.get_json(silent=True) or request.args
+        smiles = data.get('smiles', '')
+        threshold = float(data.get('threshold', 0.5))
+        if math.isnan(threshold):
+            raise ValueError("threshold 必须是数字")
+        threshold = min(max(threshold, 0.0), 1.0)
+        limit = min(max(1, int(data.get('limit', 50))), Config.MAX_PAGE_SIZE)
+        
+        results = compound_service.similarity_search(smiles, threshold, limit)
+        
+        return jsonify({
+            'status': 'success',
+            'data': results,
+            'total': len(results)
+        })
+        
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@compounds_bp.route('/compounds/substructure', methods=['GET', 'POST'])
+def substructure_search():
+    """
+    化合物子结构检索
+    
+    Parameters (JSON body or query string):
+        - smarts: 子结构SMARTS（也接受SMILES）
+        - limit: 最多返回数量（默认100）
+    """
+    try:
+        data = request.get_json(silent=True) or request.args
+        smarts = data.get('smarts') or data.get('smiles', '')
+        limit = min(max(1, int(data.get('limit', 100))), Config.MAX_PAGE_SIZE)
+        
+        results = compound_service.substructure_search(smarts, limit)
+        
+        return jsonify({
+            'status': 'success',
+            'data': results,
+            'total': len(results)
+        })
+        
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
 @compounds_bp.route('/compounds/statistics', methods=['GET'])
 def get_statistics():
     """获取统计信息"""
@@ -114,10 +185,6 @@ def get_statistics():
             'message': str(e)
         }), 500
 
-from services.target_service import TargetService
-
-target_service = TargetService()
-
 @compounds_bp.route('/compounds/<int:compound_id>/targets', methods=['GET'])
 def get_compound_targets(compound_id):
     """获取化合物的预测靶点"""
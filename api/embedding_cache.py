@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import threading
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional
+import numpy as np
+
+
+def sequence_hash(encoded: np.ndarray) -> str:
+    """
+    计算蛋白质整数编码矩阵的哈希值
+
+    Args:
+        encoded: 形状为 (N, max_length) 的整数编码矩阵
+
+    Returns:
+        str: SHA-256 十六进制摘要
+    """
+    encoded = np.ascontiguousarray(encoded, dtype=np.uint8)
+    digest = hashlib.sha256(str(encoded.shape).encode())
+    digest.update(encoded.tobytes())
+    return digest.hexdigest()
+
+
+class ProteinEmbeddingCache:
+    """
+    蛋白质嵌入缓存
+
+    缓存 ProteinCNN 对一组蛋白质的输出 v_p，键为 (检查点哈希, 序列哈希)。
+    配置了 cache_dir 时以 .npy 文件落盘并通过内存映射读取，
+    否则仅保存在进程内存中。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir: 缓存文件目录，None 表示不落盘
+        """
+        self.cache_dir = cache_dir
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    def _cache_path(self, checkpoint_hash: str, seq_hash: str) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        return Path(self.cache_dir) / f"{checkpoint_hash[:16]}_{seq_hash[:16]}.npy"
+
+    def get(self,
+            checkpoint_hash: str,
+            encoded: np.ndarray,
+            compute_fn: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        获取蛋白质嵌入，未命中时调用 compute_fn 计算并写入缓存
+
+        Args:
+            checkpoint_hash: 模型检查点哈希
+            encoded: 蛋白质整数编码矩阵 (N, max_length)
+            compute_fn: 根据编码矩阵计算嵌入的函数
+
+        Returns:
+            np.ndarray: 形状为 (N, L, C) 的嵌入（落盘时为只读内存映射）
+        """
+        key = (checkpoint_hash, sequence_hash(encoded))
+
+        with self._lock:
+            array = self._arrays.get(key)
+            if array is not None:
+                return array
+
+            path = self._cache_path(*key)
+            if path is not None and path.exists():
+                try:
+                    array = np.load(path, mmap_mode='r')
+                except Exception as e:
+                    print(f"无法读取蛋白质嵌入缓存 {path}: {e}")
+                    array = None
+
+            if array is None:
+                array = np.asarray(compute_fn(encoded), dtype=np.float32)
+                if path is not None:
+                    array = self._save(path, array)
+
+            self._arrays[key] = array
+            return array
+
+    @staticmethod
+    def _save(path: Path, array: np.ndarray) -> np.ndarray:
+        """原子写入 .npy 文件并返回其内存映射"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+            return np.load(path, mmap_mode='r')
+        except Exception as e:
+            print(f"无法写入蛋白质嵌入缓存 {path}: {e}")
+            return array
+
+    def clear(self):
+        """清空进程内缓存（不删除磁盘文件）"""
+        with self._lock:
+            self._arrays.clear()
+
+
+# 进程级共享缓存
+protein_embedding_cache = ProteinEmbeddingCache()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import threading
+from collections import OrderedDict
+from typing import Hashable
+from rdkit import Chem
+
+
+def canonical_smiles(smiles: str) -> str:
+    """
+    将SMILES转换为RDKit规范SMILES
+
+    Args:
+        smiles: SMILES字符串
+
+    Returns:
+        str: 规范SMILES
+
+    Raises:
+        ValueError: SMILES无法解析
+    """
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    if mol is None:
+        raise ValueError(f"无效的SMILES字符串: {smiles}")
+    return Chem.MolToSmiles(mol)
+
+
+def graph_nbytes(graph) -> int:
+    """估算DGL图占用的内存（节点/边特征与边索引）"""
+    nbytes = graph.num_edges() * 2 * 8
+    for frame in (graph.ndata, graph.edata):
+        for name in frame.keys():
+            value = frame[name]
+            nbytes += value.element_size() * value.nelement()
+    return nbytes
+
+
+class DrugGraphCache:
+    """
+    药物分子图LRU缓存
+
+    缓存已填充虚拟节点的特征化药物图，按内存预算淘汰最久未使用的条目。
+    缓存的图为共享只读对象，使用方需通过 dgl.batch 等方式复制后再修改。
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: 缓存的内存预算（字节），0 表示禁用缓存
+        """
+        self.max_bytes = max_bytes
+        self._graphs = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable):
+        """获取缓存的图，未命中返回 None"""
+        with self._lock:
+            entry = self._graphs.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._graphs.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, graph) -> None:
+        """写入缓存，超出内存预算时按LRU淘汰"""
+        nbytes = graph_nbytes(graph)
+        with self._lock:
+            if nbytes > self.max_bytes:
+                return
+            old = self._graphs.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._graphs[key] = (graph, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._graphs:
+                _, (_, evicted_bytes) = self._graphs.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """清空缓存（保留统计计数）"""
+        with self._lock:
+            self._graphs.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """命中/未命中/淘汰次数及内存占用"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._graphs),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'hit_rate': self._hits / lookups if lookups else 0.0
+            }
+
+
+# 进程级共享缓存
+drug_graph_cache = DrugGraphCache()
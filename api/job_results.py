@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+HIGH_CONFIDENCE_SCORE = 0.95
+RESULT_SORT_FIELDS = ('score', 'protein', 'gene', 'compound_id')
+RESULT_SEARCH_FIELDS = ('protein', 'gene', 'compound_id', 'smiles')
+
+# 各字段所在的查找表
+_PROTEIN_FIELDS = ('protein', 'gene', 'sequence', 'protein_id')
+_COMPOUND_FIELDS = ('compound_id', 'smiles')
+
+# 结果目录中的文件
+_COLUMNS = ('compound_idx', 'protein_idx', 'scores')
+_META_FILE = 'meta.json'
+# 蛋白查找表按内容哈希只写一份：{结果目录的上级}/_panels/{hash}.json
+_PANELS_DIR = '_panels'
+
+
+def _normalize(value) -> str:
+    """过滤/排序用的规范化文本（小写，缺失值为空串）"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    return str(value).strip().lower()
+
+
+def _native(value):
+    """numpy 标量转换为 Python 原生类型"""
+    return value.item() if hasattr(value, 'item') else value
+
+
+class ResultBuffer:
+    """
+    预测结果的列式缓冲区
+
+    每条交互只保存 (化合物下标 int32, 蛋白下标 int32, 得分 float32)，
+    按批追加，容量不足时成倍扩容。
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._compound_idx = np.empty(capacity, dtype=np.int32)
+        self._protein_idx = np.empty(capacity, dtype=np.int32)
+        self._scores = np.empty(capacity, dtype=np.float32)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, compound_idx: int, protein_idx: np.ndarray, scores: np.ndarray) -> None:
+        """追加一个化合物对一批蛋白的得分"""
+        count = len(protein_idx)
+        end = self._size + count
+        if end > len(self._scores):
+            capacity = max(end, 2 * len(self._scores))
+            for name in ('_compound_idx', '_protein_idx', '_scores'):
+                column = getattr(self, name)
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self._size] = column[:self._size]
+                setattr(self, name, grown)
+        self._compound_idx[self._size:end] = compound_idx
+        self._protein_idx[self._size:end] = protein_idx
+        self._scores[self._size:end] = scores
+        self._size = end
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(化合物下标, 蛋白下标, 得分)，截去未使用的容量"""
+        size = self._size
+        return self._compound_idx[:size].copy(), self._protein_idx[:size].copy(), self._scores[:size].copy()
+
+
+class JobResults:
+    """
+    预测任务的结果集（列式存储）
+
+    交互记录保存为得分 float32 数组和化合物/蛋白下标 int32 数组，化合物
+    （compound_id / smiles）和蛋白（protein / gene / sequence / protein_id）
+    信息放在共享的查找表中，不再逐行复制。过滤与排序都在下标数组上完成，
+    只有请求的那一页（或流式输出的记录）才会转换为字典。
+    """
+
+    def __init__(self,
+                 job_id: str,
+                 mode: str,
+                 compounds: pd.DataFrame,
+                 proteins: pd.DataFrame,
+                 compound_idx: np.ndarray,
+                 protein_idx: np.ndarray,
+                 scores: np.ndarray,
+                 summary: Optional[Dict] = None):
+        """
+        Args:
+            job_id: 任务ID（用于生成交互记录ID）
+            mode: 'single' 或 'batch'（batch 记录带 compound_id）
+            compounds: 化合物查找表，row（输入文件中的行号）/ compound_id / smiles 列
+            proteins: 蛋白查找表，protein / gene / sequence / protein_id 列（通常为面板共享的表）
+            compound_idx: 每条交互的化合物下标
+            protein_idx: 每条交互的蛋白下标
+            scores: 每条交互的得分
+            summary: 汇总信息（含 from_buffer 补充的派生统计）
+
+        下标与得分数组可以是只读的内存映射（load_job_results），不会被复制。
+        """
+        self.job_id = job_id
+        self.mode = mode
+        self.compounds = compounds
+        self.proteins = proteins
+        self.compound_idx = np.asarray(compound_idx, dtype=np.int32)
+        self.protein_idx = np.asarray(protein_idx, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float32)
+        self._lookup = {field: proteins[field].to_numpy(dtype=object) for field in _PROTEIN_FIELDS}
+        self._lookup.update({field: compounds[field].to_numpy(dtype=object) for field in _COMPOUND_FIELDS})
+        self._compound_rows = compounds['row'].to_numpy(dtype=object)
+        self._normalized = {}
+        self.summary = dict(summary or {})
+
+    @classmethod
+    def from_buffer(cls, job_id: str, mode: str, compounds: List[Dict], proteins: pd.DataFrame,
+                    buffer: ResultBuffer, summary: Optional[Dict] = None,
+                    histogram_bins: int = 20, top_targets: int = 10) -> 'JobResults':
+        """
+        由任务运行时的缓冲区和化合物列表构建结果集，并在汇总信息中补充派生统计
+
+        Args:
+            histogram_bins: 得分直方图分箱数
+            top_targets: 汇总中列出的高频靶点数量
+        """
+        compounds = pd.DataFrame(compounds, columns=['row', 'compound_id', 'smiles'])
+        results = cls(job_id, mode, compounds, proteins, *buffer.columns(), summary=summary)
+        results.summary.update(results._describe(histogram_bins, top_targets))
+        return results
+
+    def __len__(self):
+        return len(self.scores)
+
+    @property
+    def nbytes(self) -> int:
+        """结果列与化合物查找表的内存占用（不含共享的蛋白查找表）"""
+        columns = self.compound_idx.nbytes + self.protein_idx.nbytes + self.scores.nbytes
+        return int(columns + self.compounds.memory_usage(deep=True).sum())
+
+    def _indices(self, field: str) -> np.ndarray:
+        return self.protein_idx if field in _PROTEIN_FIELDS else self.compound_idx
+
+    def _normalized_lookup(self, field: str) -> np.ndarray:
+        """查找表中某个文本字段的规范化值（按需计算并缓存）"""
+        values = self._normalized.get(field)
+        if values is None:
+            values = np.array([_normalize(value) for value in self._lookup[field]], dtype=object)
+            self._normalized[field] = values
+        return values
+
+    def _match(self, field: str, predicate) -> np.ndarray:
+        """在查找表上求值，再按下标展开到每条交互"""
+        values = self._normalized_lookup(field)
+        hits = np.fromiter((predicate(value) for value in values), dtype=bool, count=len(values))
+        return hits[self._indices(field)]
+
+    def _rank(self, field: str) -> np.ndarray:
+        """每条交互在某个文本字段上的排序名次"""
+        _, ranks = np.unique(self._normalized_lookup(field).astype(str), return_inverse=True)
+        return ranks[self._indices(field)]
+
+    def _describe(self, histogram_bins: int, top_targets: int) -> Dict:
+        """派生统计：交互数、高置信度数、靶点数、平均分、得分直方图、高频靶点"""
+        scores = self.scores.astype(np.float64)
+        counts, edges = np.histogram(scores, bins=histogram_bins) if len(scores) else ([], [])
+
+        num_proteins = len(self.proteins)
+        target_counts = np.bincount(self.protein_idx, minlength=num_proteins)
+        max_scores = np.full(num_proteins, -np.inf)
+        np.maximum.at(max_scores, self.protein_idx, scores)
+        present = np.flatnonzero(target_counts)
+        present = present[np.lexsort((-max_scores[present], -target_counts[present]))]
+
+        return {
+            'total_interactions': len(scores),
+            'high_confidence_count': int((scores >= HIGH_CONFIDENCE_SCORE).sum()),
+            'unique_targets': len(present),
+            'average_score': float(scores.mean()) if len(scores) else None,
+            'score_histogram': {
+                'bin_edges': [float(edge) for edge in edges],
+                'counts': [int(count) for count in counts]
+            },
+            'top_targets': [{
+                'protein': _native(self._lookup['protein'][idx]),
+                'gene': _native(self._lookup['gene'][idx]),
+                'count': int(target_counts[idx]),
+                'max_score': float(max_scores[idx])
+            } for idx in present[:top_targets]]
+        }
+
+    def query(self,
+              min_score: Optional[float] = None,
+              max_score: Optional[float] = None,
+              gene: Optional[str] = None,
+              compound_id: Optional[str] = None,
+              search: Optional[str] = None,
+              sort_by: str = 'score',
+              sort_order: str = 'desc') -> np.ndarray:
+        """
+        过滤并排序交互记录
+
+        Args:
+            min_score: 最低得分（含）
+            max_score: 得分上限（不含）
+            gene: 基因名（不区分大小写的精确匹配）
+            compound_id: 化合物ID（精确匹配）
+            search: 关键字，在蛋白、基因、化合物ID、SMILES 中做子串匹配
+            sort_by: 排序字段（RESULT_SORT_FIELDS 之一）
+            sort_order: 'asc' 或 'desc'，同值时保持原始顺序
+
+        Returns:
+            np.ndarray: 匹配记录的行号（已排序）
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if min_score is not None:
+            mask &= self.scores >= min_score
+        if max_score is not None:
+            mask &= self.scores < max_score
+        if gene:
+            target = _normalize(gene)
+            mask &= self._match('gene', lambda value: value == target)
+        if compound_id:
+            target = _normalize(compound_id)
+            mask &= self._match('compound_id', lambda value: value == target)
+        if search and _normalize(search):
+            term = _normalize(search)
+            matched = np.zeros(len(self), dtype=bool)
+            for field in RESULT_SEARCH_FIELDS:
+                matched |= self._match(field, lambda value: term in value)
+            mask &= matched
+
+        rows = np.flatnonzero(mask)
+        if sort_by not in RESULT_SORT_FIELDS or sort_by == 'score':
+            keys = self.scores[rows]
+        else:
+            keys = self._rank(sort_by)[rows]
+        return rows[np.argsort(keys if sort_order == 'asc' else -keys, kind='stable')]
+
+    def _record(self, row: int, include_sequence: bool) -> Dict:
+        """把一条交互展开为字典（与原先逐行保存的字段一致）"""
+        compound = self.compound_idx[row]
+        protein = self.protein_idx[row]
+        lookup = self._lookup
+        if self.mode == 'batch':
+            record = {
+                'id': f"{self.job_id}_{self._compound_rows[compound]}_{protein}",
+                'compound_id': _native(lookup['compound_id'][compound])
+            }
+        else:
+            record = {'id': f"{self.job_id}_{protein}"}
+        record['smiles'] = lookup['smiles'][compound]
+        record['protein'] = _native(lookup['protein'][protein])
+        record['gene'] = _native(lookup['gene'][protein])
+        if include_sequence:
+            record['sequence'] = lookup['sequence'][protein]
+        record['score'] = float(self.scores[row])
+        record['protein_id'] = _native(lookup['protein_id'][protein])
+        return record
+
+    def records(self, rows: Iterable[int], include_sequence: bool = False) -> List[Dict]:
+        """把指定行转换为字典（默认不含蛋白序列）"""
+        return list(self.iter_records(rows, include_sequence))
+
+    def iter_records(self, rows: Iterable[int], include_sequence: bool = False) -> Iterator[Dict]:
+        for row in rows:
+            yield self._record(int(row), include_sequence)
+
+    def iter_ndjson(self, rows: Iterable[int], include_sequence: bool = False) -> Iterator[str]:
+        """逐行输出 NDJSON（每条记录一行）"""
+        for record in self.iter_records(rows, include_sequence):
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+
+    def to_dataframe(self, rows: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """转换为 DataFrame（含全部字段，按列从查找表取值），rows 为 None 时为全部记录"""
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+        compound = self.compound_idx[rows]
+        protein = self.protein_idx[rows]
+        lookup = self._lookup
+
+        columns = {}
+        if self.mode == 'batch':
+            columns['id'] = [f"{self.job_id}_{label}_{idx}"
+                             for label, idx in zip(self._compound_rows[compound], protein.tolist())]
+            columns['compound_id'] = lookup['compound_id'][compound]
+        else:
+            columns['id'] = [f"{self.job_id}_{idx}" for idx in protein.tolist()]
+        columns['smiles'] = lookup['smiles'][compound]
+        for field in ('protein', 'gene', 'sequence'):
+            columns[field] = lookup[field][protein]
+        columns['score'] = self.scores[rows].astype(np.float64)
+        columns['protein_id'] = lookup['protein_id'][protein]
+        return pd.DataFrame(columns)
+
+
+_panel_hashes = {}  # id(蛋白查找表) -> (弱引用, 内容哈希)
+_loaded_panels = OrderedDict()  # (面板目录, 内容哈希) -> 蛋白查找表（读取的结果集共用）
+_panels_lock = threading.Lock()
+
+
+def _panel_payload(proteins: pd.DataFrame) -> str:
+    return json.dumps({column: proteins[column].tolist() for column in _PROTEIN_FIELDS}, ensure_ascii=False)
+
+
+def save_panel(proteins: pd.DataFrame, panels_dir: str) -> str:
+    """
+    按内容哈希保存蛋白查找表（已存在时不重复写入）
+
+    同一个查找表对象的哈希只计算一次（面板共享的查找表对所有任务相同）。
+
+    Returns:
+        str: 内容哈希
+    """
+    with _panels_lock:
+        entry = _panel_hashes.get(id(proteins))
+    payload = None
+    if entry is not None and entry[0]() is proteins:
+        digest = entry[1]
+    else:
+        payload = _panel_payload(proteins)
+        digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        with _panels_lock:
+            for key in [key for key, (ref, _) in _panel_hashes.items() if ref() is None]:
+                del _panel_hashes[key]
+            _panel_hashes[id(proteins)] = (weakref.ref(proteins), digest)
+
+    path = os.path.join(panels_dir, f'{digest}.json')
+    if not os.path.exists(path):
+        os.makedirs(panels_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=panels_dir, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload if payload is not None else _panel_payload(proteins))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return digest
+
+
+def load_panel(panels_dir: str, digest: str, max_loaded: int = 4) -> pd.DataFrame:
+    """读取 save_panel 保存的蛋白查找表，最近读取的几个在内存中共享"""
+    key = (os.path.abspath(panels_dir), digest)
+    with _panels_lock:
+        proteins = _loaded_panels.get(key)
+        if proteins is not None:
+            _loaded_panels.move_to_end(key)
+            return proteins
+    with open(os.path.join(panels_dir, f'{digest}.json'), 'r', encoding='utf-8') as f:
+        proteins = pd.DataFrame(json.load(f), columns=list(_PROTEIN_FIELDS))
+    with _panels_lock:
+        _loaded_panels[key] = proteins
+        while len(_loaded_panels) > max_loaded:
+            _loaded_panels.popitem(last=False)
+    return proteins
+
+
+def save_job_results(results: JobResults, path: str) -> None:
+    """
+    把结果集写入目录：每列一个 .npy 文件，化合物查找表与汇总信息写入 meta.json
+
+    蛋白查找表（含完整序列）按内容哈希在同级的 _panels 目录中只保存一份，
+    meta.json 只记录其哈希。先写入同级临时目录再整体重命名，读取方不会看到写了一半的结果。
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    panel = save_panel(results.proteins, os.path.join(parent, _PANELS_DIR))
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        for name in _COLUMNS:
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), np.ascontiguousarray(getattr(results, name)))
+        meta = {
+            'job_id': results.job_id,
+            'mode': results.mode,
+            'summary': results.summary,
+            'compounds': {column: results.compounds[column].tolist() for column in results.compounds.columns},
+            'panel': panel
+        }
+        with open(os.path.join(tmp_dir, _META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp_dir, path)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_job_results(path: str) -> JobResults:
+    """读取 save_job_results 写入的结果集，结果列以只读内存映射方式打开"""
+    with open(os.path.join(path, _META_FILE), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    columns = [np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in _COLUMNS]
+    if 'panel' in meta:
+        proteins = load_panel(os.path.join(os.path.dirname(os.path.abspath(path)), _PANELS_DIR), meta['panel'])
+    else:
+        # 旧格式：查找表内嵌在 meta.json 中
+        proteins = pd.DataFrame(meta['proteins'], columns=list(_PROTEIN_FIELDS))
+    return JobResults(meta['job_id'], meta['mode'],
+                      pd.DataFrame(meta['compounds'], columns=['row', 'compound_id', 'smiles']),
+                      proteins, *columns, summary=meta['summary'])
+
+
+class JobResultStore:
+    """
+    已完成任务的结果存储
+
+    配置了目录时，每个任务的结果在完成时写入 {directory}/{job_id}/；内存中只按
+    LRU 保留总量不超过 memory_budget 的结果集，超出预算的结果改为通过内存映射
+    读取磁盘文件，几个大批量任务不会耗尽 Web 进程的内存。
+    未配置目录时所有结果都保留在内存中。
+    """
+
+    def __init__(self, directory: Optional[str] = None, memory_budget: int = 256 * 1024 * 1024,
+                 max_mapped: int = 32, require_persisted: bool = False):
+        """
+        Args:
+            directory: 结果目录，None 表示只保存在内存中
+            memory_budget: 内存中结果集的总大小上限（字节）
+            max_mapped: 同时打开的内存映射结果集数量上限
+            require_persisted: 结果必须写入磁盘（推理工作进程中，内存里的结果 Web 进程看不到），
+                               写入失败时 put 抛出异常而不是退回内存
+        """
+        self.directory = directory
+        self.memory_budget = memory_budget
+        self.max_mapped = max_mapped
+        self.require_persisted = require_persisted
+        self._resident = OrderedDict()  # job_id -> (JobResults, nbytes)
+        self._mapped = OrderedDict()  # job_id -> JobResults（内存映射）
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, job_id: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, os.path.basename(job_id))
+
+    def path(self, job_id: str) -> Optional[str]:
+        """任务结果在磁盘上的目录（未写入磁盘时为 None）"""
+        path = self._path(job_id)
+        return path if path and os.path.exists(os.path.join(path, _META_FILE)) else None
+
+    def put(self, job_id: str, results: JobResults) -> None:
+        """
+        保存任务结果：写入磁盘，并在预算内保留在内存中
+
+        Raises:
+            OSError: require_persisted 时结果无法写入磁盘（含未配置目录）
+            TypeError, ValueError: require_persisted 时结果无法序列化
+        """
+        path = self._path(job_id)
+        if path is None and self.require_persisted:
+            raise OSError("未配置任务结果目录，无法持久化任务结果")
+        if path:
+            try:
+                save_job_results(results, path)
+            except (OSError, TypeError, ValueError) as e:
+                # 序列化失败（TypeError / ValueError）与写入失败同样处理，临时目录已被清理
+                if self.require_persisted:
+                    raise
+                print(f"无法写入任务结果 {path}: {e}")
+                path = None
+
+        nbytes = results.nbytes
+        with self._lock:
+            self._discard(job_id)
+            if path and nbytes > self.memory_budget:
+                return
+            self._resident[job_id] = (results, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def get(self, job_id: str, path: Optional[str] = None) -> Optional[JobResults]:
+        """
+        获取任务结果，不在内存中时从磁盘以内存映射方式打开
+
+        Args:
+            job_id: 任务ID
+            path: 结果目录（任务存储中记录的位置），默认为 directory 下的任务目录
+        """
+        with self._lock:
+            entry = self._resident.get(job_id)
+            if entry is not None:
+                self._resident.move_to_end(job_id)
+                return entry[0]
+            results = self._mapped.get(job_id)
+            if results is not None:
+                self._mapped.move_to_end(job_id)
+                return results
+
+        if path is None or not os.path.exists(os.path.join(path, _META_FILE)):
+            path = self.path(job_id)
+        if path is None:
+            return None
+        try:
+            results = load_job_results(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"无法读取任务结果 {path}: {e}")
+            return None
+        with self._lock:
+            self._mapped[job_id] = results
+            while len(self._mapped) > self.max_mapped:
+                self._mapped.popitem(last=False)
+        return results
+
+    def __contains__(self, job_id: str) -> bool:
+        with self._lock:
+            if job_id in self._resident or job_id in self._mapped:
+                return True
+        return self.path(job_id) is not None
+
+    def delete(self, job_id: str) -> None:
+        """删除任务结果（内存与磁盘）"""
+        with self._lock:
+            self._discard(job_id)
+        path = self._path(job_id)
+        if path and os.path.exists(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+    def stats(self) -> Dict:
+        """内存中与内存映射的结果集数量及内存占用"""
+        with self._lock:
+            return {
+                'directory': self.directory,
+                'memory_budget': self.memory_budget,
+                'resident': len(self._resident),
+                'resident_bytes': self._bytes,
+                'mapped': len(self._mapped)
+            }
+
+    def _discard(self, job_id: str) -> None:
+        entry = self._resident.pop(job_id, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+        self._mapped.pop(job_id, None)
+
+    def _evict(self) -> None:
+        """超出预算时淘汰最久未使用的、已写入磁盘的结果集（需持有锁）"""
+        for job_id in list(self._resident):
+            if self._bytes <= self.memory_budget:
+                break
+            if self.path(job_id) is None:
+                continue  # 只在内存中，不能丢弃
+            _, nbytes = self._resident.pop(job_id)
+            self._bytes -= nbytes
+
+
+# 进程级共享的任务结果存储
+job_result_store = JobResultStore()
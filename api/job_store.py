@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import socket
+import sqlite3
+import threading
+import importlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+# 任务记录的字段（data / options / summary 为 JSON 对象）
+JOB_FIELDS = (
+    'job_id', 'mode', 'status', 'priority', 'data', 'options',
+    'progress', 'processed', 'total', 'success_count', 'failed_count',
+    'error', 'summary', 'result_path', 'owner',
+    'created_time', 'start_time', 'end_time', 'updated_time'
+)
+_JSON_FIELDS = ('data', 'options', 'summary')
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+def process_owner() -> str:
+    """当前进程的标识（主机名:进程号），fork 之后也能得到正确的进程号"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_alive(owner: Optional[str]) -> bool:
+    """
+    判断任务所属进程是否仍在运行
+
+    只能检查本机进程；其他主机上的进程一律视为存活。
+    """
+    if not owner:
+        return False
+    host, _, pid = owner.rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _matches(record: Dict, expected: Optional[Dict]) -> bool:
+    """expected 中的值为元组时表示取值之一"""
+    for field, value in (expected or {}).items():
+        allowed = value if isinstance(value, tuple) else (value,)
+        if record.get(field) not in allowed:
+            return False
+    return True
+
+
+class JobStore(ABC):
+    """
+    预测任务存储接口
+
+    保存任务元数据、进度和结果位置，多个 Web 进程和推理进程通过它共享任务状态。
+    记录为字典，字段见 JOB_FIELDS。update 支持 expected 条件（比较并更新），
+    用于取消任务、认领任务等需要原子性的状态转换。
+    自定义实现必须提供 create / get / update / list_jobs / delete，
+    缺少任一方法时在构造时即报错；其余方法有基于它们的默认实现。
+    """
+
+    @abstractmethod
+    def create(self, record: Dict) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, job_id: str, expected: Optional[Dict] = None, **fields) -> bool:
+        """
+        更新任务字段
+
+        Args:
+            job_id: 任务ID
+            expected: 只有当前记录满足这些字段取值时才更新（值为元组表示取值之一，None 匹配空值）
+            fields: 要更新的字段
+
+        Returns:
+            bool: 是否更新了记录
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_jobs(self, statuses: Optional[Iterable[str]] = None) -> List[Dict]:
+        """按提交先后列出任务，statuses 为 None 时列出全部"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, job_ids: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def cancel(self, job_id: str) -> bool:
+        """取消排队中或运行中的任务，返回是否取消成功"""
+        now = datetime.now().isoformat()
+        return self.update(job_id, expected={'status': ACTIVE_STATUSES},
+                           status='cancelled', end_time=now)
+
+    def claim_next(self, owner: str, modes: Optional[Iterable[str]] = None) -> Optional[Dict]:
+        """
+        认领下一个未分配的排队任务（优先级高者优先，同优先级按提交先后）
+
+        只把 owner 设为认领者，任务仍为 queued，由认领者开始运行时转为 running；
+        多个进程同时认领时通过比较并更新保证每个任务只被认领一次。
+
+        Args:
+            owner: 认领者标识（process_owner()）
+            modes: 只认领这些类型的任务，None 表示全部
+
+        Returns:
+            dict: 认领到的任务记录，没有可认领的任务时为 None
+        """
+        modes = set(modes) if modes is not None else None
+        queued = [record for record in self.list_jobs(('queued',))
+                  if record['owner'] is None and (modes is None or record['mode'] in modes)]
+        for record in sorted(queued, key=lambda record: -record['priority']):  # 稳定排序保留提交先后
+            if self.update(record['job_id'], expected={'status': 'queued', 'owner': None}, owner=owner):
+                record['owner'] = owner
+                return record
+        return None
+
+    def with_status(self, job_ids: Iterable[str], statuses: Iterable[str]) -> Set[str]:
+        """job_ids 中当前状态属于 statuses 的任务ID（不存在的任务不返回）"""
+        statuses = set(statuses)
+        matched = set()
+        for job_id in job_ids:
+            record = self.get(job_id)
+            if record is not None and record['status'] in statuses:
+                matched.add(job_id)
+        return matched
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """排队任务在同类任务中的位置（从1开始，按优先级、提交先后），不在排队时为 None"""
+        queued = self.list_jobs(('queued',))
+        target = next((record for record in queued if record['job_id'] == job_id), None)
+        if target is None:
+            return None
+        same_mode = [record for record in queued if record['mode'] == target['mode']]
+        ordered = sorted(same_mode, key=lambda record: -record['priority'])  # 稳定排序保留提交先后
+        return next(i for i, record in enumerate(ordered, 1) if record['job_id'] == job_id)
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的任务数量"""
+        counts = {}
+        for record in self.list_jobs():
+            counts[record['status']] = counts.get(record['status'], 0) + 1
+        return counts
+
+
+class MemoryJobStore(JobStore):
+    """进程内的任务存储（不持久化，不能跨进程共享）"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._jobs = {}  # 插入顺序即提交顺序
+        self._lock = threading.Lock()
+
+    def create(self, record: Dict) -> None:
+        with self._lock:
+            self._jobs[record['job_id']] = {field: record.get(field) for field in JOB_FIELDS}
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            return dict(record) if record is not None else None
+
+    def update(self, job_id: str, expected: Optional[Dict] = None, **fields) -> bool:
+        with self._lock:
+            record = self._jobs.get(job_id)
+            if record is None or not _matches(record, expected):
+                return False
+            record.update(fields, updated_time=datetime.now().isoformat())
+            return True
+
+    def list_jobs(self, statuses: Optional[Iterable[str]] = None) -> List[Dict]:
+        statuses = set(statuses) if statuses is not None else None
+        with self._lock:
+            return [dict(record) for record in self._jobs.values()
+                    if statuses is None or record['status'] in statuses]
+
+    def delete(self, job_ids: Iterable[str]) -> None:
+        with self._lock:
+            for job_id in job_ids:
+                self._jobs.pop(job_id, None)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    基于 SQLite 的任务存储（默认）
+
+    数据库文件由 SQLite 的文件锁保护（WAL 模式），同一主机上的多个 Web 进程
+    和推理进程可以共享；进程重启后任务记录仍然保留。
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite数据库文件路径
+        """
+        if not path:
+            raise ValueError("SQLiteJobStore 需要数据库文件路径")
+        self.path = path
+        self._local = threading.local()
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（每个线程一个连接，fork 后的子进程重新连接）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid != os.getpid():
+            conn = None
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with self._lock:
+                if not self._initialized:
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS jobs ('
+                        ' seq INTEGER PRIMARY KEY AUTOINCREMENT,'
+                        ' job_id TEXT NOT NULL UNIQUE,'
+                        ' mode TEXT NOT NULL,'
+                        ' status TEXT NOT NULL,'
+                        ' priority INTEGER NOT NULL DEFAULT 0,'
+                        ' data TEXT, options TEXT,'
+                        ' progress REAL, processed INTEGER, total INTEGER,'
+                        ' success_count INTEGER, failed_count INTEGER,'
+                        ' error TEXT, summary TEXT, result_path TEXT, owner TEXT,'
+                        ' created_time TEXT, start_time TEXT, end_time TEXT, updated_time TEXT'
+                        ')'
+                    )
+                    conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, mode, priority)')
+                    self._initialized = True
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _encode(field: str, value):
+        if field in _JSON_FIELDS and value is not None:
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict:
+        record = {field: row[field] for field in JOB_FIELDS}
+        for field in _JSON_FIELDS:
+            if record[field] is not None:
+                record[field] = json.loads(record[field])
+        return record
+
+    def create(self, record: Dict) -> None:
+        fields = [field for field in JOB_FIELDS if record.get(field) is not None]
+        self._connect().execute(
+            f"INSERT INTO jobs ({', '.join(fields)}) VALUES ({', '.join('?' for _ in fields)})",
+            [self._encode(field, record[field]) for field in fields]
+        )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        row = self._connect().execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def update(self, job_id: str, expected: Optional[Dict] = None, **fields) -> bool:
+        fields['updated_time'] = datetime.now().isoformat()
+        assignments = ', '.join(f'{field} = ?' for field in fields)
+        params = [self._encode(field, value) for field, value in fields.items()] + [job_id]
+
+        conditions = ['job_id = ?']
+        for field, value in (expected or {}).items():
+            allowed = value if isinstance(value, tuple) else (value,)
+            values = [item for item in allowed if item is not None]
+            clauses = [f"{field} IN ({', '.join('?' for _ in values)})"] if values else []
+            if len(values) < len(allowed):
+                clauses.append(f'{field} IS NULL')
+            conditions.append(f"({' OR '.join(clauses)})")
+            params.extend(values)
+
+        cursor = self._connect().execute(
+            f"UPDATE jobs SET {assignments} WHERE {' AND '.join(conditions)}", params)
+        return cursor.rowcount > 0
+
+    def list_jobs(self, statuses: Optional[Iterable[str]] = None) -> List[Dict]:
+        if statuses is None:
+            rows = self._connect().execute('SELECT * FROM jobs ORDER BY seq').fetchall()
+        else:
+            statuses = list(statuses)
+            rows = self._connect().execute(
+                f"SELECT * FROM jobs WHERE status IN ({', '.join('?' for _ in statuses)}) ORDER BY seq",
+                statuses
+            ).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def with_status(self, job_ids: Iterable[str], statuses: Iterable[str]) -> Set[str]:
+        job_ids, statuses = list(job_ids), list(statuses)
+        matched = set()
+        for start in range(0, len(job_ids), 500):  # 低于 SQLite 的参数个数上限
+            chunk = job_ids[start:start + 500]
+            rows = self._connect().execute(
+                f"SELECT job_id FROM jobs WHERE job_id IN ({', '.join('?' for _ in chunk)})"
+                f" AND status IN ({', '.join('?' for _ in statuses)})",
+                chunk + statuses
+            ).fetchall()
+            matched.update(row[0] for row in rows)
+        return matched
+
+    def delete(self, job_ids: Iterable[str]) -> None:
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            conn.executemany('DELETE FROM jobs WHERE job_id = ?', ((job_id,) for job_id in job_ids))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        row = self._connect().execute(
+            'SELECT COUNT(*) FROM jobs AS other, jobs AS target'
+            " WHERE target.job_id = ? AND target.status = 'queued'"
+            " AND other.status = 'queued' AND other.mode = target.mode"
+            ' AND (other.priority > target.priority'
+            '      OR (other.priority = target.priority AND other.seq <= target.seq))',
+            (job_id,)
+        ).fetchone()
+        return row[0] or None
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connect().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+
+JOB_STORE_BACKENDS = {
+    'memory': MemoryJobStore,
+    'sqlite': SQLiteJobStore
+}
+
+
+def open_job_store(backend: str = 'sqlite', path: Optional[str] = None) -> JobStore:
+    """
+    创建任务存储
+
+    Args:
+        backend: 'sqlite'、'memory'，或 'package.module:ClassName' 形式的自定义实现
+        path: 存储位置（传给实现类的构造函数）
+
+    Raises:
+        ValueError: 未知的存储类型
+        TypeError: 自定义实现不是 JobStore 的子类，或缺少必须实现的方法
+    """
+    factory = JOB_STORE_BACKENDS.get(backend)
+    if factory is None:
+        module_name, _, class_name = backend.partition(':')
+        if not class_name:
+            raise ValueError(f"未知的任务存储类型: {backend}")
+        factory = getattr(importlib.import_module(module_name), class_name)
+        if not (isinstance(factory, type) and issubclass(factory, JobStore)):
+            raise TypeError(f"自定义任务存储必须继承 JobStore: {backend}")
+    return factory(path)
+
+
+_job_store = MemoryJobStore()
+
+
+def configure_job_store(backend: str = 'sqlite', path: Optional[str] = None) -> JobStore:
+    """替换进程级共享的任务存储"""
+    global _job_store
+    _job_store = open_job_store(backend, path)
+    return _job_store
+
+
+def get_job_store() -> JobStore:
+    """进程级共享的任务存储（未配置时为内存存储）"""
+    return _job_store
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import pandas as pd
+from api.utils import integer_label_proteins
+
+DEFAULT_PANEL_PATH = str(Path(__file__).parent.parent / 'data' / 'protein_info_with_gene.csv')
+
+
+class ProteinPanel:
+    """
+    靶点蛋白面板（列式存储）
+
+    protein_info_with_gene.csv 解析一次后按列保存：蛋白名称、基因、
+    原始序列、预先编码好的连续 uint8 整数序列矩阵，以及每个蛋白的内容键。
+    """
+
+    def __init__(self, path: str, mtime: float, df: pd.DataFrame):
+        """
+        Args:
+            path: 面板文件路径
+            mtime: 解析时文件的修改时间
+            df: 解析得到的面板数据，至少包含 protein / gene / sequence 列
+        """
+        for col in ('protein', 'gene', 'sequence'):
+            if col not in df.columns:
+                raise ValueError(f"蛋白质面板缺少必要的列: {col}")
+
+        self.path = path
+        self.mtime = mtime
+        self.names = df['protein'].to_numpy(dtype=object)
+        self.genes = df['gene'].to_numpy(dtype=object)
+        self.sequences = df['sequence'].fillna('').astype(str).to_numpy(dtype=object)
+        self.ids = df['id'].to_numpy() if 'id' in df.columns else None
+        self.encoded = integer_label_proteins(self.sequences)
+        # 蛋白键：编码后序列的内容哈希，与面板顺序无关，用于持久化得分缓存
+        self.keys = [hashlib.sha1(row.tobytes()).hexdigest() for row in self.encoded]
+        self._lookup = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def protein_id(self, idx: int):
+        """面板中第 idx 个蛋白的ID（无 id 列时为行号）"""
+        if self.ids is None:
+            return idx
+        value = self.ids[idx]
+        return value.item() if hasattr(value, 'item') else value
+
+    def lookup_table(self) -> pd.DataFrame:
+        """
+        预测结果使用的共享蛋白查找表（行号与面板一致）
+
+        Returns:
+            pd.DataFrame: protein / gene / sequence / protein_id 列（同一面板的所有任务共用）
+        """
+        if self._lookup is None:
+            self._lookup = pd.DataFrame({
+                'protein': self.names,
+                'gene': self.genes,
+                'sequence': self.sequences,
+                'protein_id': np.array([self.protein_id(i) for i in range(len(self))], dtype=object)
+            })
+        return self._lookup
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """转换为 DataFrame（protein / gene / sequence 列）"""
+        return pd.DataFrame({
+            'protein': self.names,
+            'gene': self.genes,
+            'sequence': self.sequences
+        })
+
+
+_panels = {}
+_panels_lock = threading.Lock()
+
+
+def load_protein_panel(path: Optional[str] = None) -> ProteinPanel:
+    """
+    加载靶点蛋白面板，同一文件只解析一次，文件修改时间变化时自动重新加载
+
+    Args:
+        path: 面板CSV路径，默认为 data/protein_info_with_gene.csv
+
+    Returns:
+        ProteinPanel: 共享的面板实例（只读）
+    """
+    path = os.path.realpath(path or DEFAULT_PANEL_PATH)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Protein data file not found: {path}")
+
+    mtime = os.path.getmtime(path)
+    with _panels_lock:
+        panel = _panels.get(path)
+        if panel is None or panel.mtime != mtime:
+            panel = ProteinPanel(path, mtime, pd.read_csv(path))
+            _panels[path] = panel
+        return panel
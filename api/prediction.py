@@ -2,22 +2,35 @@
 # -*- coding: utf-8 -*-
 import os
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
-import os
 import uuid
+import heapq
+import itertools
 import tempfile
 import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, current_app, request, jsonify, send_file
 from werkzeug.utils import secure_filename
+import numpy as np
 import pandas as pd
 from rdkit import Chem
 from rdkit.Chem import Descriptors, Lipinski
+from api.job_results import HIGH_CONFIDENCE_SCORE, JobResults, ResultBuffer, RESULT_SORT_FIELDS, job_result_store
+from api.job_store import (ACTIVE_STATUSES, FINISHED_STATUSES, configure_job_store, get_job_store,
+                           owner_alive, process_owner)
 DEFAULT_MODEL_PATH = str(Path(__file__).parent / 'result' / 'best_model.pth')
+DEFAULT_BATCH_SIZE = 64  # protein/compound pairs per forward pass
+DEFAULT_RESULTS_PAGE_SIZE = 50
+PROGRESS_REPORT_INTERVAL = 0.5  # seconds between progress writes to the job store
+MAX_RESULTS_PAGE_SIZE = 1000
 # Import your prediction modules
 try:
-    from api.predictor import DrugPredictor
+    from api.predictor import get_predictor, predictor_registry
+    from api.embedding_cache import protein_embedding_cache
+    from api.panel import load_protein_panel
+    from api.graph_cache import canonical_smiles, drug_graph_cache
+    from api.score_cache import score_cache
     PREDICTOR_AVAILABLE = True
 except ImportError:
     PREDICTOR_AVAILABLE = False
@@ -28,124 +41,214 @@ except ImportError:
 
 prediction_bp = Blueprint('prediction', __name__, url_prefix='/api/predict')
 
-# Global variables for job management
-active_jobs = {}
-completed_jobs = {}
-job_results = {}
+
+def configure_prediction(settings):
+    """Apply prediction settings (a Flask config or any mapping) to the scheduler, stores, registry and caches"""
+    job_scheduler.max_workers = settings.get('PREDICTION_MAX_CONCURRENT_JOBS', 2)
+    job_result_store.directory = settings.get('PREDICTION_RESULTS_DIR')
+    job_result_store.memory_budget = settings.get('PREDICTION_RESULTS_MEMORY_BYTES', job_result_store.memory_budget)
+    configure_job_store(settings.get('PREDICTION_JOB_STORE', 'memory'), settings.get('PREDICTION_JOB_STORE_PATH'))
+    
+    if not PREDICTOR_AVAILABLE:
+        return
+    
+    predictor_registry.max_resident = settings.get('PREDICTOR_MAX_RESIDENT', 2)
+    protein_embedding_cache.cache_dir = settings.get('PROTEIN_EMBEDDING_CACHE_DIR')
+    drug_graph_cache.max_bytes = settings.get('DRUG_GRAPH_CACHE_BYTES', drug_graph_cache.max_bytes)
+    score_cache.db_path = settings.get('SCORE_CACHE_PATH')
+
+
+def warm_up_predictor(settings):
+    """Load the default checkpoint and precompute its panel embeddings"""
+    if not PREDICTOR_AVAILABLE:
+        return False
+    
+    model_path = settings.get('PREDICTOR_MODEL_PATH') or DEFAULT_MODEL_PATH
+    if not os.path.exists(model_path):
+        print(f"Warning: model checkpoint not found, skipping warm-up: {model_path}")
+        return False
+    
+    try:
+        predictor = predictor_registry.warm_up(model_path, settings.get('PREDICTOR_DEVICE'))
+        # Precompute the panel embeddings for the warm checkpoint
+        predictor.protein_embeddings(load_protein_panel().encoded)
+        return True
+    except Exception as e:
+        print(f"Warning: failed to warm up predictor: {e}")
+        return False
+
+
+def init_prediction(app):
+    """Configure prediction for the web app
+    
+    With the default 'thread' executor jobs run on this process's scheduler:
+    orphaned jobs are requeued here and the default checkpoint is optionally
+    warmed up. With the 'worker' executor the web process only records jobs;
+    `python -m api.worker` processes run them. Either way the web process runs
+    the periodic cleanup of old jobs; inference workers do not.
+    """
+    configure_prediction(app.config)
+    periodic_cleanup()
+    
+    if app.config.get('PREDICTION_EXECUTOR', 'thread') != 'thread':
+        return False
+    
+    recover_orphaned_jobs()
+    
+    if not app.config.get('PREDICTOR_WARMUP', False):
+        return False
+    return warm_up_predictor(app.config)
+
+def recover_orphaned_jobs():
+    """Requeue in this process the queued/running jobs whose owning process has exited"""
+    job_store = get_job_store()
+    recovered = 0
+    for record in job_store.list_jobs(ACTIVE_STATUSES):
+        if owner_alive(record['owner']):
+            continue
+        # Compare-and-set on the old owner so only one restarting process claims each job
+        claimed = job_store.update(
+            record['job_id'], expected={'status': record['status'], 'owner': record['owner']},
+            status='queued', owner=process_owner(), progress=0, processed=0,
+            success_count=0, failed_count=0, start_time=None
+        )
+        if claimed:
+            job = PredictionJob.from_record(record)
+            job_scheduler.submit(job, priority=job.priority)
+            recovered += 1
+    if recovered:
+        print(f"Requeued {recovered} prediction jobs left over from a previous process")
+    return recovered
 
 class PredictionJob:
-    """Class to manage prediction jobs"""
+    """Class to manage prediction jobs
+    
+    Job state is mirrored to the shared job store (api.job_store) so any web
+    process can answer /status, /results and /cancel for it.
+    """
     
-    def __init__(self, job_id, mode, data, options=None):
+    def __init__(self, job_id, mode, data, options=None, priority=0):
         self.job_id = job_id
         self.mode = mode  # 'single' or 'batch'
         self.data = data
         self.options = options or {}
+        self.priority = priority
         self.status = 'queued'  # queued, running, completed, failed, cancelled
         self.progress = 0
         self.processed = 0
         self.total = 0
         self.success_count = 0
         self.failed_count = 0
+        self.created_time = datetime.now()
         self.start_time = None
         self.end_time = None
         self.error_message = None
-        self.results = None
-        self.thread = None
+        self.summary = None
+        self._last_report = 0.0
 
-    def start(self):
-        """Start the prediction job in a separate thread"""
+    @classmethod
+    def from_record(cls, record):
+        """Rebuild a job from its job store record"""
+        job = cls(record['job_id'], record['mode'], record['data'], record['options'], record['priority'] or 0)
+        job.created_time = datetime.fromisoformat(record['created_time'])
+        return job
+
+    def to_record(self, owner=None):
+        """Job store record for a newly submitted job (owner None leaves it for the inference workers)"""
+        return {
+            'job_id': self.job_id,
+            'mode': self.mode,
+            'status': self.status,
+            'priority': self.priority,
+            'data': self.data,
+            'options': self.options,
+            'progress': self.progress,
+            'processed': self.processed,
+            'total': self.total,
+            'success_count': self.success_count,
+            'failed_count': self.failed_count,
+            'owner': owner,
+            'created_time': self.created_time.isoformat()
+        }
+
+    def _counters(self):
+        return {
+            'progress': self.progress,
+            'processed': self.processed,
+            'total': self.total,
+            'success_count': self.success_count,
+            'failed_count': self.failed_count
+        }
+
+    def run(self):
+        """Run the prediction job in the calling (scheduler worker) thread"""
+        if self.status == 'cancelled':
+            return
+        
         if not PREDICTOR_AVAILABLE:
-            self.status = 'failed'
-            self.error_message = 'Prediction service not available'
+            self._fail('Prediction service not available')
             return
             
         self.status = 'running'
         self.start_time = datetime.now()
+        started = get_job_store().update(self.job_id, expected={'status': 'queued'}, status='running',
+                                         start_time=self.start_time.isoformat(), owner=process_owner())
+        if not started:
+            # Cancelled (possibly from another process) while waiting in the queue
+            self.status = 'cancelled'
+            return
         
         if self.mode == 'single':
-            self.thread = threading.Thread(target=self._run_single_prediction)
+            self._run_single_prediction()
         else:
-            self.thread = threading.Thread(target=self._run_batch_prediction)
-            
-        self.thread.start()
+            self._run_batch_prediction()
 
     def _run_single_prediction(self):
         """Run single compound prediction"""
         try:
             # Initialize predictor
             model_path = self.options.get('model_path', DEFAULT_MODEL_PATH)
-            device = self.options.get('device', 'cuda')
+            device = self.options.get('device')
             
-            predictor = DrugPredictor(model_path=model_path, device=device)
+            predictor = get_predictor(model_path, device)
             
             smiles = self.data['smiles']
             
             # Load protein data
-            protein_data = self._load_protein_data()
-            self.total = len(protein_data)
+            panel = self._load_protein_data()
+            self.total = len(panel)
+            panel_embeddings = predictor.protein_embeddings(panel.encoded)
             
-            results = []
+            results = ResultBuffer(len(panel))
             
-            for idx, (_, protein_row) in enumerate(protein_data.iterrows()):
+            for start, end, scores in self._iter_panel_scores(predictor, smiles, panel, panel_embeddings):
                 if self.status == 'cancelled':
                     return
-                    
-                try:
-                    score = predictor.predict_single(smiles, protein_row['sequence'])
-                    
-                    # Filter by confidence if requested
-                    if self.options.get('high_confidence_only', False) and score < 0.95:
-                        continue
-                        
-                    results.append({
-                        'id': f"{self.job_id}_{idx}",
-                        'smiles': smiles,
-                        'protein': protein_row['protein'],
-                        'gene': protein_row['gene'],
-                        'sequence': protein_row['sequence'],
-                        'score': float(score),
-                        'protein_id': protein_row.get('id', idx)
-                    })
-                    
-                    self.success_count += 1
-                    
-                except Exception as e:
-                    self.failed_count += 1
-                    print(f"Prediction failed for protein {idx}: {e}")
                 
-                self.processed += 1
-                self.progress = (self.processed / self.total) * 100
+                self._record_scores(results, 0, start, end, scores)
                 
-                # Small delay to prevent overwhelming
-                time.sleep(0.01)
-            
-            self.results = {
-                'interactions': results,
-                'summary': {
-                    'total_targets': self.total,
-                    'successful_predictions': self.success_count,
-                    'failed_predictions': self.failed_count,
-                    'high_confidence_count': len([r for r in results if r['score'] >= 0.95])
-                }
-            }
+                self.processed = end
+                self.progress = (self.processed / self.total) * 100
+                self._report_progress()
             
-            self.status = 'completed'
-            self.end_time = datetime.now()
+            compounds = [{'row': 0, 'compound_id': None, 'smiles': smiles}]
+            self._complete(JobResults.from_buffer(self.job_id, self.mode, compounds, panel.lookup_table(), results, {
+                'total_targets': self.total,
+                'successful_predictions': self.success_count,
+                'failed_predictions': self.failed_count
+            }))
             
         except Exception as e:
-            self.status = 'failed'
-            self.error_message = str(e)
-            self.end_time = datetime.now()
+            self._fail(str(e))
 
     def _run_batch_prediction(self):
         """Run batch prediction"""
         try:
             # Initialize predictor
             model_path = self.options.get('model_path', DEFAULT_MODEL_PATH)
-            device = self.options.get('device', 'cuda')
+            device = self.options.get('device')
             
-            predictor = DrugPredictor(model_path=model_path, device=device)
+            predictor = get_predictor(model_path, device)
             
             # Parse uploaded file
             compounds_df = pd.read_csv(self.data['file_path'])
@@ -153,11 +256,13 @@ class PredictionJob:
             id_column = self.data.get('id_column')
             
             # Load protein data
-            protein_data = self._load_protein_data()
+            panel = self._load_protein_data()
+            panel_embeddings = predictor.protein_embeddings(panel.encoded)
             
-            self.total = len(compounds_df) * len(protein_data)
+            self.total = len(compounds_df) * len(panel)
             
-            all_results = []
+            all_results = ResultBuffer(len(panel))
+            compounds = []
             compound_count = 0
             
             for comp_idx, compound_row in compounds_df.iterrows():
@@ -169,83 +274,171 @@ class PredictionJob:
                 
                 # Validate SMILES
                 if not self._validate_smiles(smiles):
-                    self.failed_count += len(protein_data)
-                    self.processed += len(protein_data)
+                    self.failed_count += len(panel)
+                    self.processed += len(panel)
                     continue
                 
-                compound_results = []
+                compound_offset = self.processed
+                compound_idx = len(compounds)
+                compounds.append({
+                    'row': comp_idx,
+                    'compound_id': compound_id.item() if hasattr(compound_id, 'item') else compound_id,
+                    'smiles': smiles
+                })
                 
-                for prot_idx, protein_row in protein_data.iterrows():
+                for start, end, scores in self._iter_panel_scores(predictor, smiles, panel, panel_embeddings,
+                                                                  label=compound_id):
                     if self.status == 'cancelled':
                         return
-                        
-                    try:
-                        score = predictor.predict_single(smiles, protein_row['sequence'])
-                        
-                        # Filter by confidence if requested
-                        if self.options.get('high_confidence_only', False) and score < 0.95:
-                            self.processed += 1
-                            continue
-                            
-                        compound_results.append({
-                            'id': f"{self.job_id}_{comp_idx}_{prot_idx}",
-                            'compound_id': compound_id,
-                            'smiles': smiles,
-                            'protein': protein_row['protein'],
-                            'gene': protein_row['gene'],
-                            'sequence': protein_row['sequence'],
-                            'score': float(score),
-                            'protein_id': protein_row.get('id', prot_idx)
-                        })
-                        
-                        self.success_count += 1
-                        
-                    except Exception as e:
-                        self.failed_count += 1
-                        print(f"Prediction failed for {compound_id} - {protein_row['protein']}: {e}")
                     
-                    self.processed += 1
-                    self.progress = (self.processed / self.total) * 100
+                    self._record_scores(all_results, compound_idx, start, end, scores)
                     
-                    # Small delay
-                    time.sleep(0.001)
+                    self.processed = compound_offset + end
+                    self.progress = (self.processed / self.total) * 100
+                    self._report_progress()
                 
-                all_results.extend(compound_results)
                 compound_count += 1
             
-            self.results = {
-                'interactions': all_results,
-                'summary': {
-                    'total_compounds': len(compounds_df),
-                    'processed_compounds': compound_count,
-                    'total_targets': len(protein_data),
-                    'total_interactions': len(all_results),
-                    'successful_predictions': self.success_count,
-                    'failed_predictions': self.failed_count,
-                    'high_confidence_count': len([r for r in all_results if r['score'] >= 0.95])
-                }
-            }
+            self._complete(JobResults.from_buffer(self.job_id, self.mode, compounds, panel.lookup_table(), all_results, {
+                'total_compounds': len(compounds_df),
+                'processed_compounds': compound_count,
+                'total_targets': len(panel),
+                'successful_predictions': self.success_count,
+                'failed_predictions': self.failed_count
+            }))
             
+        except Exception as e:
+            self._fail(str(e))
+
+    def _report_progress(self, force=False):
+        """Write progress counters to the job store (throttled) and pick up cancellation requests"""
+        now = time.monotonic()
+        if not force and now - self._last_report < PROGRESS_REPORT_INTERVAL:
+            return
+        self._last_report = now
+        if not get_job_store().update(self.job_id, expected={'status': 'running'}, **self._counters()):
+            self.status = 'cancelled'
+
+    def _complete(self, results):
+        """Hand the finished results to the result store, then mark the job completed
+        
+        If the store requires persisted results (inference workers) and the write
+        fails, put raises and the caller fails the job instead.
+        """
+        job_result_store.put(self.job_id, results)
+        self.summary = results.summary
+        self.end_time = datetime.now()
+        completed = get_job_store().update(
+            self.job_id, expected={'status': 'running'}, status='completed',
+            summary=self.summary, result_path=job_result_store.path(self.job_id),
+            end_time=self.end_time.isoformat(), **self._counters()
+        )
+        if completed:
             self.status = 'completed'
-            self.end_time = datetime.now()
-            
+        else:
+            self.status = 'cancelled'
+            job_result_store.delete(self.job_id)
+
+    def _fail(self, message):
+        """Mark the job failed, unless it was cancelled in the meantime"""
+        self.status = 'failed'
+        self.error_message = message
+        self.end_time = datetime.now()
+        get_job_store().update(self.job_id, expected={'status': ACTIVE_STATUSES}, status='failed',
+                               error=message, end_time=self.end_time.isoformat(), **self._counters())
+
+    def _record_scores(self, buffer, compound_idx, start, end, scores):
+        """Count one batch of panel scores and append the successful pairs
+        
+        scores is None when the whole batch failed; otherwise NaN marks the
+        individual pairs that failed.
+        """
+        if scores is None:
+            self.failed_count += end - start
+            return
+        
+        failed = int(np.isnan(scores).sum())
+        self.failed_count += failed
+        self.success_count += (end - start) - failed
+        self._append_scores(buffer, compound_idx, start, scores)
+
+    def _append_scores(self, buffer, compound_idx, start, scores):
+        """Append one batch of panel scores, skipping failed pairs and honouring the high-confidence filter"""
+        protein_idx = np.arange(start, start + len(scores))
+        keep = ~np.isnan(scores)
+        if self.options.get('high_confidence_only', False):
+            keep &= scores >= HIGH_CONFIDENCE_SCORE
+        buffer.append(compound_idx, protein_idx[keep], scores[keep])
+
+    @property
+    def _batch_size(self):
+        return self.options.get('batch_size', DEFAULT_BATCH_SIZE)
+
+    def _iter_panel_scores(self, predictor, smiles, panel, panel_embeddings, label=None):
+        """Score one compound against the precomputed panel embeddings in batches.
+
+        Scores already in the persistent score cache are reused; only the
+        missing (compound, protein) pairs are computed and then stored.
+        A batch that raises is retried pair by pair, so one bad pair fails
+        alone. Yields (start, end, scores) per batch in panel order; scores
+        is None when the compound itself failed and NaN for failed pairs.
+        """
+        batch_size = self._batch_size
+        label = smiles if label is None else label
+        
+        try:
+            canonical = canonical_smiles(smiles)
         except Exception as e:
-            self.status = 'failed'
-            self.error_message = str(e)
-            self.end_time = datetime.now()
+            print(f"Failed to parse compound {label}: {e}")
+            canonical = None
+        
+        cached = score_cache.get_compound(predictor.checkpoint_hash, canonical) if canonical else {}
+        drug_embedding = None
+        encode_failed = False
+        
+        for start in range(0, len(panel), batch_size):
+            end = min(start + batch_size, len(panel))
+            if canonical is None:
+                yield start, end, None
+                continue
+            
+            keys = panel.keys[start:end]
+            scores = np.array([cached.get(key, np.nan) for key in keys], dtype=np.float32)
+            missing = np.flatnonzero(np.isnan(scores))
+            score_cache.record(hits=len(keys) - len(missing), misses=len(missing))
+            
+            if len(missing) and drug_embedding is None and not encode_failed:
+                try:
+                    # Encode the compound once and reuse it for every batch of targets
+                    drug_embedding = predictor.encode_drug(canonical)
+                except Exception as e:
+                    print(f"Failed to encode compound {label}: {e}")
+                    encode_failed = True
+            
+            # Without a drug embedding only cached pairs are scored; the rest stay NaN (failed)
+            if len(missing) and not encode_failed:
+                try:
+                    scores[missing] = predictor.score_encoded_drug(
+                        drug_embedding, panel_embeddings[start + missing], batch_size=batch_size)
+                except Exception as e:
+                    print(f"Batch prediction failed for {label} - proteins {start}-{end - 1}, "
+                          f"retrying pair by pair: {e}")
+                    for i in missing:
+                        try:
+                            scores[i] = predictor.score_encoded_drug(
+                                drug_embedding, panel_embeddings[start + i:start + i + 1], batch_size=1)[0]
+                        except Exception as e:
+                            print(f"Prediction failed for {label} - protein {start + i}: {e}")
+                
+                scored = [i for i in missing if not np.isnan(scores[i])]
+                score_cache.put_many(predictor.checkpoint_hash, canonical,
+                                     ((keys[i], scores[i]) for i in scored))
+            yield start, end, scores
 
     def _load_protein_data(self):
-        """Load protein target data"""
+        """Load the shared protein target panel (parsed once, reloaded on file change)"""
         try:
-            # 使用绝对路径
-            protein_file = Path(__file__).parent.parent / 'data' / 'protein_info_with_gene.csv'
-            if not protein_file.exists():
-                raise FileNotFoundError(f"Protein data file not found: {protein_file}")
-            
-            df = pd.read_csv(protein_file)
-            print(f"Loaded protein data: {df.shape}")
-            print(f"Columns: {df.columns.tolist()}")
-            return df
+            return load_protein_panel()
             
         except Exception as e:
             raise Exception(f"Failed to load protein data: {e}")
@@ -258,32 +451,180 @@ class PredictionJob:
         except:
             return False
 
-    def cancel(self):
-        """Cancel the prediction job"""
-        self.status = 'cancelled'
-        self.end_time = datetime.now()
 
-    def get_status(self):
-        """Get current job status"""
-        eta = None
-        if self.status == 'running' and self.processed > 0:
-            elapsed = (datetime.now() - self.start_time).total_seconds()
-            rate = self.processed / elapsed
-            remaining = self.total - self.processed
-            eta_seconds = remaining / rate if rate > 0 else 0
-            eta = f"{int(eta_seconds // 60)}:{int(eta_seconds % 60):02d}"
+class JobScheduler:
+    """Bounded worker pool running prediction jobs from per-mode priority queues.
+
+    Jobs wait in the 'queued' state until a worker picks them up. Within a mode
+    jobs run by priority (higher first), then FIFO. Between modes, the higher
+    priority head wins and ties alternate between single and batch jobs; batch
+    jobs may occupy at most max_workers - 1 workers so single-compound jobs
+    always have a free slot when more than one worker is configured.
+    """
+    
+    MODES = ('single', 'batch')
+    
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._queues = {mode: [] for mode in self.MODES}
+        self._running = {mode: 0 for mode in self.MODES}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._workers = []
+        self._last_mode = None
+    
+    def submit(self, job, priority=0):
+        """Queue a job; workers are started lazily on first submission"""
+        with self._cond:
+            job.status = 'queued'
+            heapq.heappush(self._queues[job.mode], (-priority, next(self._counter), job))
+            self._ensure_workers()
+            self._cond.notify()
+    
+    def _ensure_workers(self):
+        self._workers = [worker for worker in self._workers if worker.is_alive()]
+        while len(self._workers) < max(1, self.max_workers):
+            worker = threading.Thread(target=self._worker_loop, daemon=True,
+                                      name=f"prediction-worker-{len(self._workers)}")
+            worker.start()
+            self._workers.append(worker)
+    
+    def _batch_limit(self):
+        return max(1, self.max_workers - 1)
+    
+    def _prune(self):
+        """Drop jobs that are no longer queued in the job store (caller must not hold the lock)
         
-        return {
-            'job_id': self.job_id,
-            'status': self.status,
-            'progress': self.progress,
-            'processed': self.processed,
-            'total': self.total,
-            'success_count': self.success_count,
-            'failed_count': self.failed_count,
-            'eta': eta,
-            'error': self.error_message
-        }
+        Jobs cancelled through the store (possibly from another process) never
+        touch the in-memory job, so the store is the source of truth for what
+        is still waiting. Only the job ids in the heaps are looked up, and the
+        lookup runs outside the scheduler lock.
+        """
+        with self._cond:
+            job_ids = {entry[2].job_id for queue in self._queues.values() for entry in queue}
+        if not job_ids:
+            return
+        gone = job_ids - get_job_store().with_status(job_ids, ('queued',))
+        if not gone:
+            return
+        with self._cond:
+            for mode in self.MODES:
+                waiting = [entry for entry in self._queues[mode] if entry[2].job_id not in gone]
+                heapq.heapify(waiting)
+                self._queues[mode] = waiting
+    
+    def _select_mode(self):
+        """Pick the queue to serve next (caller holds the lock)"""
+        candidates = [mode for mode in self.MODES if self._queues[mode]]
+        if self._running['batch'] >= self._batch_limit() and 'batch' in candidates:
+            candidates.remove('batch')
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        
+        heads = {mode: self._queues[mode][0][0] for mode in candidates}
+        best = min(heads.values())
+        candidates = [mode for mode in candidates if heads[mode] == best]
+        if len(candidates) > 1 and self._last_mode in candidates:
+            candidates.remove(self._last_mode)
+        return candidates[0]
+    
+    def _worker_loop(self):
+        while True:
+            self._prune()
+            with self._cond:
+                mode = self._select_mode()
+                if mode is None:
+                    # Woken by a submission or a finished job: prune again before selecting
+                    self._cond.wait()
+                    continue
+                _, _, job = heapq.heappop(self._queues[mode])
+                self._running[mode] += 1
+                self._last_mode = mode
+            
+            try:
+                job.run()
+            except Exception as e:
+                job._fail(str(e))
+            finally:
+                with self._cond:
+                    self._running[mode] -= 1
+                    self._cond.notify_all()
+    
+    def stats(self):
+        """Queue lengths and running job counts per mode"""
+        self._prune()
+        with self._cond:
+            return {
+                'max_workers': self.max_workers,
+                'queued': {mode: len(self._queues[mode]) for mode in self.MODES},
+                'running': dict(self._running)
+            }
+
+
+job_scheduler = JobScheduler()
+
+
+def submit_job(job):
+    """Record a new job in the job store; run it here or leave it for the inference workers"""
+    if current_app.config.get('PREDICTION_EXECUTOR', 'thread') == 'worker':
+        get_job_store().create(job.to_record())
+    else:
+        get_job_store().create(job.to_record(owner=process_owner()))
+        job_scheduler.submit(job, priority=job.priority)
+
+
+def _request_priority(value):
+    """Validate a client-requested priority and clamp it to +/-PREDICTION_MAX_PRIORITY
+    
+    Raises:
+        ValueError: the value is not an integer
+    """
+    if value is None or value == '':
+        return 0
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f'Priority must be an integer, got {value!r}')
+    try:
+        priority = int(value)
+    except ValueError:
+        raise ValueError(f'Priority must be an integer, got {value!r}')
+    limit = max(0, current_app.config.get('PREDICTION_MAX_PRIORITY', 0))
+    return max(-limit, min(limit, priority))
+
+
+def job_status(record):
+    """Status response for a job store record (completed jobs carry the results summary only)"""
+    eta = None
+    if record['status'] == 'running' and record['processed'] and record['start_time']:
+        elapsed = (datetime.now() - datetime.fromisoformat(record['start_time'])).total_seconds()
+        rate = record['processed'] / elapsed if elapsed > 0 else 0
+        remaining = (record['total'] or 0) - record['processed']
+        eta_seconds = remaining / rate if rate > 0 else 0
+        eta = f"{int(eta_seconds // 60)}:{int(eta_seconds % 60):02d}"
+    
+    status = {
+        'job_id': record['job_id'],
+        'status': record['status'],
+        'progress': record['progress'] or 0,
+        'processed': record['processed'] or 0,
+        'total': record['total'] or 0,
+        'success_count': record['success_count'] or 0,
+        'failed_count': record['failed_count'] or 0,
+        'eta': eta,
+        'error': record['error']
+    }
+    if record['status'] == 'queued':
+        status['queue_position'] = get_job_store().queue_position(record['job_id'])
+    if record['status'] == 'completed':
+        status['summary'] = record['summary']
+    return status
+
+
+def _completed_results(job_id):
+    """Results of a completed job (from memory or its on-disk result files), or None"""
+    record = get_job_store().get(job_id)
+    if record is None or record['status'] != 'completed':
+        return None
+    return job_result_store.get(job_id, record['result_path'])
 
 @prediction_bp.route('/single', methods=['POST'])
 def start_single_prediction():
@@ -303,23 +644,28 @@ def start_single_prediction():
         except:
             return jsonify({'success': False, 'message': 'Invalid SMILES string'}), 400
         
+        try:
+            priority = _request_priority(data.get('priority'))
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
         # Create job
         job_id = str(uuid.uuid4())
         options = {
             'high_confidence_only': data.get('high_confidence_only', False),
             'include_structure': data.get('include_structure', False),
-            'device': data.get('device', 'cuda'),
+            'device': data.get('device') or current_app.config.get('PREDICTOR_DEVICE'),
             'model_path': data.get('model_path', DEFAULT_MODEL_PATH)
         }
         
-        job = PredictionJob(job_id, 'single', {'smiles': smiles}, options)
-        active_jobs[job_id] = job
-        job.start()
+        job = PredictionJob(job_id, 'single', {'smiles': smiles}, options, priority=priority)
+        submit_job(job)
         
         return jsonify({
             'success': True,
             'job_id': job_id,
-            'message': 'Prediction started'
+            'status': job.status,
+            'message': 'Prediction queued'
         })
         
     except Exception as e:
@@ -339,6 +685,11 @@ def start_batch_prediction():
         if not file.filename.lower().endswith('.csv'):
             return jsonify({'success': False, 'message': 'Only CSV files are supported'}), 400
         
+        try:
+            priority = _request_priority(request.form.get('priority'))
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        
         # Save uploaded file
         filename = secure_filename(file.filename)
         temp_dir = tempfile.mkdtemp()
@@ -368,7 +719,7 @@ def start_batch_prediction():
         job_id = str(uuid.uuid4())
         options = {
             'high_confidence_only': request.form.get('high_confidence_only') == 'true',
-            'device': request.form.get('device', 'cuda'),
+            'device': request.form.get('device') or current_app.config.get('PREDICTOR_DEVICE'),
             'model_path': request.form.get('model_path', DEFAULT_MODEL_PATH)
         }
         
@@ -378,14 +729,14 @@ def start_batch_prediction():
             'id_column': id_column
         }
         
-        job = PredictionJob(job_id, 'batch', data, options)
-        active_jobs[job_id] = job
-        job.start()
+        job = PredictionJob(job_id, 'batch', data, options, priority=priority)
+        submit_job(job)
         
         return jsonify({
             'success': True,
             'job_id': job_id,
-            'message': 'Batch prediction started'
+            'status': job.status,
+            'message': 'Batch prediction queued'
         })
         
     except Exception as e:
@@ -393,46 +744,21 @@ def start_batch_prediction():
 
 @prediction_bp.route('/status/<job_id>', methods=['GET'])
 def get_prediction_status(job_id):
-    """Get prediction job status"""
+    """Get prediction job status (completed jobs carry the results summary only)"""
     try:
-        # Check active jobs
-        if job_id in active_jobs:
-            job = active_jobs[job_id]
-            status = job.get_status()
-            
-            # Move completed jobs to completed_jobs
-            if job.status in ['completed', 'failed', 'cancelled']:
-                completed_jobs[job_id] = job
-                job_results[job_id] = job.results
-                del active_jobs[job_id]
-                
-                # Add results to status if completed
-                if job.status == 'completed':
-                    status['results'] = job.results
-            
-            return jsonify(status)
-        
-        # Check completed jobs
-        elif job_id in completed_jobs:
-            job = completed_jobs[job_id]
-            status = job.get_status()
-            if job.status == 'completed':
-                status['results'] = job_results.get(job_id)
-            return jsonify(status)
-        
-        else:
+        record = get_job_store().get(job_id)
+        if record is None:
             return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job_status(record))
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @prediction_bp.route('/cancel/<job_id>', methods=['POST'])
 def cancel_prediction(job_id):
-    """Cancel prediction job"""
+    """Cancel prediction job (the running process notices at its next progress report)"""
     try:
-        if job_id in active_jobs:
-            job = active_jobs[job_id]
-            job.cancel()
+        if get_job_store().cancel(job_id):
             return jsonify({'success': True, 'message': 'Job cancelled'})
         else:
             return jsonify({'success': False, 'message': 'Job not found or already completed'}), 404
@@ -440,18 +766,33 @@ def cancel_prediction(job_id):
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def _results_query_args():
+    """Filter and sort options shared by the results, stream and download endpoints"""
+    sort_by = request.args.get('sort_by', 'score')
+    return {
+        'min_score': request.args.get('min_score', type=float),
+        'max_score': request.args.get('max_score', type=float),
+        'gene': request.args.get('gene') or None,
+        'compound_id': request.args.get('compound_id') or None,
+        'search': request.args.get('search') or None,
+        'sort_by': sort_by if sort_by in RESULT_SORT_FIELDS else 'score',
+        'sort_order': 'asc' if request.args.get('sort_order', 'desc').lower() == 'asc' else 'desc'
+    }
+
+def _include_sequence():
+    return request.args.get('include_sequence', 'false').lower() == 'true'
+
 @prediction_bp.route('/download/<job_id>', methods=['GET'])
 def download_results(job_id):
-    """Download prediction results as CSV"""
+    """Download prediction results as CSV (optionally filtered/sorted like /results)"""
     try:
-        if job_id in job_results:
-            results = job_results[job_id]
-            
-            if not results or 'interactions' not in results:
-                return jsonify({'error': 'No results available'}), 404
-            
+        results = _completed_results(job_id)
+        if results is not None:
             # Convert results to DataFrame
-            df = pd.DataFrame(results['interactions'])
+            if request.args:
+                df = results.to_dataframe(results.query(**_results_query_args()))
+            else:
+                df = results.to_dataframe()
             
             # Create temporary file
             temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False)
@@ -472,19 +813,75 @@ def download_results(job_id):
 
 @prediction_bp.route('/results/<job_id>', methods=['GET'])
 def get_results(job_id):
-    """Get prediction results"""
+    """Get one page of prediction results
+    
+    Query parameters: page, per_page, min_score, max_score (exclusive), gene,
+    compound_id, search, sort_by (score/protein/gene/compound_id), sort_order
+    and include_sequence. Protein sequences are omitted unless requested.
+    """
     try:
-        if job_id in job_results:
-            return jsonify({
-                'success': True,
-                'results': job_results[job_id]
-            })
-        else:
+        results = _completed_results(job_id)
+        if results is None:
             return jsonify({'success': False, 'message': 'Results not found'}), 404
+        
+        page = max(1, request.args.get('page', 1, type=int))
+        per_page = min(max(1, request.args.get('per_page', DEFAULT_RESULTS_PAGE_SIZE, type=int)),
+                       MAX_RESULTS_PAGE_SIZE)
+        
+        rows = results.query(**_results_query_args())
+        total = len(rows)
+        start = (page - 1) * per_page
+        
+        return jsonify({
+            'success': True,
+            'summary': results.summary,
+            'interactions': results.records(rows[start:start + per_page], _include_sequence()),
+            'records_total': len(results),
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'total': total,
+                'total_pages': (total + per_page - 1) // per_page,
+                'has_prev': page > 1,
+                'has_next': start + per_page < total
+            }
+        })
+            
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@prediction_bp.route('/results/<job_id>/stream', methods=['GET'])
+def stream_results(job_id):
+    """Stream all matching results as NDJSON (same filters and sorting as /results)"""
+    try:
+        results = _completed_results(job_id)
+        if results is None:
+            return jsonify({'success': False, 'message': 'Results not found'}), 404
+        
+        rows = results.query(**_results_query_args())
+        return Response(results.iter_ndjson(rows, _include_sequence()), mimetype='application/x-ndjson')
             
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@prediction_bp.route('/cache', methods=['GET'])
+def get_cache_stats():
+    """Get drug graph / score cache counters, job result storage and resident model checkpoints"""
+    try:
+        if not PREDICTOR_AVAILABLE:
+            return jsonify({'success': False, 'message': 'Prediction service not available'}), 503
+        
+        return jsonify({
+            'success': True,
+            'drug_graphs': drug_graph_cache.stats(),
+            'scores': score_cache.stats(),
+            'job_results': job_result_store.stats(),
+            'models': [{'model_path': path, 'device': device} for path, device in predictor_registry.loaded()]
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @prediction_bp.route('/validate/smiles', methods=['POST'])
 def validate_smiles():
     """Validate SMILES string"""
@@ -572,97 +969,80 @@ def list_jobs():
     try:
         all_jobs = []
         
-        # Add active jobs
-        for job_id, job in active_jobs.items():
-            all_jobs.append({
-                'job_id': job_id,
-                'mode': job.mode,
-                'status': job.status,
-                'progress': job.progress,
-                'start_time': job.start_time.isoformat() if job.start_time else None
-            })
-        
-        # Add completed jobs
-        for job_id, job in completed_jobs.items():
-            all_jobs.append({
-                'job_id': job_id,
-                'mode': job.mode,
-                'status': job.status,
-                'progress': job.progress,
-                'start_time': job.start_time.isoformat() if job.start_time else None,
-                'end_time': job.end_time.isoformat() if job.end_time else None
-            })
+        for record in get_job_store().list_jobs():
+            job = {
+                'job_id': record['job_id'],
+                'mode': record['mode'],
+                'status': record['status'],
+                'progress': record['progress'] or 0,
+                'created_time': record['created_time'],
+                'start_time': record['start_time']
+            }
+            if record['status'] in FINISHED_STATUSES:
+                job['end_time'] = record['end_time']
+            all_jobs.append(job)
         
-        # Sort by start time (newest first)
-        all_jobs.sort(key=lambda x: x.get('start_time', ''), reverse=True)
+        # Sort by submission time (newest first)
+        all_jobs.sort(key=lambda x: x['created_time'], reverse=True)
         
-        return jsonify({'jobs': all_jobs})
+        return jsonify({'jobs': all_jobs, 'scheduler': job_scheduler.stats(), 'queue': get_job_store().counts()})
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _delete_jobs(job_ids):
+    """Remove finished jobs and their stored results"""
+    for job_id in job_ids:
+        job_result_store.delete(job_id)
+    get_job_store().delete(job_ids)
+
 @prediction_bp.route('/cleanup', methods=['POST'])
 def cleanup_jobs():
     """Clean up old completed jobs"""
     try:
+        finished = get_job_store().list_jobs(FINISHED_STATUSES)
+        
         # Keep only last 10 completed jobs
-        if len(completed_jobs) > 10:
+        if len(finished) > 10:
             # Sort by end time
-            sorted_jobs = sorted(
-                completed_jobs.items(), 
-                key=lambda x: x[1].end_time or datetime.min, 
-                reverse=True
-            )
-            
-            # Keep only the 10 most recent
-            jobs_to_keep = dict(sorted_jobs[:10])
-            jobs_to_remove = [job_id for job_id in completed_jobs if job_id not in jobs_to_keep]
-            
-            for job_id in jobs_to_remove:
-                del completed_jobs[job_id]
-                if job_id in job_results:
-                    del job_results[job_id]
+            finished.sort(key=lambda record: record['end_time'] or '', reverse=True)
+            _delete_jobs([record['job_id'] for record in finished[10:]])
         
+        counts = get_job_store().counts()
         return jsonify({
             'success': True,
-            'active_jobs': len(active_jobs),
-            'completed_jobs': len(completed_jobs)
+            'active_jobs': sum(counts.get(status, 0) for status in ACTIVE_STATUSES),
+            'completed_jobs': sum(counts.get(status, 0) for status in FINISHED_STATUSES)
         })
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
 # Cleanup function to run periodically
+_cleanup_thread = None
+
+
 def periodic_cleanup():
-    """Periodic cleanup of old jobs"""
-    import threading
-    import time
+    """Start the hourly cleanup of old jobs (once per process; called from init_prediction)"""
+    global _cleanup_thread
+    if _cleanup_thread is not None and _cleanup_thread.is_alive():
+        return
     
     def cleanup_task():
         while True:
             time.sleep(3600)  # Run every hour
             try:
                 # Remove jobs older than 24 hours
-                cutoff_time = datetime.now() - timedelta(hours=24)
+                cutoff_time = (datetime.now() - timedelta(hours=24)).isoformat()
                 
-                jobs_to_remove = []
-                for job_id, job in completed_jobs.items():
-                    if job.end_time and job.end_time < cutoff_time:
-                        jobs_to_remove.append(job_id)
-                
-                for job_id in jobs_to_remove:
-                    del completed_jobs[job_id]
-                    if job_id in job_results:
-                        del job_results[job_id]
+                jobs_to_remove = [record['job_id'] for record in get_job_store().list_jobs(FINISHED_STATUSES)
+                                  if record['end_time'] and record['end_time'] < cutoff_time]
+                _delete_jobs(jobs_to_remove)
                         
                 print(f"Cleaned up {len(jobs_to_remove)} old prediction jobs")
                 
             except Exception as e:
                 print(f"Cleanup error: {e}")
     
-    cleanup_thread = threading.Thread(target=cleanup_task, daemon=True)
-    cleanup_thread.start()
-
-# Auto-start cleanup when module is imported
-from datetime import timedelta
-periodic_cleanup()
\ No newline at end of file
+    _cleanup_thread = threading.Thread(target=cleanup_task, daemon=True, name='prediction-cleanup')
+    _cleanup_thread.start()
@@ -2,17 +2,24 @@
 # -*- coding: utf-8 -*-
 
 import os
+import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from functools import partial
+import numpy as np
 import torch
+import dgl
 from dgllife.utils import CanonicalAtomFeaturizer, CanonicalBondFeaturizer, smiles_to_bigraph
 import pandas as pd
 from tqdm import tqdm
-from torch import nn
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from api.models import DrugBAN
 from api.configs import get_cfg_defaults
-from api.utils import integer_label_protein
+from api.utils import integer_label_proteins
+from api.embedding_cache import protein_embedding_cache
+from api.graph_cache import canonical_smiles, drug_graph_cache
+from api.panel import ProteinPanel, load_protein_panel
 
 class DrugPredictor:
     def __init__(self, 
@@ -28,12 +35,10 @@ class DrugPredictor:
             max_drug_nodes: 最大药物节点数
         """
         self.max_drug_nodes = max_drug_nodes
+        self.model_path = model_path
         
         # 设置设备
-        if device is None:
-            self.device = torch.device("cuda:0" if torch.cuda.is_available() else "cpu")
-        else:
-            self.device = torch.device(device)
+        self.device = resolve_device(device)
             
         # 初始化特征提取器
         self.atom_featurizer = CanonicalAtomFeaturizer()
@@ -48,54 +53,283 @@ class DrugPredictor:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"模型文件不存在: {model_path}")
             
+        # 检查点哈希，用于蛋白质嵌入缓存
+        self.checkpoint_hash = file_hash(model_path)
+        
         # 加载模型权重
-        self.model.load_state_dict(torch.load(model_path))
+        self.model.load_state_dict(torch.load(model_path, map_location=self.device))
         self.model = self.model.to(self.device)
+        # 推理专用，加载后即固定为eval模式
+        self.model.eval()
         
-    def predict_single(self, smiles: str, protein_seq: str) -> float:
+    def _build_drug_graph(self, smiles: str):
         """
-        预测单个SMILES和蛋白质序列的结合概率
+        获取药物分子图，按 (规范SMILES, max_drug_nodes) 缓存
         
         Args:
             smiles: SMILES字符串
-            protein_seq: 蛋白质序列
             
         Returns:
-            float: 预测的结合概率
+            DGLGraph: 填充后的药物图（位于CPU，共享只读）
+        """
+        key = (canonical_smiles(smiles), self.max_drug_nodes)
+        drug_graph = drug_graph_cache.get(key)
+        if drug_graph is None:
+            drug_graph = self._featurize_drug(key[0])
+            drug_graph_cache.put(key, drug_graph)
+        return drug_graph
+    
+    def _featurize_drug(self, smiles: str):
+        """
+        构建药物分子图，并用虚拟节点填充到 max_drug_nodes
+        
+        Args:
+            smiles: SMILES字符串
+            
+        Returns:
+            DGLGraph: 填充后的药物图（位于CPU）
         """
-        # 构建药物图
         drug_graph = self.fc(smiles=smiles, 
                            node_featurizer=self.atom_featurizer, 
                            edge_featurizer=self.bond_featurizer)
-        drug_graph = drug_graph.to(self.device)
+        if drug_graph is None:
+            raise ValueError(f"无效的SMILES字符串: {smiles}")
         
         # 处理节点特征
-        actual_node_feats = drug_graph.ndata.pop('h').to(self.device)
+        actual_node_feats = drug_graph.ndata.pop('h')
         num_actual_nodes = actual_node_feats.shape[0]
         num_virtual_nodes = self.max_drug_nodes - num_actual_nodes
         
-        virtual_node_bit = torch.zeros([num_actual_nodes, 1]).to(self.device)
+        virtual_node_bit = torch.zeros([num_actual_nodes, 1])
         actual_node_feats = torch.cat((actual_node_feats, virtual_node_bit), 1)
         drug_graph.ndata['h'] = actual_node_feats
         
         virtual_node_feat = torch.cat(
-            (torch.zeros(num_virtual_nodes, 74).to(self.device), 
-             torch.ones(num_virtual_nodes, 1).to(self.device)), 1)
+            (torch.zeros(num_virtual_nodes, 74), 
+             torch.ones(num_virtual_nodes, 1)), 1)
         drug_graph.add_nodes(num_virtual_nodes, {"h": virtual_node_feat})
         drug_graph = drug_graph.add_self_loop()
+        return drug_graph
+    
+    def _batch_drug_graphs(self, smiles_list: List[str], drug_graphs: dict):
+        """
+        将一批SMILES的药物图合并为一个批图并移动到计算设备
+        
+        Args:
+            smiles_list: 当前批次的SMILES
+            drug_graphs: 已构建的药物图，同一次调用中重复的SMILES只构建一次
+                         （dgl.batch 会复制特征，原图不会被修改）
+        """
+        graphs = []
+        for smiles in smiles_list:
+            if smiles not in drug_graphs:
+                drug_graphs[smiles] = self._build_drug_graph(smiles)
+            graphs.append(drug_graphs[smiles])
+        return dgl.batch(graphs).to(self.device)
+    
+    def predict_single(self, smiles: str, protein_seq: str) -> float:
+        """
+        预测单个SMILES和蛋白质序列的结合概率
         
-        # 处理蛋白质序列
-        protein_feat = integer_label_protein(protein_seq)
-        protein_feat = torch.from_numpy(protein_feat).to(self.device)
-        protein_feat = protein_feat.unsqueeze(0)
+        Args:
+            smiles: SMILES字符串
+            protein_seq: 蛋白质序列
+            
+        Returns:
+            float: 预测的结合概率
+        """
+        return float(self.predict_many([smiles], [protein_seq])[0])
+    
+    def predict_many(self,
+                     smiles_list: List[str],
+                     sequences: List[str],
+                     batch_size: int = 64) -> np.ndarray:
+        """
+        批量预测 (SMILES, 蛋白质序列) 对的结合概率
+        
+        每 batch_size 个样本对通过 dgl.batch 合并药物图、堆叠蛋白质编码后
+        执行一次前向计算。
+        
+        Args:
+            smiles_list: SMILES字符串列表
+            sequences: 蛋白质序列列表，与 smiles_list 一一对应
+            batch_size: 每次前向计算的样本对数量
+            
+        Returns:
+            np.ndarray: 预测的结合概率，形状为 (len(smiles_list),)
+        """
+        if len(smiles_list) != len(sequences):
+            raise ValueError(f"SMILES数量({len(smiles_list)})与序列数量({len(sequences)})不一致")
         
-        # 预测
+        scores = np.empty(len(smiles_list), dtype=np.float32)
+        drug_graphs = {}
+        
+        for start in range(0, len(smiles_list), batch_size):
+            end = min(start + batch_size, len(smiles_list))
+            
+            batch_graph = self._batch_drug_graphs(smiles_list[start:end], drug_graphs)
+            
+            protein_feat = integer_label_proteins(sequences[start:end])
+            protein_feat = torch.from_numpy(protein_feat).to(self.device)
+            
+            with torch.no_grad():
+                _, _, _, score = self.model(batch_graph, protein_feat)
+                prob = torch.sigmoid(score).view(-1)
+            
+            scores[start:end] = prob.cpu().numpy()
+        
+        return scores
+    
+    def encode_proteins(self, encoded: np.ndarray, batch_size: int = 64) -> np.ndarray:
+        """
+        计算蛋白质的 ProteinCNN 嵌入 v_p
+        
+        Args:
+            encoded: 蛋白质整数编码矩阵 (N, max_length)
+            batch_size: 每次前向计算的蛋白质数量
+            
+        Returns:
+            np.ndarray: 形状为 (N, L, C) 的float32嵌入
+        """
+        chunks = []
+        for start in range(0, len(encoded), batch_size):
+            protein_feat = torch.as_tensor(np.asarray(encoded[start:start + batch_size])).to(self.device)
+            with torch.no_grad():
+                v_p = self.model.protein_extractor(protein_feat)
+            chunks.append(v_p.cpu().numpy())
+        return np.concatenate(chunks).astype(np.float32, copy=False)
+    
+    def protein_embeddings(self, sequences) -> np.ndarray:
+        """
+        获取一组蛋白质序列的嵌入，按 (检查点哈希, 序列哈希) 缓存
+        
+        Args:
+            sequences: 蛋白质序列列表，或已编码的整数矩阵（如 ProteinPanel.encoded）
+            
+        Returns:
+            np.ndarray: 形状为 (N, L, C) 的嵌入，可直接传给 predict_embedded
+        """
+        if isinstance(sequences, np.ndarray):
+            encoded = sequences
+        else:
+            encoded = integer_label_proteins(sequences)
+        return protein_embedding_cache.get(self.checkpoint_hash, encoded, self.encode_proteins)
+    
+    def predict_embedded(self,
+                         smiles_list: List[str],
+                         protein_embeddings: np.ndarray,
+                         batch_size: int = 64) -> np.ndarray:
+        """
+        使用预先计算的蛋白质嵌入进行批量预测，只运行药物GCN、BAN和MLP
+        
+        Args:
+            smiles_list: SMILES字符串列表
+            protein_embeddings: 蛋白质嵌入 (N, L, C)，与 smiles_list 一一对应
+            batch_size: 每次前向计算的样本对数量
+            
+        Returns:
+            np.ndarray: 预测的结合概率，形状为 (len(smiles_list),)
+        """
+        if len(smiles_list) != len(protein_embeddings):
+            raise ValueError(f"SMILES数量({len(smiles_list)})与蛋白质嵌入数量({len(protein_embeddings)})不一致")
+        
+        scores = np.empty(len(smiles_list), dtype=np.float32)
+        drug_graphs = {}
+        
+        for start in range(0, len(smiles_list), batch_size):
+            end = min(start + batch_size, len(smiles_list))
+            
+            batch_graph = self._batch_drug_graphs(smiles_list[start:end], drug_graphs)
+            
+            # 内存映射为只读，复制当前批次后再转为张量
+            v_p = torch.from_numpy(np.array(protein_embeddings[start:end])).to(self.device)
+            
+            with torch.no_grad():
+                v_d = self.model.drug_extractor(batch_graph)
+                f, _ = self.model.bcn(v_d, v_p)
+                score = self.model.mlp_classifier(f)
+                prob = torch.sigmoid(score).view(-1)
+            
+            scores[start:end] = prob.cpu().numpy()
+        
+        return scores
+    
+    def encode_drug(self, smiles: str) -> torch.Tensor:
+        """
+        对单个化合物构建药物图并计算 MolecularGCN 嵌入 v_d
+        
+        Args:
+            smiles: SMILES字符串
+            
+        Returns:
+            torch.Tensor: 形状为 (1, max_drug_nodes, C) 的药物嵌入（位于计算设备）
+        """
+        batch_graph = dgl.batch([self._build_drug_graph(smiles)]).to(self.device)
         with torch.no_grad():
-            self.model.eval()
-            _, _, _, score = self.model(drug_graph, protein_feat)
-            prob = nn.Sigmoid()(score)
+            return self.model.drug_extractor(batch_graph)
+    
+    def score_encoded_drug(self,
+                           drug_embedding: torch.Tensor,
+                           protein_embeddings: np.ndarray,
+                           batch_size: int = 64) -> np.ndarray:
+        """
+        将一个药物嵌入广播到一批蛋白质嵌入上，只运行BAN和MLP
+        
+        Args:
+            drug_embedding: encode_drug 返回的药物嵌入 (1, max_drug_nodes, C)
+            protein_embeddings: 蛋白质嵌入 (N, L, C)
+            batch_size: 每次前向计算的蛋白质数量
             
-        return prob.item()
+        Returns:
+            np.ndarray: 预测的结合概率，形状为 (N,)
+        """
+        scores = np.empty(len(protein_embeddings), dtype=np.float32)
+        
+        for start in range(0, len(protein_embeddings), batch_size):
+            end = min(start + batch_size, len(protein_embeddings))
+            v_p = torch.from_numpy(np.array(protein_embeddings[start:end])).to(self.device)
+            
+            with torch.no_grad():
+                f, _ = self.model.bcn(drug_embedding, v_p)
+                score = self.model.mlp_classifier(f)
+                prob = torch.sigmoid(score).view(-1)
+            
+            scores[start:end] = prob.cpu().numpy()
+        
+        return scores
+    
+    def screen(self, smiles: str, protein_embeddings: np.ndarray, batch_size: int = 64) -> np.ndarray:
+        """
+        单化合物对多靶点筛选：药物只编码一次，再与所有蛋白质嵌入配对打分
+        
+        Args:
+            smiles: SMILES字符串
+            protein_embeddings: 蛋白质嵌入 (N, L, C)，见 protein_embeddings
+            batch_size: 每次前向计算的蛋白质数量
+            
+        Returns:
+            np.ndarray: 预测的结合概率，形状为 (N,)
+        """
+        return self.score_encoded_drug(self.encode_drug(smiles), protein_embeddings, batch_size)
+    
+    def screen_panel(self,
+                     smiles: str,
+                     panel: Optional[ProteinPanel] = None,
+                     batch_size: int = 64) -> np.ndarray:
+        """
+        对整个靶点蛋白面板筛选单个化合物
+        
+        Args:
+            smiles: SMILES字符串
+            panel: 靶点面板，默认使用共享的 data/protein_info_with_gene.csv
+            batch_size: 每次前向计算的蛋白质数量
+            
+        Returns:
+            np.ndarray: 与面板顺序一致的结合概率
+        """
+        if panel is None:
+            panel = load_protein_panel()
+        return self.screen(smiles, self.protein_embeddings(panel.encoded), batch_size)
     
     def predict_file(self, 
                     input_file: str, 
@@ -241,6 +475,137 @@ class DrugPredictor:
             
         except Exception as e:
             return False, f"批量预测过程中出错: {str(e)}", {}
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    计算文件内容的SHA-256哈希
+    
+    Args:
+        path: 文件路径
+        chunk_size: 每次读取的字节数
+        
+    Returns:
+        str: 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def resolve_device(device: str = None) -> torch.device:
+    """
+    解析计算设备，CUDA不可用时回退到CPU
+    
+    Args:
+        device: 设备选择 ('cuda', 'cuda:0', 'cpu' 或 None 表示自动选择)
+        
+    Returns:
+        torch.device: 实际使用的设备（CUDA设备总是带编号，'cuda' 与 None 解析为当前设备，
+                      注册表中同一块GPU只对应一个键）
+    """
+    if device is None:
+        device = "cuda"
+    device = torch.device(device)
+    if device.type == 'cuda':
+        if not torch.cuda.is_available():
+            return torch.device("cpu")
+        if device.index is None:
+            return torch.device("cuda", torch.cuda.current_device())
+    return device
+
+
+class PredictorRegistry:
+    """
+    进程级DrugPredictor注册表
+    
+    以 (模型路径, 设备) 为键，每个检查点只加载一次并常驻内存，
+    所有预测任务共享同一个已预热的实例；超出上限时按LRU淘汰。
+    """
+    
+    def __init__(self, max_resident: int = 2):
+        """
+        Args:
+            max_resident: 同时常驻内存的检查点数量上限
+        """
+        self.max_resident = max_resident
+        self._predictors = OrderedDict()
+        self._load_locks = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _make_key(model_path: str, device: str = None) -> Tuple[str, str]:
+        return os.path.realpath(model_path), str(resolve_device(device))
+    
+    def get(self, model_path: str, device: str = None) -> DrugPredictor:
+        """
+        获取已加载的预测器，不存在时加载
+        
+        Args:
+            model_path: 模型文件路径
+            device: 计算设备
+            
+        Returns:
+            DrugPredictor: 共享的预测器实例
+        """
+        key = self._make_key(model_path, device)
+        with self._lock:
+            predictor = self._predictors.get(key)
+            if predictor is not None:
+                self._predictors.move_to_end(key)
+                return predictor
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        
+        # 同一检查点的并发请求只加载一次
+        with load_lock:
+            with self._lock:
+                predictor = self._predictors.get(key)
+                if predictor is not None:
+                    self._predictors.move_to_end(key)
+                    return predictor
+            
+            predictor = DrugPredictor(model_path=model_path, device=key[1])
+            
+            with self._lock:
+                self._predictors[key] = predictor
+                while len(self._predictors) > max(1, self.max_resident):
+                    evicted_key, _ = self._predictors.popitem(last=False)
+                    self._load_locks.pop(evicted_key, None)
+        return predictor
+    
+    def warm_up(self, model_path: str, device: str = None) -> DrugPredictor:
+        """预先加载检查点，避免首个任务承担加载开销"""
+        return self.get(model_path, device)
+    
+    def evict(self, model_path: str, device: str = None) -> bool:
+        """从注册表中移除指定检查点"""
+        key = self._make_key(model_path, device)
+        with self._lock:
+            self._load_locks.pop(key, None)
+            return self._predictors.pop(key, None) is not None
+    
+    def clear(self):
+        """清空注册表"""
+        with self._lock:
+            self._predictors.clear()
+            self._load_locks.clear()
+    
+    def loaded(self) -> list:
+        """当前常驻的 (模型路径, 设备) 列表，按最近使用排序"""
+        with self._lock:
+            return list(self._predictors.keys())
+
+
+# 进程级共享注册表
+predictor_registry = PredictorRegistry()
+
+
+def get_predictor(model_path: str, device: str = None) -> DrugPredictor:
+    """从进程级注册表获取预测器"""
+    return predictor_registry.get(model_path, device)
+
         
 def main():
     """
@@ -6,6 +6,7 @@ import pandas as pd
 from rdkit import Chem
 from typing import Optional, Tuple
 from pathlib import Path
+from api.panel import load_protein_panel
 
 class DataProcessor:
     def __init__(self, work_dir: str = 'D:/CurrentProjects/FuLing/茯苓/fuling_final/datasets'):
@@ -26,8 +27,8 @@ class DataProcessor:
         if not self.protein_info_path.exists():
             raise FileNotFoundError(f"蛋白质信息文件不存在: {self.protein_info_path}")
         
-        # 加载蛋白质信息
-        self.protein_df = pd.read_csv(self.protein_info_path)
+        # 加载蛋白质信息（与预测任务共享同一份解析结果）
+        self.panel = load_protein_panel(str(self.protein_info_path))
         
     @staticmethod
     def validate_smiles(smiles: str) -> Tuple[bool, Optional[str]]:
@@ -68,9 +69,9 @@ class DataProcessor:
             # 构建数据集
             dataset = pd.DataFrame({
                 'Ingredient_Smile': smiles,
-                'Sequence': self.protein_df['sequence'],
-                'Gene': self.protein_df['gene'],
-                'Protein': self.protein_df['protein']
+                'Sequence': self.panel.sequences,
+                'Gene': self.panel.genes,
+                'Protein': self.panel.names
             })
 
             # 确保保存路径存在
@@ -146,10 +147,10 @@ class DataProcessor:
                     # 为每个化合物构建数据集
                     # 每行包含一个蛋白质序列和对应的基因、蛋白质信息
                     dataset = pd.DataFrame({
-                        'Ingredient_Smile': [smiles] * len(self.protein_df),  # 重复SMILES以匹配蛋白质数量
-                        'Sequence': self.protein_df['sequence'],
-                        'Gene': self.protein_df['gene'],
-                        'Protein': self.protein_df['protein']
+                        'Ingredient_Smile': [smiles] * len(self.panel),  # 重复SMILES以匹配蛋白质数量
+                        'Sequence': self.panel.sequences,
+                        'Gene': self.panel.genes,
+                        'Protein': self.panel.names
                     })
                     
                     # 保存数据集
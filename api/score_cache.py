@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class ScoreCache:
+    """
+    持久化预测得分缓存（SQLite）
+
+    键为 (规范SMILES, 蛋白键, 模型检查点哈希)，预测前查询、预测后写入，
+    重复提交的化合物直接从缓存返回，部分命中时只计算缺失的配对。
+    未配置 db_path 时缓存处于禁用状态。
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Args:
+            db_path: SQLite数据库文件路径，None 表示禁用
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._initialized = set()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（每个线程一个连接）"""
+        connections = getattr(self._local, 'connections', None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        conn = connections.get(self.db_path)
+        if conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            with self._lock:
+                if self.db_path not in self._initialized:
+                    conn.execute(
+                        'CREATE TABLE IF NOT EXISTS scores ('
+                        ' model_hash TEXT NOT NULL,'
+                        ' smiles TEXT NOT NULL,'
+                        ' protein_key TEXT NOT NULL,'
+                        ' score REAL NOT NULL,'
+                        ' PRIMARY KEY (model_hash, smiles, protein_key)'
+                        ') WITHOUT ROWID'
+                    )
+                    conn.commit()
+                    self._initialized.add(self.db_path)
+            connections[self.db_path] = conn
+        return conn
+
+    def get_compound(self, model_hash: str, smiles: str) -> Dict[str, float]:
+        """
+        查询一个化合物在指定模型下的所有已缓存得分
+
+        Args:
+            model_hash: 模型检查点哈希
+            smiles: 规范SMILES
+
+        Returns:
+            dict: 蛋白键 -> 得分
+        """
+        if not self.enabled:
+            return {}
+        try:
+            rows = self._connect().execute(
+                'SELECT protein_key, score FROM scores WHERE model_hash = ? AND smiles = ?',
+                (model_hash, smiles)
+            ).fetchall()
+            return dict(rows)
+        except sqlite3.Error as e:
+            print(f"Score cache read failed: {e}")
+            return {}
+
+    def put_many(self, model_hash: str, smiles: str, items: Iterable[Tuple[str, float]]) -> None:
+        """
+        写入一个化合物的多个得分
+
+        Args:
+            model_hash: 模型检查点哈希
+            smiles: 规范SMILES
+            items: (蛋白键, 得分) 序列
+        """
+        if not self.enabled:
+            return
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO scores (model_hash, smiles, protein_key, score) VALUES (?, ?, ?, ?)',
+                    ((model_hash, smiles, key, float(score)) for key, score in items)
+                )
+        except sqlite3.Error as e:
+            print(f"Score cache write failed: {e}")
+
+    def record(self, hits: int, misses: int) -> None:
+        """累计命中/未命中的配对数量"""
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+
+    def stats(self) -> dict:
+        """缓存命中统计"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0
+            }
+
+
+# 进程级共享缓存
+score_cache = ScoreCache()
@@ -1,9 +1,8 @@
 from flask import Blueprint, jsonify, request
-from services.target_service import TargetService
+from services.container import target_service
 from config import Config
 
 targets_bp = Blueprint('targets', __name__)
-target_service = TargetService()
 
 @targets_bp.route('/targets', methods=['GET'])
 def get_targets():
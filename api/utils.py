@@ -35,6 +35,12 @@ CHARPROTSET = {
 
 CHARPROTLEN = 25
 
+# 字节查找表：ASCII码 -> CHARPROTSET编码（大小写均可），其余字符为0（视为padding）
+CHARPROT_LUT = np.zeros(256, dtype=np.uint8)
+for _letter, _code in CHARPROTSET.items():
+    CHARPROT_LUT[ord(_letter)] = _code
+    CHARPROT_LUT[ord(_letter.lower())] = _code
+
 
 def set_seed(seed=1000):
     os.environ["PYTHONHASHSEED"] = str(seed)
@@ -79,3 +85,25 @@ def integer_label_protein(sequence, max_length=1200):
             # 上面可以捕获报错，但是太讨厌了，现在静默处理未知字符直接跳过
             continue
     return encoding
+
+
+def integer_label_proteins(sequences, max_length=1200, dtype=np.uint8):
+    """
+    Vectorized integer encoding for a list of protein string sequences.
+    Same semantics as integer_label_protein: letters are case-insensitive,
+    unknown (including non-ASCII) characters and positions past the end of
+    a sequence are encoded as padding (0).
+    Args:
+        sequences (list of str): Protein string sequences.
+        max_length: Maximum encoding length of input protein strings.
+        dtype: Output dtype, e.g. np.uint8 (compact) or np.int64.
+    Returns:
+        np.ndarray of shape (len(sequences), max_length).
+    """
+    buffer = bytearray(len(sequences) * max_length)
+    for idx, sequence in enumerate(sequences):
+        raw = sequence[:max_length].encode("ascii", errors="replace")
+        offset = idx * max_length
+        buffer[offset:offset + len(raw)] = raw
+    raw = np.frombuffer(buffer, dtype=np.uint8).reshape(len(sequences), max_length)
+    return CHARPROT_LUT[raw].astype(dtype, copy=False)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推理工作进程池
+
+    python -m api.worker [--processes N] [--threads T] [--config production]
+
+Web 进程配置 PREDICTION_EXECUTOR = 'worker' 后只把任务写入任务存储，
+由这里启动的工作进程认领并执行。每个工作进程固定 torch 线程数、常驻一个
+预热好的 DrugPredictor，推理与 Web 请求处理不再争用同一个进程（和 GIL），
+推理进程崩溃也不会影响网站；主进程负责在工作进程异常退出时重新启动它。
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import multiprocessing
+from datetime import datetime
+
+
+def _settings(config_name):
+    """配置类中的全部大写配置项"""
+    from config import config
+    config_class = config[config_name]
+    return {name: getattr(config_class, name) for name in dir(config_class) if name.isupper()}
+
+
+def release_orphaned_jobs(job_store):
+    """
+    处理所属进程已退出的任务
+
+    已认领但尚未开始的任务交还队列；运行中的任务标记为失败，
+    避免导致进程崩溃的任务被反复执行。
+
+    Returns:
+        int: 处理的任务数量
+    """
+    from api.job_store import ACTIVE_STATUSES, owner_alive
+
+    released = 0
+    for record in job_store.list_jobs(ACTIVE_STATUSES):
+        if record['owner'] is None or owner_alive(record['owner']):
+            continue
+        expected = {'status': record['status'], 'owner': record['owner']}
+        if record['status'] == 'queued':
+            released += job_store.update(record['job_id'], expected=expected, owner=None)
+        else:
+            released += job_store.update(record['job_id'], expected=expected, status='failed',
+                                         error='Inference worker exited unexpectedly',
+                                         end_time=datetime.now().isoformat())
+    return released
+
+
+def run_worker(config_name, modes, threads, poll_interval):
+    """
+    单个工作进程：固定 torch 线程数，预热一个 DrugPredictor，循环认领并执行任务
+
+    Args:
+        config_name: 配置名称（config.config 的键）
+        modes: 认领的任务类型
+        threads: torch intra-op 线程数
+        poll_interval: 队列为空时的轮询间隔（秒）
+    """
+    # 必须在导入 torch 之前设置
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['MKL_NUM_THREADS'] = str(threads)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # 由主进程统一处理 Ctrl+C
+
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+    from api import prediction
+    from api.job_results import job_result_store
+    from api.job_store import get_job_store, process_owner
+    from api.predictor import predictor_registry
+
+    settings = _settings(config_name)
+    prediction.configure_prediction(settings)
+    job_result_store.memory_budget = 0  # 结果只写入磁盘，由 Web 进程按需映射读取
+    job_result_store.require_persisted = True  # 写入失败时任务标记为失败，而不是留在本进程内存中
+    predictor_registry.max_resident = 1
+    prediction.warm_up_predictor(settings)
+
+    job_store = get_job_store()
+    owner = process_owner()
+    released = release_orphaned_jobs(job_store)
+    if released:
+        print(f"[{owner}] released {released} jobs left by exited workers", flush=True)
+    print(f"[{owner}] ready: modes={','.join(modes)} threads={threads}", flush=True)
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+    while not stopping:
+        record = job_store.claim_next(owner, modes)
+        if record is None:
+            time.sleep(poll_interval)
+            continue
+
+        job = prediction.PredictionJob.from_record(record)
+        try:
+            job.run()
+        except Exception as e:
+            job._fail(str(e))
+        print(f"[{owner}] job {job.job_id} ({job.mode}) {job.status}", flush=True)
+
+
+def main(argv=None):
+    """
+    主函数，按配置启动推理工作进程并在其异常退出时重新启动
+    """
+    parser = argparse.ArgumentParser(description='DrugBAN inference worker pool')
+    parser.add_argument('--config', default=os.getenv('FLASK_ENV', 'default'), help='配置名称（默认取 FLASK_ENV）')
+    parser.add_argument('--processes', type=int, help='工作进程数（默认 PREDICTION_WORKER_PROCESSES，未设置时按 CPU 核数）')
+    parser.add_argument('--threads', type=int, help='每个进程的 torch 线程数（默认 PREDICTION_WORKER_THREADS）')
+    args = parser.parse_args(argv)
+
+    settings = _settings(args.config)
+    if settings.get('PREDICTION_JOB_STORE', 'memory') == 'memory':
+        parser.error('推理工作进程需要可跨进程共享的任务存储（PREDICTION_JOB_STORE 不能为 memory）')
+    if not settings.get('PREDICTION_RESULTS_DIR'):
+        parser.error('推理工作进程需要配置 PREDICTION_RESULTS_DIR（结果通过磁盘交给 Web 进程）')
+
+    threads = max(1, args.threads or settings.get('PREDICTION_WORKER_THREADS') or 1)
+    processes = args.processes or settings.get('PREDICTION_WORKER_PROCESSES') or max(1, (os.cpu_count() or 1) // threads)
+    poll_interval = settings.get('PREDICTION_WORKER_POLL_INTERVAL', 0.5)
+
+    # 多于一个进程时保留一个只处理单化合物任务，批量任务不会占满所有进程
+    slots = [('single',) if processes > 1 and i == 0 else ('single', 'batch') for i in range(processes)]
+    context = multiprocessing.get_context('spawn')  # 不继承主进程的 torch/线程状态
+
+    def start(modes):
+        process = context.Process(target=run_worker, args=(args.config, modes, threads, poll_interval))
+        process.start()
+        return process
+
+    workers = [start(modes) for modes in slots]
+    print(f"Started {processes} inference workers ({threads} torch threads each)", flush=True)
+
+    stopping = []
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda signum, frame: stopping.append(signum))
+
+    while not stopping:
+        time.sleep(1)
+        for i, process in enumerate(workers):
+            if not process.is_alive() and not stopping:
+                print(f"Inference worker {process.pid} exited with code {process.exitcode}, restarting", flush=True)
+                workers[i] = start(slots[i])
+
+    # 工作进程收到 SIGTERM 后完成当前任务再退出
+    for process in workers:
+        process.terminate()
+    for process in workers:
+        process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,13 +26,24 @@ def create_app(config_name=None):
     # 注册全局模板变量
     register_template_globals(app)
     
+    # 配置服务层缓存（CACHE_ENABLED / CACHE_TIMEOUT）
+    from utils.cache import cache, init_cache
+    init_cache(app)
+    
+    # 加载共享数据（每个数据集只加载一次，注入到所有服务）
+    from services.container import init_data
+    init_data(app)
+    
     # 注册API蓝图
     from api.compounds import compounds_bp
     from api.targets import targets_bp
-    from api.prediction import prediction_bp
+    from api.prediction import prediction_bp, init_prediction
     app.register_blueprint(compounds_bp, url_prefix='/api')
     app.register_blueprint(targets_bp, url_prefix='/api')
     app.register_blueprint(prediction_bp)
+    
+    # 初始化预测任务调度器与共享模型（预热）
+    init_prediction(app)
     # 注册页面路由蓝图
     from views.pages import pages_bp
     from views.compounds import compounds_view_bp
@@ -54,6 +65,8 @@ def create_app(config_name=None):
                     'list': 'GET /api/compounds',
                     'detail': 'GET /api/compounds/<id>',
                     'search': 'POST /api/compounds/search',
+                    'similarity': 'GET|POST /api/compounds/similarity',
+                    'substructure': 'GET|POST /api/compounds/substructure',
                     'statistics': 'GET /api/compounds/statistics',
                     'targets': 'GET /api/compounds/<id>/targets'
                 },
@@ -74,7 +87,8 @@ def create_app(config_name=None):
             'status': 'healthy',
             'timestamp': datetime.now().isoformat(),
             'version': '2.0',
-            'database': 'operational'
+            'database': 'operational',
+            'cache': cache.stats()
         })
     
     # 错误处理
@@ -13,6 +13,7 @@ class Config:
         '三萜': os.path.join(DATA_DIR, 'santie'),
         '甾醇': os.path.join(DATA_DIR, 'zaichun')
     }
+    INTERACTION_STORE_DIR = os.path.join(DATA_DIR, 'cache', 'interactions')  # 编译后的预测交互表（python -m models.interaction_store）
     
     # 分页配置
     DEFAULT_PAGE_SIZE = 20
@@ -21,6 +22,28 @@ class Config:
     # 缓存配置
     CACHE_ENABLED = True
     CACHE_TIMEOUT = 300  # 5分钟
+    CACHE_MAX_ENTRIES = 1024  # 缓存条目数上限（LRU淘汰）
+    CACHE_MAX_BYTES = 64 * 1024 * 1024  # 缓存内存预算（估算值）
+    STATISTICS_SNAPSHOT_PATH = os.path.join(DATA_DIR, 'cache', 'statistics.json')  # 按数据版本持久化的统计快照
+    
+    # 预测模型配置
+    PREDICTOR_MODEL_PATH = None  # None 表示使用 api/result/best_model.pth
+    PREDICTOR_DEVICE = None  # None 表示自动选择（CUDA不可用时使用CPU）
+    PREDICTOR_MAX_RESIDENT = 2  # 常驻内存的模型检查点数量上限
+    PREDICTOR_WARMUP = True  # 应用启动时预加载模型
+    PREDICTION_MAX_CONCURRENT_JOBS = 2  # 同时运行的预测任务数量（调度器工作线程数）
+    PREDICTION_MAX_PRIORITY = 5  # 客户端可请求的任务优先级范围 -N..N，超出时截断（0 表示忽略客户端优先级）
+    DRUG_GRAPH_CACHE_BYTES = 64 * 1024 * 1024  # 药物分子图缓存的内存预算
+    PROTEIN_EMBEDDING_CACHE_DIR = os.path.join(DATA_DIR, 'cache', 'protein_embeddings')  # 靶点蛋白嵌入缓存
+    SCORE_CACHE_PATH = os.path.join(DATA_DIR, 'cache', 'scores.sqlite3')  # 持久化预测得分缓存
+    PREDICTION_RESULTS_DIR = os.path.join(DATA_DIR, 'cache', 'job_results')  # 已完成任务的结果文件（内存映射读取）
+    PREDICTION_RESULTS_MEMORY_BYTES = 256 * 1024 * 1024  # 内存中保留的任务结果总量上限，超出部分从磁盘读取
+    PREDICTION_JOB_STORE = 'sqlite'  # 任务存储：sqlite / memory / 'package.module:ClassName'
+    PREDICTION_JOB_STORE_PATH = os.path.join(DATA_DIR, 'cache', 'jobs.sqlite3')  # 多进程共享、重启后保留的任务记录
+    PREDICTION_EXECUTOR = 'thread'  # thread：在Web进程内运行任务；worker：由 python -m api.worker 进程运行
+    PREDICTION_WORKER_PROCESSES = None  # 推理工作进程数，None 表示 CPU核数 / 每进程线程数
+    PREDICTION_WORKER_THREADS = 1  # 每个推理工作进程的 torch intra-op 线程数
+    PREDICTION_WORKER_POLL_INTERVAL = 0.5  # 队列为空时工作进程的轮询间隔（秒）
     
     # API配置
     JSON_AS_ASCII = False
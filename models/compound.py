@@ -1,6 +1,18 @@
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Optional, Tuple
 import os
+import threading
+from utils.sorting import SortIndex
+from utils.search_index import NGramIndex
+from models.fingerprint_index import FingerprintIndex
+
+# 化合物列表中可排序的列（加载时预先计算排序索引）
+SORTABLE_COLUMNS = ['global_id', 'id', 'chinese_name', 'Name', 'compound_type',
+                    'Molecular_Formula', 'Molecular_Weight']
+
+# 参与全文搜索的列（加载时建立 n-gram 索引）
+SEARCH_FIELDS = ['chinese_name', 'Name', 'Molecular_Formula', 'SMILES']
 
 class Compound:
     """化合物数据模型"""
@@ -8,18 +20,58 @@ class Compound:
     def __init__(self, data_path: str):
         self.data_path = data_path
         self._df = None
+        self._row_by_global_id = {}  # global_id -> 行号
+        self._row_by_local_id = {}  # (compound_type, id) -> 行号
+        self._data_version = None
+        self._sort_index = None
+        self._search_index = None
+        self._fingerprint_index = None  # 首次化学检索时构建
+        self._fingerprint_lock = threading.Lock()
         self._load_data()
     
     def _load_data(self):
         """加载化合物数据"""
         if os.path.exists(self.data_path):
+            stat = os.stat(self.data_path)
+            self._data_version = (self.data_path, stat.st_mtime_ns, stat.st_size)
             self._df = pd.read_csv(self.data_path)
             # 确保global_id是整数类型
             if 'global_id' in self._df.columns:
                 self._df['global_id'] = self._df['global_id'].astype(int)
+            self._build_indexes()
+            self._sort_index = SortIndex(self._df, SORTABLE_COLUMNS)
+            self._search_index = NGramIndex(self._df, SEARCH_FIELDS)
         else:
             raise FileNotFoundError(f"数据文件不存在: {self.data_path}")
     
+    def __len__(self):
+        """化合物总数（未筛选）"""
+        return len(self._df)
+    
+    def data_version(self) -> tuple:
+        """已加载数据的版本（文件路径、修改时间、大小）"""
+        return self._data_version
+    
+    def _build_indexes(self):
+        """建立 global_id 与 (compound_type, id) 到行号的哈希索引（重复键保留第一行）"""
+        self._row_by_global_id = {}
+        if 'global_id' in self._df.columns:
+            for row, global_id in enumerate(self._df['global_id'].tolist()):
+                self._row_by_global_id.setdefault(global_id, row)
+        
+        self._row_by_local_id = {}
+        if 'compound_type' in self._df.columns and 'id' in self._df.columns:
+            keys = zip(self._df['compound_type'].tolist(), self._df['id'].tolist())
+            for row, key in enumerate(keys):
+                self._row_by_local_id.setdefault(key, row)
+    
+    def _take(self, rows: List[int]) -> pd.DataFrame:
+        """按行号批量取出化合物（一次 take），index 为请求中的位置，未找到的键被跳过"""
+        positions = [i for i, row in enumerate(rows) if row is not None]
+        result = self._df.take(np.asarray([rows[i] for i in positions], dtype=np.int64))
+        result.index = pd.Index(positions)
+        return result
+    
     def get_all(self, 
                 filters: Optional[Dict] = None,
                 search: Optional[str] = None,
@@ -37,39 +89,112 @@ class Compound:
         Returns:
             筛选后的DataFrame
         """
-        df = self._df.copy()
+        return self.get_rows(self.get_positions(filters, search, sort_by, sort_order))
+    
+    def get_positions(self,
+                      filters: Optional[Dict] = None,
+                      search: Optional[str] = None,
+                      sort_by: str = 'global_id',
+                      sort_order: str = 'asc') -> np.ndarray:
+        """
+        获取筛选、排序后的化合物行号（使用预计算的排序索引，不复制数据）
+        
+        Args:
+            filters: 筛选条件
+            search: 搜索关键词
+            sort_by: 排序字段
+            sort_order: 排序方向
+        
+        Returns:
+            np.ndarray: 行号，配合 get_rows 使用
+        """
+        df = self._df
+        mask = None
         
         # 应用筛选条件
         if filters:
             for key, value in filters.items():
                 if key in df.columns and value is not None:
                     if key == 'compound_type' and value != 'all':
-                        df = df[df[key] == value]
+                        type_mask = (df[key] == value).to_numpy()
+                        mask = type_mask if mask is None else mask & type_mask
                     # 可以添加更多筛选逻辑
         
-        # 应用搜索
+        # 应用搜索（在多个字段中做子串匹配，使用 n-gram 索引）
         if search:
-            # 在多个字段中搜索
-            search_fields = ['chinese_name', 'Name', 'Molecular_Formula', 'SMILES']
-            mask = False
-            for field in search_fields:
-                if field in df.columns:
-                    mask |= df[field].astype(str).str.contains(search, case=False, na=False)
-            df = df[mask]
+            search_mask = self._search_index.mask(search)
+            mask = search_mask if mask is None else mask & search_mask
         
         # 应用排序
         if sort_by in df.columns:
-            ascending = (sort_order == 'asc')
-            df = df.sort_values(by=sort_by, ascending=ascending)
+            return self._sort_index.order(sort_by, sort_order == 'asc', mask)
+        positions = np.arange(len(df))
+        return positions if mask is None else positions[mask]
+    
+    def search(self, query: str, fields: Optional[List[str]] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        按相关性搜索化合物（完全匹配 > 前缀匹配 > 子串匹配，同分按 global_id 升序）
+        
+        Args:
+            query: 搜索关键词
+            fields: 限定搜索的列，默认为 SEARCH_FIELDS
+            limit: 最多返回的数量
+        
+        Returns:
+            排序后的DataFrame
+        """
+        order = self._sort_index.order('global_id') if 'global_id' in self._df.columns else None
+        positions = self._search_index.ranked(query, fields, order)
+        return self.get_rows(positions[:limit])
+    
+    def fingerprint_index(self) -> FingerprintIndex:
+        """化合物库的分子指纹索引（首次调用时解析全部SMILES）"""
+        with self._fingerprint_lock:
+            if self._fingerprint_index is None:
+                smiles = self._df['SMILES'].tolist() if 'SMILES' in self._df.columns else [None] * len(self._df)
+                self._fingerprint_index = FingerprintIndex(smiles)
+            return self._fingerprint_index
+    
+    def similarity_search(self, smiles: str, threshold: float = 0.5, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Tanimoto 相似性检索（Morgan 指纹）
         
+        Args:
+            smiles: 查询分子的SMILES
+            threshold: 最低相似度
+            limit: 最多返回的数量
+        
+        Returns:
+            按相似度降序的DataFrame，带 similarity 列
+        """
+        hits = self.fingerprint_index().similarity(smiles, threshold, limit)
+        df = self.get_rows([row for row, _ in hits]).copy()
+        df['similarity'] = [score for _, score in hits]
         return df
     
+    def substructure_search(self, smarts: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        SMARTS 子结构检索
+        
+        Args:
+            smarts: 子结构SMARTS
+            limit: 最多返回的数量
+        
+        Returns:
+            匹配的化合物DataFrame
+        """
+        return self.get_rows(self.fingerprint_index().substructure(smarts, limit))
+    
+    def get_rows(self, positions) -> pd.DataFrame:
+        """按行号取出化合物"""
+        return self._df.iloc[positions]
+    
     def get_by_id(self, compound_id: int) -> Optional[Dict]:
         """根据ID获取化合物详情"""
-        result = self._df[self._df['global_id'] == compound_id]
-        if not result.empty:
+        row = self._row_by_global_id.get(compound_id)
+        if row is not None:
             # --- START: 核心修改 ---
-            compound_dict = result.iloc[0].to_dict()
+            compound_dict = self._df.iloc[row].to_dict()
             
             # 定义键名映射规则：将带连字符的键名改为带下划线的
             rename_map = {
@@ -87,10 +212,40 @@ class Compound:
             # --- END: 核心修改 ---
         return None
     
+    def get_by_local_id(self, compound_type: str, local_id: int) -> Optional[Dict]:
+        """根据化合物类型和本地ID获取化合物"""
+        row = self._row_by_local_id.get((compound_type, local_id))
+        if row is None:
+            return None
+        return self._df.iloc[row].to_dict()
+    
+    def get_many(self, global_ids: List[int]) -> pd.DataFrame:
+        """
+        根据多个global_id批量获取化合物
+        
+        Args:
+            global_ids: global_id列表
+        
+        Returns:
+            DataFrame: 找到的化合物，index 为其在 global_ids 中的位置
+        """
+        return self._take([self._row_by_global_id.get(global_id) for global_id in global_ids])
+    
+    def get_many_by_local_id(self, keys: List[Tuple[str, int]]) -> pd.DataFrame:
+        """
+        根据多个 (化合物类型, 本地ID) 批量获取化合物
+        
+        Args:
+            keys: (compound_type, id) 列表
+        
+        Returns:
+            DataFrame: 找到的化合物，index 为其在 keys 中的位置
+        """
+        return self._take([self._row_by_local_id.get(key) for key in keys])
+    
     def count(self, filters: Optional[Dict] = None, search: Optional[str] = None) -> int:
         """获取符合条件的化合物总数"""
-        df = self.get_all(filters=filters, search=search)
-        return len(df)
+        return len(self.get_positions(filters=filters, search=search))
     
     def get_statistics(self) -> Dict:
         """获取统计信息"""
@@ -0,0 +1,127 @@
+# 依赖 numpy >= 2.0（按位 popcount 使用 np.bitwise_count）
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from rdkit import Chem, DataStructs
+from rdkit.Chem import rdFingerprintGenerator
+from rdkit.rdBase import BlockLogs
+
+
+def _pack_bits(bits: np.ndarray) -> np.ndarray:
+    """将0/1位数组打包为 uint64 行（便于按字做与运算和 popcount）"""
+    return np.packbits(bits.astype(np.uint8), axis=-1).view(np.uint64)
+
+
+def _pattern_bits(mol, fp_size: int) -> np.ndarray:
+    """子结构筛选用的 RDKit pattern fingerprint（0/1位数组）"""
+    bits = np.zeros(fp_size, dtype=np.uint8)
+    DataStructs.ConvertToNumpyArray(Chem.PatternFingerprint(mol, fpSize=fp_size), bits)
+    return bits
+
+
+class FingerprintIndex:
+    """
+    化合物库的分子指纹索引
+
+    预先计算每个化合物的 Morgan 指纹（相似性检索）与 pattern 指纹（子结构预筛选），
+    以打包的 uint64 位数组保存。相似性检索对整个库一次性按位与并 popcount 计算
+    Tanimoto 系数；子结构检索先用 pattern 指纹排除不可能匹配的分子，
+    只对剩余候选做 HasSubstructMatch 校验。
+    """
+
+    def __init__(self, smiles: Sequence, radius: int = 2, fp_size: int = 2048):
+        """
+        Args:
+            smiles: 化合物库的 SMILES（位置即行号，无法解析的条目不参与检索）
+            radius: Morgan 指纹半径
+            fp_size: 指纹位数（需为64的倍数）
+
+        Raises:
+            RuntimeError: numpy 版本低于 2.0
+        """
+        if not hasattr(np, 'bitwise_count'):
+            raise RuntimeError(f"FingerprintIndex 需要 numpy >= 2.0（当前 {np.__version__}）")
+        self.radius = radius
+        self.fp_size = fp_size
+        self._generator = rdFingerprintGenerator.GetMorganGenerator(radius=radius, fpSize=fp_size)
+
+        # 解析化合物库时屏蔽RDKit警告
+        block_logs = BlockLogs()
+        self._mols = []
+        morgan = np.zeros((len(smiles), fp_size), dtype=np.uint8)
+        pattern = np.zeros((len(smiles), fp_size), dtype=np.uint8)
+        for row, value in enumerate(smiles):
+            mol = Chem.MolFromSmiles(value) if isinstance(value, str) and value else None
+            self._mols.append(mol)
+            if mol is not None:
+                morgan[row] = self._generator.GetFingerprintAsNumPy(mol)
+                pattern[row] = _pattern_bits(mol, fp_size)
+        del block_logs
+
+        self.valid = np.array([mol is not None for mol in self._mols], dtype=bool)
+        self._morgan = _pack_bits(morgan)
+        self._morgan_counts = np.bitwise_count(self._morgan).sum(axis=1).astype(np.int32)
+        self._pattern = _pack_bits(pattern)
+
+    def __len__(self):
+        return len(self._mols)
+
+    def similarity(self, query_smiles: str, threshold: float = 0.0, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Tanimoto 相似性检索
+
+        Args:
+            query_smiles: 查询分子的 SMILES
+            threshold: 最低相似度（截断到 [0, 1]）
+            limit: 最多返回的数量
+
+        Returns:
+            list: (行号, 相似度)，按相似度降序
+
+        Raises:
+            ValueError: SMILES无法解析
+        """
+        mol = Chem.MolFromSmiles(query_smiles) if query_smiles else None
+        if mol is None:
+            raise ValueError(f"无效的SMILES字符串: {query_smiles}")
+
+        query = _pack_bits(self._generator.GetFingerprintAsNumPy(mol))
+        common = np.bitwise_count(self._morgan & query).sum(axis=1)
+        union = self._morgan_counts + int(np.bitwise_count(query).sum()) - common
+        scores = np.divide(common, union, out=np.zeros(len(union), dtype=np.float64), where=union > 0)
+
+        threshold = min(max(threshold, 0.0), 1.0)
+        rows = np.flatnonzero((scores >= threshold) & self.valid)
+        rows = rows[np.argsort(-scores[rows], kind='stable')][:limit]
+        return [(int(row), float(scores[row])) for row in rows]
+
+    def substructure(self, smarts: str, limit: Optional[int] = None) -> List[int]:
+        """
+        SMARTS 子结构检索
+
+        Args:
+            smarts: 子结构 SMARTS（也接受 SMILES）
+            limit: 最多返回的数量
+
+        Returns:
+            list: 匹配的行号（库中顺序）
+
+        Raises:
+            ValueError: SMARTS无法解析
+        """
+        pattern = Chem.MolFromSmarts(smarts) if smarts else None
+        if pattern is None:
+            raise ValueError(f"无效的SMARTS字符串: {smarts}")
+        pattern.UpdatePropertyCache(strict=False)
+
+        # pattern 指纹预筛选：查询的每一位都必须出现在分子指纹中
+        query = _pack_bits(_pattern_bits(pattern, self.fp_size))
+        candidates = np.flatnonzero(((self._pattern & query) == query).all(axis=1) & self.valid)
+
+        matches = []
+        for row in candidates.tolist():
+            if self._mols[row].HasSubstructMatch(pattern):
+                matches.append(row)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
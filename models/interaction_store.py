@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config import Config
+
+# 化合物类型 -> 预测结果文件名前缀（{prefix}{id}.xlsx）
+COMPOUND_TYPE_PREFIXES = {
+    '挥发油': 'huifayou',
+    '三萜': 'santie',
+    '甾醇': 'zaichun'
+}
+
+STORE_FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+FILE_CHECK_INTERVAL = 2.0  # 目录未变化时重新 stat 源文件的最短间隔（秒）
+
+
+def _list_prediction_files(prediction_dirs: Dict[str, str]) -> List[Dict]:
+    """列出所有预测结果文件及其修改时间/大小（用于判断编译存储是否过期）"""
+    files = []
+    for compound_type, dir_path in prediction_dirs.items():
+        if not os.path.exists(dir_path):
+            continue
+        for file in os.listdir(dir_path):
+            if not file.endswith('.xlsx'):
+                continue
+            stat = os.stat(os.path.join(dir_path, file))
+            files.append({
+                'compound_type': compound_type,
+                'file': file,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size
+            })
+    return files
+
+
+def _directory_signature(prediction_dirs: Dict[str, str]) -> tuple:
+    """预测结果目录的修改时间签名（目录中增删、重命名文件时变化）"""
+    signature = []
+    for compound_type, dir_path in prediction_dirs.items():
+        mtime_ns = os.stat(dir_path).st_mtime_ns if os.path.exists(dir_path) else None
+        signature.append((compound_type, dir_path, mtime_ns))
+    return tuple(signature)
+
+
+def _files_digest(files: List[Dict]) -> str:
+    """源文件列表（类型、文件名、修改时间、大小）的摘要"""
+    entries = sorted((f['compound_type'], f['file'], f['mtime_ns'], f['size']) for f in files)
+    return hashlib.sha1(json.dumps(entries, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+_file_signatures = {}  # 预测结果目录 -> (目录签名, 检查时间, 源文件摘要)
+
+
+def prediction_files_signature(prediction_dirs: Optional[Dict[str, str]] = None) -> str:
+    """
+    预测结果xlsx的签名：每个源文件的修改时间与大小的摘要
+
+    目录有增删、重命名时立即重新 stat 全部源文件；目录未变化时最多每
+    FILE_CHECK_INTERVAL 秒 stat 一次，覆盖写入已有文件也会在该间隔内被发现。
+
+    Args:
+        prediction_dirs: 化合物类型 -> 预测结果目录，默认为 Config.PREDICTION_DIRS
+    """
+    prediction_dirs = prediction_dirs or Config.PREDICTION_DIRS
+    key = tuple(sorted(prediction_dirs.items()))
+    directories = _directory_signature(prediction_dirs)
+    now = time.monotonic()
+    cached = _file_signatures.get(key)
+    if cached is not None and cached[0] == directories and now - cached[1] < FILE_CHECK_INTERVAL:
+        return cached[2]
+    signature = _files_digest(_list_prediction_files(prediction_dirs))
+    _file_signatures[key] = (directories, now, signature)
+    return signature
+
+
+def _json_value(value):
+    """将词表中的值转换为可JSON序列化的类型"""
+    if isinstance(value, (str, bool, int, float)):
+        return value
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def build_gene_postings(codes: np.ndarray, scores, num_codes: int):
+    """
+    按From编码构建倒排表，每段内按得分降序（缺失得分排在最后）
+
+    Args:
+        codes: 每行的From编码（-1 表示缺失，不进入倒排表）
+        scores: 每行的得分
+        num_codes: From词表大小
+
+    Returns:
+        tuple: (order, offsets)，编码 c 的行号为 order[offsets[c]:offsets[c + 1]]
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    scores = np.asarray(pd.to_numeric(pd.Series(scores), errors='coerce'), dtype=np.float64)
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    order = np.lexsort((-scores, codes))
+    order = order[codes[order] >= 0]
+    offsets = np.searchsorted(codes[order], np.arange(num_codes + 1))
+    return order.astype(np.int64), offsets.astype(np.int64)
+
+
+def compile_interaction_store(prediction_dirs: Optional[Dict[str, str]] = None,
+                              store_dir: Optional[str] = None) -> Dict:
+    """
+    将逐化合物的预测结果xlsx编译为列式交互表（每列一个 .npy 文件）
+
+    数值列原样保存，其余列保存为 int32 类别编码并在 meta.json 中记录词表。
+    额外写入 compound_type / compound_id / source_file 列、每个源文件的
+    行范围、原始列顺序和修改时间，以及 From -> 行号的倒排索引。
+    meta.json 最后原子写入，读取方不会看到半成品。
+
+    Args:
+        prediction_dirs: 化合物类型 -> 预测结果目录，默认为 Config.PREDICTION_DIRS
+        store_dir: 存储目录，默认为 Config.INTERACTION_STORE_DIR
+
+    Returns:
+        dict: 文件数、行数与列名
+    """
+    prediction_dirs = prediction_dirs or Config.PREDICTION_DIRS
+    store_dir = store_dir or Config.INTERACTION_STORE_DIR
+    os.makedirs(store_dir, exist_ok=True)
+
+    files = _list_prediction_files(prediction_dirs)
+    frames = []
+    start = 0
+    for entry in files:
+        path = os.path.join(prediction_dirs[entry['compound_type']], entry['file'])
+        try:
+            df = pd.read_excel(path)
+        except Exception as e:
+            print(f"Error reading {entry['file']}: {str(e)}")
+            df = pd.DataFrame()
+
+        prefix = COMPOUND_TYPE_PREFIXES.get(entry['compound_type'], '')
+        entry['columns'] = [[str(col), str(dtype)] for col, dtype in df.dtypes.items()]
+        entry['start'] = start
+        entry['stop'] = start + len(df)
+        start = entry['stop']
+
+        df.columns = [str(col) for col in df.columns]
+        df['compound_type'] = entry['compound_type']
+        df['source_file'] = entry['file']
+        df['compound_id'] = pd.to_numeric(
+            entry['file'].replace(prefix, '').replace('.xlsx', ''), errors='coerce')
+        frames.append(df)
+
+    combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    build_id = uuid.uuid4().hex[:12]
+    columns = {}
+    for col in combined.columns:
+        series = combined[col]
+        filename = f"{build_id}_{len(columns)}.npy"
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            np.save(os.path.join(store_dir, filename), series.to_numpy())
+            columns[col] = {'file': filename, 'kind': 'numeric'}
+        else:
+            codes, uniques = pd.factorize(series)
+            np.save(os.path.join(store_dir, filename), codes.astype(np.int32))
+            columns[col] = {
+                'file': filename,
+                'kind': 'categorical',
+                'categories': [_json_value(v) for v in uniques]
+            }
+
+    postings = None
+    if columns.get('From', {}).get('kind') == 'categorical':
+        codes = np.load(os.path.join(store_dir, columns['From']['file']))
+        scores = combined['score'] if 'score' in combined.columns else np.zeros(len(combined))
+        order, offsets = build_gene_postings(codes, scores, len(columns['From']['categories']))
+        postings = {'order': f"{build_id}_postings_order.npy", 'offsets': f"{build_id}_postings_offsets.npy"}
+        np.save(os.path.join(store_dir, postings['order']), order)
+        np.save(os.path.join(store_dir, postings['offsets']), offsets)
+
+    meta = {
+        'version': STORE_FORMAT_VERSION,
+        'build_id': build_id,
+        'rows': len(combined),
+        'prediction_dirs': prediction_dirs,
+        'columns': columns,
+        'files': files,
+        'gene_postings': postings
+    }
+    meta_path = os.path.join(store_dir, META_FILE)
+    tmp_path = f"{meta_path}.{build_id}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, meta_path)
+
+    # 删除旧版本的列文件
+    for name in os.listdir(store_dir):
+        if name.endswith('.npy') and not name.startswith(f"{build_id}_"):
+            try:
+                os.remove(os.path.join(store_dir, name))
+            except OSError:
+                pass
+
+    return {
+        'files': len(files),
+        'rows': len(combined),
+        'columns': list(columns)
+    }
+
+
+class InteractionStore:
+    """
+    编译后的预测交互表（只读）
+
+    数值列以内存映射方式读取（零拷贝），类别列通过编码在词表上 take 还原。
+    """
+
+    def __init__(self, store_dir: str, meta: Dict, meta_mtime: float):
+        """
+        Args:
+            store_dir: 存储目录
+            meta: meta.json 内容
+            meta_mtime: 加载时 meta.json 的修改时间
+        """
+        self.store_dir = store_dir
+        self.meta = meta
+        self.meta_mtime = meta_mtime
+        self.num_rows = meta['rows']
+        self._columns = {}
+        for col, info in meta['columns'].items():
+            data = np.load(os.path.join(store_dir, info['file']), mmap_mode='r')
+            categories = None
+            if info['kind'] == 'categorical':
+                # 末尾追加 NaN，编码 -1 即对应缺失值
+                categories = np.empty(len(info['categories']) + 1, dtype=object)
+                categories[:-1] = info['categories']
+                categories[-1] = np.nan
+            self._columns[col] = (data, categories)
+        self._gene_postings = None
+        if meta.get('gene_postings'):
+            self._gene_postings = tuple(
+                np.load(os.path.join(store_dir, meta['gene_postings'][name]), mmap_mode='r')
+                for name in ('order', 'offsets')
+            )
+        self._file_ranges = {
+            (entry['compound_type'], entry['file']): entry for entry in meta['files']
+        }
+        self._files_signature = _files_digest(meta['files'])  # 编译时的源文件签名
+
+    def __len__(self):
+        return self.num_rows
+
+    def is_current(self, prediction_dirs: Dict[str, str]) -> bool:
+        """编译时的源xlsx（文件名、修改时间、大小）是否与目录中的文件一致，见 prediction_files_signature"""
+        if self.meta['prediction_dirs'] != prediction_dirs:
+            return False
+        return prediction_files_signature(prediction_dirs) == self._files_signature
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """读取一列（数值列返回内存映射视图）"""
+        data, categories = self._columns[name]
+        data = data[start:stop]
+        if categories is None:
+            return data
+        return categories[data]
+
+    def codes(self, name: str) -> np.ndarray:
+        """类别列的原始编码（内存映射，-1 表示缺失值）"""
+        return self._columns[name][0]
+
+    def categories(self, name: str) -> Optional[np.ndarray]:
+        """类别列的词表（不含缺失值），数值列返回 None"""
+        categories = self._columns[name][1]
+        return categories[:-1] if categories is not None else None
+
+    def gene_postings(self):
+        """持久化的 From 倒排表 (order, offsets)，未编译时为 None"""
+        return self._gene_postings
+
+    def to_dataframe(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """将整张表（或部分列）转换为 DataFrame"""
+        columns = columns or self.columns
+        return pd.DataFrame({col: self.column(col) for col in columns}, copy=False)
+
+    def file_frame(self, compound_type: str, file: str) -> Optional[pd.DataFrame]:
+        """
+        还原单个预测结果文件的内容（原始列顺序与数据类型）
+
+        Args:
+            compound_type: 化合物类型
+            file: 文件名，如 huifayou1.xlsx
+
+        Returns:
+            DataFrame: 与 pd.read_excel 读取该文件等价的数据，文件不存在返回 None
+        """
+        entry = self._file_ranges.get((compound_type, file))
+        if entry is None:
+            return None
+
+        data = {}
+        for col, dtype in entry['columns']:
+            values = self.column(col, entry['start'], entry['stop'])
+            series = pd.Series(values, name=col)
+            if str(series.dtype) != dtype:
+                try:
+                    series = series.astype(dtype)
+                except (TypeError, ValueError):
+                    pass
+            data[col] = series
+        return pd.DataFrame(data, columns=[col for col, _ in entry['columns']])
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def load_interaction_store(prediction_dirs: Optional[Dict[str, str]] = None,
+                           store_dir: Optional[str] = None) -> Optional[InteractionStore]:
+    """
+    加载编译后的交互表；存储不存在、格式不符或任一源xlsx有增删改时返回 None
+    （源文件的修改时间与大小按 FILE_CHECK_INTERVAL 节流检查，见 prediction_files_signature）
+
+    Args:
+        prediction_dirs: 化合物类型 -> 预测结果目录，默认为 Config.PREDICTION_DIRS
+        store_dir: 存储目录，默认为 Config.INTERACTION_STORE_DIR
+
+    Returns:
+        InteractionStore: 共享的只读实例，过期时为 None（调用方应回退到读取xlsx）
+    """
+    prediction_dirs = prediction_dirs or Config.PREDICTION_DIRS
+    store_dir = os.path.realpath(store_dir or Config.INTERACTION_STORE_DIR)
+    meta_path = os.path.join(store_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+
+    meta_mtime = os.path.getmtime(meta_path)
+    with _stores_lock:
+        store = _stores.get(store_dir)
+        if store is None or store.meta_mtime != meta_mtime:
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if meta.get('version') != STORE_FORMAT_VERSION:
+                    return None
+                store = InteractionStore(store_dir, meta, meta_mtime)
+            except Exception as e:
+                print(f"无法读取预测交互存储 {store_dir}: {e}")
+                return None
+            _stores[store_dir] = store
+
+    return store if store.is_current(prediction_dirs) else None
+
+
+def main():
+    """
+    主函数，将 Config.PREDICTION_DIRS 下的预测结果编译到 Config.INTERACTION_STORE_DIR
+    """
+    stats = compile_interaction_store()
+    print(f"预测结果文件: {stats['files']}")
+    print(f"交互记录: {stats['rows']}")
+    print(f"列: {', '.join(stats['columns'])}")
+    print(f"输出目录: {Config.INTERACTION_STORE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,47 @@
+import numpy as np
 import pandas as pd
 import os
 import re
+import threading
 from typing import List, Dict, Optional, Set
 from config import Config
+from models.interaction_store import (COMPOUND_TYPE_PREFIXES, build_gene_postings, load_interaction_store,
+                                     prediction_files_signature)
+
+
+def _first_positions(values: pd.Series) -> Dict:
+    """每个取值第一次出现的行号（缺失值除外）"""
+    positions = {}
+    for position, value in enumerate(values.tolist()):
+        if not pd.isna(value) and value not in positions:
+            positions[value] = position
+    return positions
+
 
 class Target:
     """靶点数据模型"""
     
-    def __init__(self, prediction_dirs: Dict[str, str], targets_file: str = None):
+    def __init__(self, prediction_dirs: Dict[str, str], targets_file: str = None, store_dir: str = None):
         self.prediction_dirs = prediction_dirs
         self.targets_file = targets_file or Config.TARGETS_FILE
+        self.store_dir = store_dir or Config.INTERACTION_STORE_DIR  # 编译后的预测交互表
         self._targets_df = None
         self._gene_name_to_symbol_map = {}  # From值到gene_symbol的映射
+        self._symbol_to_row = {}  # gene_symbol -> 靶点基础信息中的行号
+        self._target_index = None  # 预测结果的内存索引，按目录修改时间失效
+        self._index_lock = threading.Lock()
         self._load_target_info()
     
     def _load_target_info(self):
         """加载靶点基础信息并建立名称映射"""
+        self._targets_file_mtime = None
         if os.path.exists(self.targets_file):
+            self._targets_file_mtime = os.path.getmtime(self.targets_file)
             self._targets_df = pd.read_excel(self.targets_file)
             # 建立基因名称到基因符号的映射
             self._build_gene_name_mapping()
+            if 'gene_symbol' in self._targets_df.columns:
+                self._symbol_to_row = _first_positions(self._targets_df['gene_symbol'])
         else:
             self._targets_df = pd.DataFrame()
     
@@ -44,13 +66,7 @@ class Target:
     
     def get_compound_targets(self, compound_type: str, compound_id: int) -> Optional[pd.DataFrame]:
         """获取特定化合物的预测靶点"""
-        type_map = {
-            '挥发油': 'huifayou',
-            '三萜': 'santie',
-            '甾醇': 'zaichun'
-        }
-        
-        dir_name = type_map.get(compound_type)
+        dir_name = COMPOUND_TYPE_PREFIXES.get(compound_type)
         if not dir_name:
             return None
         
@@ -58,8 +74,13 @@ class Target:
         filename = f'{dir_name}{compound_id}.xlsx'
         filepath = os.path.join(self.prediction_dirs[compound_type], filename)
         
-        if os.path.exists(filepath):
+        # 优先从编译后的交互表读取，存储过期时回退到xlsx
+        store = load_interaction_store(self.prediction_dirs, self.store_dir)
+        df = store.file_frame(compound_type, filename) if store is not None else None
+        if df is None and os.path.exists(filepath):
             df = pd.read_excel(filepath)
+        
+        if df is not None:
             # 如果有靶点基础信息，进行关联
             if not self._targets_df.empty and 'From' in df.columns:
                 # 添加标准化的基因符号列
@@ -86,116 +107,6 @@ class Target:
         
         return enriched_df
     
-    def get_all_unique_targets(self) -> pd.DataFrame:
-        """Enhanced: Get all unique targets with proper column handling"""
-        all_targets = []
-        
-        # From all prediction files collect targets
-        for compound_type, dir_path in self.prediction_dirs.items():
-            if os.path.exists(dir_path):
-                for file in os.listdir(dir_path):
-                    if file.endswith('.xlsx'):
-                        try:
-                            df = pd.read_excel(os.path.join(dir_path, file))
-                            if not df.empty and 'From' in df.columns:
-                                df['source_type'] = compound_type
-                                df['source_file'] = file
-                                # Add standardized gene_symbol
-                                df['gene_symbol'] = df['From'].apply(self._get_gene_symbol_from_name)
-                                
-                                # Ensure score column is numeric
-                                if 'score' in df.columns:
-                                    df['score'] = pd.to_numeric(df['score'], errors='coerce')
-                                
-                                all_targets.append(df)
-                        except Exception as e:
-                            print(f"Error reading {file}: {str(e)}")
-                            continue
-        
-        if all_targets:
-            combined_df = pd.concat(all_targets, ignore_index=True)
-            
-            # Only process records with valid gene_symbol
-            valid_targets = combined_df[combined_df['gene_symbol'].notna()]
-            
-            if valid_targets.empty:
-                return pd.DataFrame()
-            
-            # Group by gene_symbol and calculate statistics
-            target_stats = valid_targets.groupby('gene_symbol').agg({
-                'score': ['mean', 'max', 'min', 'count'],
-                'source_type': lambda x: list(set(x)),
-                'source_file': 'nunique',  # Number of unique compounds
-                'From': 'first'  # Keep original From value
-            }).reset_index()
-            
-            # Flatten multi-level columns with clean names
-            target_stats.columns = [
-                'gene_symbol', 'avg_score', 'max_score', 'min_score', 
-                'prediction_count', 'compound_types', 'compound_count', 'from_name'
-            ]
-            
-            # Clean up data types
-            numeric_cols = ['avg_score', 'max_score', 'min_score', 'prediction_count', 'compound_count']
-            for col in numeric_cols:
-                target_stats[col] = pd.to_numeric(target_stats[col], errors='coerce').fillna(0)
-            
-            # CRITICAL FIX: Merge with base target info using suffixes to avoid conflicts
-            if not self._targets_df.empty:
-                # Prepare base dataframe columns to avoid conflicts
-                base_df = self._targets_df.copy()
-                
-                # Only keep essential columns from base data to avoid conflicts
-                base_essential_cols = [
-                    'gene_symbol', 'gene_name', 'species', 'uniprot_id', 
-                    'protein_names', 'function_cc', 'subcellular_location_cc'
-                ]
-                
-                # Filter to only existing columns
-                base_available_cols = [col for col in base_essential_cols if col in base_df.columns]
-                base_df = base_df[base_available_cols]
-                
-                # Merge WITHOUT creating duplicate columns
-                target_stats = pd.merge(
-                    target_stats, 
-                    base_df, 
-                    on='gene_symbol', 
-                    how='left',
-                    suffixes=('', '_base')  # Our calculated data gets no suffix, base data gets _base
-                )
-                
-                # Fill missing gene_name with gene_symbol
-                if 'gene_name' not in target_stats.columns:
-                    target_stats['gene_name'] = target_stats['gene_symbol']
-                else:
-                    target_stats['gene_name'] = target_stats['gene_name'].fillna(target_stats['gene_symbol'])
-            else:
-                # If no base info, create essential columns
-                target_stats['gene_name'] = target_stats['gene_symbol']
-                target_stats['species'] = 'Homo sapiens'
-            
-            # Ensure all required columns exist with proper defaults
-            required_columns = {
-                'uniprot_id': '',
-                'protein_names': '',
-                'function_cc': '',
-                'species': 'Homo sapiens'
-            }
-            
-            for col, default_val in required_columns.items():
-                if col not in target_stats.columns:
-                    target_stats[col] = default_val
-                else:
-                    # Fill NaN values with defaults
-                    target_stats[col] = target_stats[col].fillna(default_val)
-            
-            print(f"DEBUG: Final columns after merge: {target_stats.columns.tolist()}")
-            print(f"DEBUG: Sample merged data: prediction_count = {target_stats.iloc[0]['prediction_count'] if not target_stats.empty else 'NO DATA'}")
-            
-            return target_stats
-        
-        return pd.DataFrame()
-    
     def get_target_by_gene_name(self, gene_name: str) -> Optional[Dict]:
         """根据基因名获取靶点详情（支持基因符号和别名）"""
         # 首先尝试将输入的名称转换为标准的gene_symbol
@@ -206,26 +117,24 @@ class Target:
             gene_symbol = gene_name
         
         # 从基础信息中查找
-        if not self._targets_df.empty and 'gene_symbol' in self._targets_df.columns:
-            target = self._targets_df[self._targets_df['gene_symbol'] == gene_symbol]
-            if not target.empty:
-                target_dict = target.iloc[0].to_dict()
-                # 添加映射信息
-                target_dict['queried_name'] = gene_name
-                target_dict['mapped_symbol'] = gene_symbol
-                return target_dict
+        position = self._symbol_to_row.get(gene_symbol)
+        if position is not None:
+            target_dict = self._targets_df.iloc[position].to_dict()
+            # 添加映射信息
+            target_dict['queried_name'] = gene_name
+            target_dict['mapped_symbol'] = gene_symbol
+            return target_dict
         
         # 如果基础信息中没有，尝试从预测数据中查找
-        all_targets = self.get_all_unique_targets()
-        if not all_targets.empty:
-            target = all_targets[all_targets['gene_symbol'] == gene_symbol]
-            if not target.empty:
-                return target.iloc[0].to_dict()
+        index = self._get_target_index()
+        position = index['targets_by_symbol'].get(gene_symbol)
+        if position is not None:
+            return index['targets'].iloc[position].to_dict()
         
         return None
     
     def get_compounds_by_target(self, gene_name: str) -> List[Dict]:
-        """获取预测到某个靶点的所有化合物（支持基因符号和别名）"""
+        """获取预测到某个靶点的所有化合物（支持基因符号和别名），按得分从高到低排列"""
         compounds = []
         
         # 获取标准的gene_symbol
@@ -233,134 +142,277 @@ class Target:
         if not gene_symbol:
             gene_symbol = gene_name
         
-        for compound_type, dir_path in self.prediction_dirs.items():
-            if os.path.exists(dir_path):
-                type_map = {
-                    '挥发油': 'huifayou',
-                    '三萜': 'santie',
-                    '甾醇': 'zaichun'
-                }
-                prefix = type_map[compound_type]
-                
-                for file in os.listdir(dir_path):
-                    if file.endswith('.xlsx'):
-                        # 从文件名提取化合物ID
-                        compound_id = file.replace(prefix, '').replace('.xlsx', '')
-                        
-                        try:
-                            df = pd.read_excel(os.path.join(dir_path, file))
-                            if not df.empty and 'From' in df.columns:
-                                # 添加标准化的基因符号
-                                df['gene_symbol'] = df['From'].apply(self._get_gene_symbol_from_name)
-                                
-                                # 查找匹配的靶点（支持原始From值和映射后的gene_symbol）
-                                target_rows = df[
-                                    (df['From'] == gene_name) | 
-                                    (df['gene_symbol'] == gene_symbol)
-                                ]
-                                
-                                if not target_rows.empty:
-                                    for _, row in target_rows.iterrows():
-                                        compounds.append({
-                                            'compound_id': int(compound_id),
-                                            'compound_type': compound_type,
-                                            'score': float(row.get('score', 0)),
-                                            'from_name': row.get('From', ''),
-                                            'gene_name_full': row.get('Gene Name', ''),
-                                            'source_file': file
-                                        })
-                        except Exception as e:
-                            print(f"Error reading {file}: {str(e)}")
-                            continue
+        index = self._get_target_index()
+        rows, postings = index['rows'], index['postings']
+        if postings is None:
+            return compounds
+        
+        # 匹配原始From值，以及映射到同一gene_symbol的所有别名
+        codes = set(postings['codes_by_symbol'].get(gene_symbol, ()))
+        code = postings['codes_by_name'].get(gene_name)
+        if code is not None:
+            codes.add(code)
+        if not codes:
+            return compounds
+        
+        order, offsets = postings['order'], postings['offsets']
+        row_ids = np.concatenate([order[offsets[c]:offsets[c + 1]] for c in sorted(codes)])
+        scores = rows['score'].to_numpy(dtype=np.float64) if 'score' in rows.columns else np.zeros(len(rows))
+        if len(codes) > 1:
+            row_ids = row_ids[np.argsort(-scores[row_ids], kind='stable')]
+        
+        compound_ids = rows['compound_id'].to_numpy()[row_ids]
+        compound_types = rows['source_type'].to_numpy()[row_ids]
+        from_names = rows['From'].to_numpy()[row_ids]
+        source_files = rows['source_file'].to_numpy()[row_ids]
+        gene_names_full = (rows['Gene Name'].to_numpy()[row_ids] if 'Gene Name' in rows.columns
+                           else np.full(len(row_ids), '', dtype=object))
+        
+        for i, row_id in enumerate(row_ids):
+            if pd.isna(compound_ids[i]):
+                continue
+            compounds.append({
+                'compound_id': int(compound_ids[i]),
+                'compound_type': compound_types[i],
+                'score': float(scores[row_id]),
+                'from_name': from_names[i],
+                'gene_name_full': '' if pd.isna(gene_names_full[i]) else gene_names_full[i],
+                'source_file': source_files[i]
+            })
         
         return compounds
     
-    def get_all_unique_targets(self) -> pd.DataFrame:
-        """Enhanced: Get all unique targets with better data aggregation"""
+    def _prediction_dirs_signature(self) -> tuple:
+        """预测结果文件与交互表的签名（源xlsx有增删改或重新编译时变化）"""
+        store = load_interaction_store(self.prediction_dirs, self.store_dir)
+        return (
+            ('files', prediction_files_signature(self.prediction_dirs)),
+            ('store', store.meta['build_id'] if store is not None else None)
+        )
+    
+    def data_version(self) -> tuple:
+        """当前数据版本：靶点基础信息与预测结果（目录/交互表）的签名"""
+        return (self.targets_file, self._targets_file_mtime) + self._prediction_dirs_signature()
+    
+    def get_prediction_summary(self, bins: int = 20) -> Dict:
+        """
+        预测记录汇总：总数、各化合物类型的记录数与得分直方图
+        
+        Args:
+            bins: 直方图分箱数（得分在[0, 1]内时固定使用该区间）
+            
+        Returns:
+            dict: total_predictions、by_type、score_histogram（edges / counts）
+        """
+        rows = self._get_target_index()['rows']
+        summary = {
+            'total_predictions': len(rows),
+            'by_type': rows['source_type'].value_counts().to_dict() if 'source_type' in rows.columns else {},
+            'score_histogram': {'edges': [], 'counts': []}
+        }
+        
+        if 'score' in rows.columns:
+            scores = rows['score'].dropna().to_numpy(dtype=np.float64)
+            if len(scores):
+                value_range = (0.0, 1.0) if scores.min() >= 0 and scores.max() <= 1 else None
+                counts, edges = np.histogram(scores, bins=bins, range=value_range)
+                summary['score_histogram'] = {
+                    'edges': edges.tolist(),
+                    'counts': counts.tolist()
+                }
+        return summary
+    
+    def _get_target_index(self) -> Dict:
+        """
+        获取内存中的靶点索引，首次调用或预测结果目录变化时重建
+        
+        Returns:
+            dict: rows（逐行的化合物-靶点得分）、targets（按gene_symbol聚合的靶点统计）、
+                  targets_by_symbol（gene_symbol -> targets 中的行号）、postings（From值/gene_symbol -> 行号的倒排索引）
+        """
+        signature = self._prediction_dirs_signature()
+        with self._index_lock:
+            if self._target_index is None or self._target_index['signature'] != signature:
+                # 优先使用编译后的交互表，存储过期时回退到逐个读取xlsx
+                store = load_interaction_store(self.prediction_dirs, self.store_dir)
+                rows = self._load_store_rows(store) if store is not None else self._scan_prediction_files()
+                targets = self._aggregate_targets(rows)
+                self._target_index = {
+                    'signature': signature,
+                    'rows': rows,
+                    'targets': targets,
+                    'targets_by_symbol': (_first_positions(targets['gene_symbol'])
+                                          if 'gene_symbol' in targets.columns else {}),
+                    'postings': self._build_gene_postings(rows, store)
+                }
+            return self._target_index
+    
+    def _build_gene_postings(self, rows: pd.DataFrame, store=None) -> Optional[Dict]:
+        """
+        建立基因到预测记录的倒排索引
+        
+        每个不同的From值对应 rows 中按得分降序排列的一段行号；交互表中已持久化
+        该索引时直接使用，否则在内存中构建。gene_symbol 及其全部别名通过
+        targets.xlsx 的名称映射归并到对应的From值。
+        
+        Args:
+            rows: 逐行的化合物-靶点得分表
+            store: 编译后的交互表（与 rows 行序一致），None 表示从 rows 构建
+            
+        Returns:
+            dict: order/offsets（倒排表）、codes_by_name（From值 -> 编码）、
+                  codes_by_symbol（gene_symbol -> From编码列表）；无数据时为 None
+        """
+        if rows.empty or 'From' not in rows.columns:
+            return None
+        
+        persisted = store.gene_postings() if store is not None else None
+        if persisted is not None:
+            names = store.categories('From')
+            order, offsets = persisted
+        else:
+            codes, names = pd.factorize(rows['From'])
+            scores = rows['score'] if 'score' in rows.columns else np.zeros(len(rows))
+            order, offsets = build_gene_postings(codes, scores, len(names))
+        
+        codes_by_name = {}
+        codes_by_symbol = {}
+        for code, name in enumerate(names):
+            codes_by_name[name] = code
+            symbol = self._get_gene_symbol_from_name(name)
+            if symbol is not None:
+                codes_by_symbol.setdefault(symbol, []).append(code)
+        
+        return {
+            'order': order,
+            'offsets': offsets,
+            'codes_by_name': codes_by_name,
+            'codes_by_symbol': codes_by_symbol
+        }
+    
+    def _scan_prediction_files(self) -> pd.DataFrame:
+        """逐个读取预测结果xlsx，返回逐行的化合物-靶点得分表"""
         all_targets = []
         
-        # From all prediction files collect targets with enhanced processing
         for compound_type, dir_path in self.prediction_dirs.items():
-            if os.path.exists(dir_path):
-                for file in os.listdir(dir_path):
-                    if file.endswith('.xlsx'):
-                        try:
-                            df = pd.read_excel(os.path.join(dir_path, file))
-                            if not df.empty and 'From' in df.columns:
-                                df['source_type'] = compound_type
-                                df['source_file'] = file
-                                # Add standardized gene_symbol
-                                df['gene_symbol'] = df['From'].apply(self._get_gene_symbol_from_name)
-                                
-                                # Ensure score column is numeric
-                                if 'score' in df.columns:
-                                    df['score'] = pd.to_numeric(df['score'], errors='coerce')
-                                
-                                all_targets.append(df)
-                        except Exception as e:
-                            print(f"Error reading {file}: {str(e)}")
-                            continue
+            if not os.path.exists(dir_path):
+                continue
+            prefix = COMPOUND_TYPE_PREFIXES.get(compound_type, '')
+            
+            for file in os.listdir(dir_path):
+                if not file.endswith('.xlsx'):
+                    continue
+                try:
+                    df = pd.read_excel(os.path.join(dir_path, file))
+                    if not df.empty and 'From' in df.columns:
+                        df['source_type'] = compound_type
+                        df['source_file'] = file
+                        # 从文件名提取化合物ID
+                        df['compound_id'] = pd.to_numeric(
+                            file.replace(prefix, '').replace('.xlsx', ''), errors='coerce')
+                        # Add standardized gene_symbol
+                        df['gene_symbol'] = df['From'].apply(self._get_gene_symbol_from_name)
+                        
+                        # Ensure score column is numeric
+                        if 'score' in df.columns:
+                            df['score'] = pd.to_numeric(df['score'], errors='coerce')
+                        
+                        all_targets.append(df)
+                except Exception as e:
+                    print(f"Error reading {file}: {str(e)}")
+                    continue
         
         if all_targets:
-            combined_df = pd.concat(all_targets, ignore_index=True)
-            
-            # Enhanced aggregation with better statistics
-            valid_targets = combined_df[combined_df['gene_symbol'].notna()]
-            
-            if valid_targets.empty:
-                return pd.DataFrame()
-            
-            # Group by gene_symbol and calculate comprehensive statistics
-            target_stats = valid_targets.groupby('gene_symbol').agg({
-                'score': ['mean', 'max', 'min', 'count', 'std'],
-                'source_type': lambda x: list(set(x)),
-                'source_file': 'nunique',  # Number of unique files (compounds)
-                'From': 'first'  # Keep original From value
-            }).reset_index()
-            
-            # Flatten multi-level columns
-            target_stats.columns = [
-                'gene_symbol', 'avg_score', 'max_score', 'min_score', 
-                'prediction_count', 'score_std', 'compound_types', 
-                'compound_count', 'from_name'
-            ]
-            
-            # Clean up data types and handle NaN values
-            numeric_cols = ['avg_score', 'max_score', 'min_score', 'prediction_count', 'compound_count']
-            for col in numeric_cols:
-                target_stats[col] = pd.to_numeric(target_stats[col], errors='coerce').fillna(0)
-            
-            # Merge with target base information if available
-            if not self._targets_df.empty:
-                target_stats = pd.merge(
-                    target_stats, 
-                    self._targets_df, 
-                    on='gene_symbol', 
-                    how='left'
-                )
-                
-                # Fill missing gene_name with gene_symbol
-                if 'gene_name' in target_stats.columns:
-                    target_stats['gene_name'] = target_stats['gene_name'].fillna(target_stats['gene_symbol'])
-            else:
-                # If no base info, use gene_symbol as gene_name
-                target_stats['gene_name'] = target_stats['gene_symbol']
-            
-            # Add species column if missing
-            if 'species' not in target_stats.columns:
-                target_stats['species'] = 'Homo sapiens'
-            
-            # Ensure all required columns exist with proper defaults
-            required_columns = {
-                'uniprot_id': '',
-                'protein_names': '',
-                'function_cc': ''
-            }
-            
-            for col, default_val in required_columns.items():
-                if col not in target_stats.columns:
-                    target_stats[col] = default_val
+            return pd.concat(all_targets, ignore_index=True)
+        return pd.DataFrame()
+    
+    def _load_store_rows(self, store) -> pd.DataFrame:
+        """从编译后的交互表构建逐行得分表，gene_symbol 在 From 词表上映射"""
+        if len(store) == 0 or 'From' not in store.columns:
+            return pd.DataFrame()
+        
+        df = store.to_dataframe().rename(columns={'compound_type': 'source_type'})
+        from_names = store.categories('From')
+        if from_names is not None:
+            # 每个不同的From值只映射一次，再按编码展开
+            symbols = np.array([self._get_gene_symbol_from_name(name) for name in from_names] + [None],
+                               dtype=object)
+            df['gene_symbol'] = symbols[store.codes('From')]
+        else:
+            df['gene_symbol'] = df['From'].apply(self._get_gene_symbol_from_name)
+        
+        if 'score' in df.columns:
+            df['score'] = pd.to_numeric(df['score'], errors='coerce')
+        return df
+    
+    def get_all_unique_targets(self, copy: bool = True) -> pd.DataFrame:
+        """Get all unique targets from the in-memory target index
+        
+        With copy=False a shallow view of the shared frame is returned instead of
+        a full copy; use it when the caller only reads the frame.
+        """
+        return self._get_target_index()['targets'].copy(deep=copy)
+    
+    def _aggregate_targets(self, combined_df: pd.DataFrame) -> pd.DataFrame:
+        """Enhanced: Aggregate prediction rows into per-target statistics"""
+        if combined_df.empty:
+            return pd.DataFrame()
+        
+        # Enhanced aggregation with better statistics
+        valid_targets = combined_df[combined_df['gene_symbol'].notna()]
+        
+        if valid_targets.empty:
+            return pd.DataFrame()
+        
+        # Group by gene_symbol and calculate comprehensive statistics
+        target_stats = valid_targets.groupby('gene_symbol').agg({
+            'score': ['mean', 'max', 'min', 'count', 'std'],
+            'source_type': lambda x: list(set(x)),
+            'source_file': 'nunique',  # Number of unique files (compounds)
+            'From': 'first'  # Keep original From value
+        }).reset_index()
+        
+        # Flatten multi-level columns
+        target_stats.columns = [
+            'gene_symbol', 'avg_score', 'max_score', 'min_score', 
+            'prediction_count', 'score_std', 'compound_types', 
+            'compound_count', 'from_name'
+        ]
+        
+        # Clean up data types and handle NaN values
+        numeric_cols = ['avg_score', 'max_score', 'min_score', 'prediction_count', 'compound_count']
+        for col in numeric_cols:
+            target_stats[col] = pd.to_numeric(target_stats[col], errors='coerce').fillna(0)
+        
+        # Merge with target base information if available
+        if not self._targets_df.empty:
+            target_stats = pd.merge(
+                target_stats, 
+                self._targets_df, 
+                on='gene_symbol', 
+                how='left'
+            )
             
-            return target_stats
+            # Fill missing gene_name with gene_symbol
+            if 'gene_name' in target_stats.columns:
+                target_stats['gene_name'] = target_stats['gene_name'].fillna(target_stats['gene_symbol'])
+        else:
+            # If no base info, use gene_symbol as gene_name
+            target_stats['gene_name'] = target_stats['gene_symbol']
         
-        return pd.DataFrame()
+        # Add species column if missing
+        if 'species' not in target_stats.columns:
+            target_stats['species'] = 'Homo sapiens'
+        
+        # Ensure all required columns exist with proper defaults
+        required_columns = {
+            'uniprot_id': '',
+            'protein_names': '',
+            'function_cc': ''
+        }
+        
+        for col, default_val in required_columns.items():
+            if col not in target_stats.columns:
+                target_stats[col] = default_val
+        
+        return target_stats
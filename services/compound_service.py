@@ -2,13 +2,20 @@ from typing import Dict, List, Optional
 import pandas as pd
 from models.compound import Compound
 from utils.pagination import Paginator
+from utils.cache import cached
 from config import Config
 
+
+def _compound_data_version(service) -> tuple:
+    """化合物服务缓存条目的数据版本（已加载的化合物文件）"""
+    return service.compound_model.data_version()
+
+
 class CompoundService:
     """化合物业务逻辑服务"""
     
-    def __init__(self):
-        self.compound_model = Compound(Config.COMPOUNDS_FILE)
+    def __init__(self, compound_model: Optional[Compound] = None):
+        self.compound_model = compound_model or Compound(Config.COMPOUNDS_FILE)
         self.paginator = Paginator()
     
     def get_compounds_list(self,
@@ -26,16 +33,17 @@ class CompoundService:
         if compound_type and compound_type != 'all':
             filters['compound_type'] = compound_type
         
-        # 获取数据
-        df = self.compound_model.get_all(
+        # 获取筛选、排序后的行号（预计算排序索引）
+        positions = self.compound_model.get_positions(
             filters=filters,
             search=search,
             sort_by=sort_by,
             sort_order=sort_order
         )
         
-        # 分页
-        paginated_df, pagination_info = self.paginator.paginate_dataframe(df, page, page_size)
+        # 分页：只取出当前页的行
+        page_positions, pagination_info = self.paginator.paginate_indices(positions, page, page_size)
+        paginated_df = self.compound_model.get_rows(page_positions)
         
         # 选择要返回的字段
         display_columns = [
@@ -60,7 +68,8 @@ class CompoundService:
         
         return {
             'items': items,
-            'pagination': pagination_info
+            'pagination': pagination_info,
+            'records_total': len(self.compound_model)  # 未筛选的总数（加载时确定）
         }
     
     def get_compound_detail(self, compound_id: int) -> Optional[Dict]:
@@ -85,10 +94,8 @@ class CompoundService:
         else:
             search_fields = None
         
-        df = self.compound_model.get_all(search=query)
-        
-        # 限制返回数量
-        df = df.head(100)
+        # 按相关性排序，限制返回数量
+        df = self.compound_model.search(query, fields=search_fields, limit=100)
         
         display_columns = ['global_id', 'chinese_name', 'Name', 'compound_type', 
                           'Molecular_Formula', 'Molecular_Weight']
@@ -96,6 +103,32 @@ class CompoundService:
         
         return df[available_columns].fillna('').to_dict('records')
     
+    @cached('compounds', version=_compound_data_version)
+    def similarity_search(self, smiles: str, threshold: float = 0.5, limit: int = 50) -> List[Dict]:
+        """按Tanimoto相似度检索化合物"""
+        df = self.compound_model.similarity_search(smiles, threshold, limit)
+        
+        display_columns = ['global_id', 'chinese_name', 'Name', 'compound_type', 
+                          'Molecular_Formula', 'Molecular_Weight', 'SMILES', 'similarity']
+        available_columns = [col for col in display_columns if col in df.columns]
+        
+        items = df[available_columns].fillna('').to_dict('records')
+        for item in items:
+            item['similarity'] = round(item['similarity'], 4)
+        return items
+    
+    @cached('compounds', version=_compound_data_version)
+    def substructure_search(self, smarts: str, limit: int = 100) -> List[Dict]:
+        """按SMARTS子结构检索化合物"""
+        df = self.compound_model.substructure_search(smarts, limit)
+        
+        display_columns = ['global_id', 'chinese_name', 'Name', 'compound_type', 
+                          'Molecular_Formula', 'Molecular_Weight', 'SMILES']
+        available_columns = [col for col in display_columns if col in df.columns]
+        
+        return df[available_columns].fillna('').to_dict('records')
+    
+    @cached('compounds', version=_compound_data_version)
     def get_statistics(self) -> Dict:
         """获取统计信息"""
         return self.compound_model.get_statistics()
@@ -0,0 +1,48 @@
+from flask import current_app
+from werkzeug.local import LocalProxy
+from models.compound import Compound
+from models.target import Target
+from services.compound_service import CompoundService
+from services.target_service import TargetService
+from services.statistics_service import StatisticsService
+
+
+class DataContainer:
+    """应用级数据容器：每个数据集只加载一次，并注入到所有服务"""
+
+    def __init__(self, config):
+        """
+        Args:
+            config: 应用配置（app.config）
+        """
+        self.compound_model = Compound(config['COMPOUNDS_FILE'])
+        self.target_model = Target(
+            config['PREDICTION_DIRS'],
+            config['TARGETS_FILE'],
+            config.get('INTERACTION_STORE_DIR')
+        )
+        self.compound_service = CompoundService(self.compound_model)
+        self.target_service = TargetService(self.target_model, self.compound_model)
+        self.statistics_service = StatisticsService(
+            self.compound_service,
+            self.target_service,
+            config.get('STATISTICS_SNAPSHOT_PATH')
+        )
+
+
+def init_data(app) -> DataContainer:
+    """在应用工厂中创建数据容器并注册到 app.extensions['data']"""
+    container = DataContainer(app.config)
+    app.extensions['data'] = container
+    return container
+
+
+def get_data() -> DataContainer:
+    """当前应用的数据容器"""
+    return current_app.extensions['data']
+
+
+# 蓝图中使用的服务代理，请求时解析到当前应用的共享实例
+compound_service = LocalProxy(lambda: get_data().compound_service)
+target_service = LocalProxy(lambda: get_data().target_service)
+statistics_service = LocalProxy(lambda: get_data().statistics_service)
@@ -0,0 +1,106 @@
+import os
+import json
+import threading
+import tempfile
+from datetime import datetime
+from typing import Dict, Optional
+from utils.cache import cache
+
+
+def to_native(obj):
+    """递归地将numpy标量转换为Python原生类型（便于JSON序列化）"""
+    if isinstance(obj, dict):
+        return {k: to_native(v) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [to_native(item) for item in obj]
+    elif hasattr(obj, 'item'):  # numpy类型
+        return obj.item()
+    return obj
+
+
+class StatisticsService:
+    """
+    统计快照服务
+
+    首页与统计页使用的统计数据按数据版本计算一次，保存在内存中并持久化到磁盘，
+    冷启动时数据版本未变则直接读取快照，无需重新扫描预测结果。
+    """
+
+    def __init__(self, compound_service, target_service, snapshot_path: Optional[str] = None, histogram_bins: int = 20):
+        """
+        Args:
+            compound_service: 化合物服务
+            target_service: 靶点服务
+            snapshot_path: 快照JSON文件路径，None 表示只保存在内存中
+            histogram_bins: 得分直方图分箱数
+        """
+        self.compound_service = compound_service
+        self.target_service = target_service
+        self.snapshot_path = snapshot_path
+        self.histogram_bins = histogram_bins
+        self._snapshot = None  # {'data_version': ..., 'stats': ...}
+        self._lock = threading.Lock()
+
+    def data_version(self) -> list:
+        """当前数据版本（JSON可比较的形式）"""
+        version = [
+            self.compound_service.compound_model.data_version(),
+            self.target_service.target_model.data_version(),
+            self.histogram_bins
+        ]
+        return json.loads(json.dumps(version, default=str))
+
+    def get_snapshot(self) -> Dict:
+        """
+        获取统计快照，数据版本变化时重新计算
+
+        Returns:
+            dict: compounds（化合物统计）、targets（靶点统计）、
+                  predictions（预测记录数、按类型计数、得分直方图）、generated_at
+        """
+        version = self.data_version()
+        with self._lock:
+            if self._snapshot is None or self._snapshot['data_version'] != version:
+                snapshot = self._load(version)
+                if snapshot is None:
+                    snapshot = {'data_version': version, 'stats': self._compute()}
+                    self._save(snapshot)
+                self._snapshot = snapshot
+            return self._snapshot['stats']
+
+    def _compute(self) -> Dict:
+        """计算统计数据（数据已变化，先使服务层缓存失效）"""
+        cache.invalidate('compounds')
+        cache.invalidate('targets')
+        return to_native({
+            'generated_at': datetime.now().isoformat(),
+            'compounds': self.compound_service.get_statistics(),
+            'targets': self.target_service.get_target_statistics(),
+            'predictions': self.target_service.target_model.get_prediction_summary(self.histogram_bins)
+        })
+
+    def _load(self, version: list) -> Optional[Dict]:
+        """读取磁盘快照，版本不一致或读取失败时返回 None"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"无法读取统计快照 {self.snapshot_path}: {e}")
+            return None
+        return snapshot if snapshot.get('data_version') == version else None
+
+    def _save(self, snapshot: Dict) -> None:
+        """原子写入快照文件"""
+        if not self.snapshot_path:
+            return
+        try:
+            directory = os.path.dirname(self.snapshot_path) or '.'
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"无法写入统计快照 {self.snapshot_path}: {e}")
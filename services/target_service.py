@@ -1,18 +1,39 @@
 from typing import Dict, List, Optional
+import threading
+import numpy as np
 import pandas as pd
 from models.target import Target
 from models.compound import Compound
 from utils.pagination import Paginator
+from utils.cache import cached
+from utils.sorting import SortIndex
+from utils.search_index import NGramIndex
 from config import Config
 
+# DataTables 中可排序的靶点列（预先计算排序索引）
+TARGET_SORTABLE_COLUMNS = ['gene_name', 'gene_symbol', 'prediction_count', 'avg_score', 'uniprot_id',
+                           'max_score', 'min_score', 'compound_count']
+
+# 靶点全文搜索的列（包括 gene_names_full 中的基因别名）
+TARGET_SEARCH_FIELDS = ['gene_name', 'gene_symbol', 'gene_names_full', 'protein_names', 'function_cc', 'uniprot_id']
+
+
+def _target_data_version(service) -> tuple:
+    """靶点服务缓存条目的数据版本（靶点基础信息与预测结果）"""
+    return service.target_model.data_version()
+
+
 class TargetService:
     """靶点业务逻辑服务"""
     
-    def __init__(self):
-        self.target_model = Target(Config.PREDICTION_DIRS, Config.TARGETS_FILE)
-        self.compound_model = Compound(Config.COMPOUNDS_FILE)
+    def __init__(self, target_model: Optional[Target] = None, compound_model: Optional[Compound] = None):
+        self.target_model = target_model or Target(Config.PREDICTION_DIRS, Config.TARGETS_FILE)
+        self.compound_model = compound_model or Compound(Config.COMPOUNDS_FILE)
         self.paginator = Paginator()
+        self._targets_table = None  # (data_version, cleaned targets frame, SortIndex, NGramIndex)
+        self._targets_table_lock = threading.Lock()
     
+    @cached('targets', version=_target_data_version)
     def get_compound_targets(self, compound_type: str, compound_id: int) -> Dict:
         """获取化合物的预测靶点"""
         targets_df = self.target_model.get_compound_targets(compound_type, compound_id)
@@ -52,6 +73,7 @@ class TargetService:
             'statistics': statistics
         }
     
+    @cached('targets', version=_target_data_version)
     def get_targets_list(self,
                     page: int = 1,
                     page_size: int = 20,
@@ -59,8 +81,8 @@ class TargetService:
                     sort_by: str = 'prediction_count',
                     sort_order: str = 'desc') -> Dict:
         """Enhanced targets list with FIXED column naming"""
-        # Get all unique targets
-        targets_df = self.target_model.get_all_unique_targets()
+        # Get all unique targets (cleaned, with precomputed sort orders and search index)
+        targets_df, sort_index, search_index = self._get_targets_table()
         
         if targets_df.empty:
             return {
@@ -70,76 +92,25 @@ class TargetService:
                     'page_size': page_size,
                     'total': 0,
                     'total_pages': 0
-                }
+                },
+                'records_total': 0
             }
         
-        # CRITICAL FIX: Clean up duplicate column names from merge
-        column_rename_map = {}
-        
-        # Handle duplicate columns from pandas merge
-        if 'prediction_count_x' in targets_df.columns:
-            # Use the aggregated prediction count (_x) which is from our calculation
-            targets_df['prediction_count'] = targets_df['prediction_count_x']
-            column_rename_map['prediction_count_x'] = 'prediction_count'
-            
-        if 'avg_score_x' in targets_df.columns:
-            # Use the aggregated average score (_x) which is from our calculation  
-            targets_df['avg_score'] = targets_df['avg_score_x']
-            column_rename_map['avg_score_x'] = 'avg_score'
-            
-        if 'compound_count_x' in targets_df.columns:
-            # Use the aggregated compound count (_x) which is from our calculation
-            targets_df['compound_count'] = targets_df['compound_count_x']
-            column_rename_map['compound_count_x'] = 'compound_count'
-        
-        # Remove duplicate columns to avoid confusion
-        columns_to_drop = []
-        for col in targets_df.columns:
-            if col.endswith('_y') and col.replace('_y', '') in targets_df.columns:
-                columns_to_drop.append(col)
-            elif col.endswith('_x') and col.replace('_x', '') in targets_df.columns:
-                columns_to_drop.append(col)
+        # Apply search (n-gram index over TARGET_SEARCH_FIELDS)
+        mask = search_index.mask(search) if search else None
         
-        if columns_to_drop:
-            targets_df = targets_df.drop(columns=columns_to_drop)
-        
-        # Debug: Print cleaned columns
-        print(f"DEBUG: Cleaned columns: {targets_df.columns.tolist()}")
-        if not targets_df.empty:
-            sample_row = targets_df.iloc[0]
-            print(f"DEBUG: prediction_count = {sample_row.get('prediction_count', 'MISSING')}")
-            print(f"DEBUG: avg_score = {sample_row.get('avg_score', 'MISSING')}")
-        
-        # Apply search
-        if search:
-            mask = pd.Series([False] * len(targets_df))
-            search_fields = ['gene_name', 'gene_symbol', 'protein_names', 'function_cc', 'uniprot_id']
-            
-            for field in search_fields:
-                if field in targets_df.columns:
-                    mask |= targets_df[field].astype(str).str.contains(search, case=False, na=False)
-            
-            targets_df = targets_df[mask]
-        
-        # Ensure numeric columns are properly typed
-        numeric_columns = ['prediction_count', 'avg_score', 'max_score', 'min_score', 'compound_count']
-        for col in numeric_columns:
-            if col in targets_df.columns:
-                targets_df[col] = pd.to_numeric(targets_df[col], errors='coerce').fillna(0)
-        
-        # Apply sorting with proper column names
+        # Apply sorting with proper column names (precomputed permutations, no per-request sort)
         if sort_by in targets_df.columns:
-            ascending = (sort_order == 'asc')
-            targets_df = targets_df.sort_values(by=sort_by, ascending=ascending)
-        else:
+            positions = sort_index.order(sort_by, sort_order == 'asc', mask)
+        elif 'prediction_count' in targets_df.columns:
             # Fallback sorting
-            if 'prediction_count' in targets_df.columns:
-                targets_df = targets_df.sort_values(by='prediction_count', ascending=False)
+            positions = sort_index.order('prediction_count', False, mask)
+        else:
+            positions = np.arange(len(targets_df)) if mask is None else np.flatnonzero(mask)
         
         # Apply pagination
-        paginated_df, pagination_info = self.paginator.paginate_dataframe(
-            targets_df, page, page_size
-        )
+        page_positions, pagination_info = self.paginator.paginate_indices(positions, page, page_size)
+        paginated_df = targets_df.iloc[page_positions]
         
         # Select display columns - using cleaned column names
         display_columns = [
@@ -186,13 +157,74 @@ class TargetService:
             
             items.append(item)
         
-        print(f"DEBUG: Sample processed item: {items[0] if items else 'No items'}")
-        
         return {
             'items': items,
-            'pagination': pagination_info
+            'pagination': pagination_info,
+            'records_total': len(targets_df)  # Unfiltered total, constant per data version
         }
     
+    def _get_targets_table(self):
+        """
+        Cleaned targets frame with its sort and search indexes, rebuilt only when the target data version changes
+        
+        Returns:
+            (DataFrame, SortIndex, NGramIndex)
+        """
+        version = self.target_model.data_version()
+        with self._targets_table_lock:
+            if self._targets_table is None or self._targets_table[0] != version:
+                targets_df = self._clean_targets_frame(self.target_model.get_all_unique_targets())
+                self._targets_table = (
+                    version,
+                    targets_df,
+                    SortIndex(targets_df, TARGET_SORTABLE_COLUMNS),
+                    NGramIndex(targets_df, TARGET_SEARCH_FIELDS)
+                )
+            return self._targets_table[1:]
+    
+    def _clean_targets_frame(self, targets_df: pd.DataFrame) -> pd.DataFrame:
+        """Resolve merge-duplicated columns and coerce numeric columns"""
+        if targets_df.empty:
+            return targets_df
+        
+        # CRITICAL FIX: Clean up duplicate column names from merge
+        column_rename_map = {}
+        
+        # Handle duplicate columns from pandas merge
+        if 'prediction_count_x' in targets_df.columns:
+            # Use the aggregated prediction count (_x) which is from our calculation
+            targets_df['prediction_count'] = targets_df['prediction_count_x']
+            column_rename_map['prediction_count_x'] = 'prediction_count'
+            
+        if 'avg_score_x' in targets_df.columns:
+            # Use the aggregated average score (_x) which is from our calculation  
+            targets_df['avg_score'] = targets_df['avg_score_x']
+            column_rename_map['avg_score_x'] = 'avg_score'
+            
+        if 'compound_count_x' in targets_df.columns:
+            # Use the aggregated compound count (_x) which is from our calculation
+            targets_df['compound_count'] = targets_df['compound_count_x']
+            column_rename_map['compound_count_x'] = 'compound_count'
+        
+        # Remove duplicate columns to avoid confusion
+        columns_to_drop = []
+        for col in targets_df.columns:
+            if col.endswith('_y') and col.replace('_y', '') in targets_df.columns:
+                columns_to_drop.append(col)
+            elif col.endswith('_x') and col.replace('_x', '') in targets_df.columns:
+                columns_to_drop.append(col)
+        
+        if columns_to_drop:
+            targets_df = targets_df.drop(columns=columns_to_drop)
+        
+        # Ensure numeric columns are properly typed
+        numeric_columns = ['prediction_count', 'avg_score', 'max_score', 'min_score', 'compound_count']
+        for col in numeric_columns:
+            if col in targets_df.columns:
+                targets_df[col] = pd.to_numeric(targets_df[col], errors='coerce').fillna(0)
+        
+        return targets_df.reset_index(drop=True)
+    
     def get_target_detail(self, gene_name: str) -> Optional[Dict]:
         """获取靶点详细信息"""
         target = self.target_model.get_target_by_gene_name(gene_name)
@@ -206,20 +238,21 @@ class TargetService:
             # 获取关联的化合物
             compounds = self.target_model.get_compounds_by_target(gene_name)
             
-            # 为每个化合物添加详细信息
+            # 为每个化合物添加详细信息（一次批量查询）
+            compound_info = self.compound_model.get_many_by_local_id(
+                [(comp['compound_type'], comp['compound_id']) for comp in compounds]
+            )
+            info_records = dict(zip(compound_info.index, compound_info.to_dict('records')))
+            
             enriched_compounds = []
-            for comp in compounds:
-                # 计算global_id
-                compound_info = self._get_compound_info_by_type_and_id(
-                    comp['compound_type'], 
-                    comp['compound_id']
-                )
-                if compound_info:
+            for i, comp in enumerate(compounds):
+                info = info_records.get(i)
+                if info:
                     enriched_compounds.append({
                         **comp,
-                        'global_id': compound_info['global_id'],
-                        'chinese_name': compound_info.get('chinese_name', ''),
-                        'molecular_formula': compound_info.get('Molecular_Formula', '')
+                        'global_id': info['global_id'],
+                        'chinese_name': info.get('chinese_name', ''),
+                        'molecular_formula': info.get('Molecular_Formula', '')
                     })
             
             target['associated_compounds'] = enriched_compounds
@@ -231,16 +264,12 @@ class TargetService:
     
     def _get_compound_info_by_type_and_id(self, compound_type: str, local_id: int) -> Optional[Dict]:
         """根据化合物类型和本地ID获取化合物信息"""
-        df = self.compound_model._df
-        compound = df[(df['compound_type'] == compound_type) & (df['id'] == local_id)]
-        
-        if not compound.empty:
-            return compound.iloc[0].to_dict()
-        return None
+        return self.compound_model.get_by_local_id(compound_type, local_id)
     
+    @cached('targets', version=_target_data_version)
     def get_target_statistics(self) -> Dict:
         """获取靶点统计信息"""
-        targets_df = self.target_model.get_all_unique_targets()
+        targets_df = self.target_model.get_all_unique_targets(copy=False)
         
         if targets_df.empty:
             return {
@@ -281,22 +310,13 @@ class TargetService:
         Returns:
             int: Total count of targets
         """
-        # Get all unique targets
-        targets_df = self.target_model.get_all_unique_targets()
+        targets_df, _, search_index = self._get_targets_table()
         
         if targets_df.empty:
             return 0
         
         # Apply search if provided
         if search:
-            # Search in multiple fields
-            mask = pd.Series([False] * len(targets_df))
-            search_fields = ['gene_name', 'gene_symbol', 'protein_names', 'function_cc']
-            
-            for field in search_fields:
-                if field in targets_df.columns:
-                    mask |= targets_df[field].astype(str).str.contains(search, case=False, na=False)
-            
-            targets_df = targets_df[mask]
+            return int(search_index.mask(search).sum())
         
         return len(targets_df)
@@ -319,7 +319,7 @@ class DTIPrediction {
                     this.predictionCompleted(data);
                 } else if (data.status === 'failed') {
                     this.predictionFailed(data);
-                } else if (data.status === 'running') {
+                } else if (data.status === 'running' || data.status === 'queued') {
                     // Continue polling
                     setTimeout(() => this.pollPredictionStatus(), 2000);
                 }
@@ -350,8 +350,8 @@ class DTIPrediction {
         $('#failed-count').text(failed);
         $('#eta-time').text(eta);
 
-        // Show cancel button if running
-        if (data.status === 'running') {
+        // Show cancel button if queued or running
+        if (data.status === 'running' || data.status === 'queued') {
             $('#cancel-prediction').show();
         }
     }
@@ -360,8 +360,13 @@ class DTIPrediction {
         this.predictionActive = false;
         this.hideProgress();
         
-        // Show results
-        this.displayResults(data.results);
+        // Show results (status carries only the summary; fetch the top-scoring page)
+        $.ajax({
+            url: `/api/predict/results/${this.currentJob}`,
+            method: 'GET',
+            data: { per_page: 100, sort_by: 'score', sort_order: 'desc' },
+            success: (page) => this.displayResults(page)
+        });
         this.addToHistory(data);
         
         this.showAlert('Prediction completed successfully!', 'success');
@@ -395,18 +400,13 @@ class DTIPrediction {
         }
 
         const interactions = results.interactions;
+        const summary = results.summary || {};
         
         // Update summary statistics
-        $('#total-interactions').text(interactions.length);
-        $('#high-confidence-interactions').text(
-            interactions.filter(i => i.score >= 0.95).length
-        );
-        $('#unique-targets').text(
-            new Set(interactions.map(i => i.protein)).size
-        );
-        $('#avg-score').text(
-            (interactions.reduce((sum, i) => sum + i.score, 0) / interactions.length).toFixed(3)
-        );
+        $('#total-interactions').text(summary.total_interactions || 0);
+        $('#high-confidence-interactions').text(summary.high_confidence_count || 0);
+        $('#unique-targets').text(summary.unique_targets || 0);
+        $('#avg-score').text((summary.average_score || 0).toFixed(3));
 
         // Populate results table
         this.populateResultsTable(interactions);
@@ -605,7 +605,7 @@ class DTIPrediction {
             timestamp: new Date().toISOString(),
             mode: this.currentMode,
             status: 'completed',
-            results_count: data.results?.interactions?.length || 0,
+            results_count: data.summary?.total_interactions || 0,
             smiles: this.currentMode === 'single' ? $('#smiles-input').val() : null,
             filename: this.currentMode === 'batch' ? $('#file-name').text() : null
         };
@@ -7,7 +7,7 @@ class PredictionResults {
     constructor() {
         this.jobId = window.pageConfig?.jobId;
         this.apiBaseUrl = window.pageConfig?.apiBaseUrl || '/api/predict';
-        this.results = null;
+        this.summary = null;
         this.charts = {};
         
         this.init();
@@ -51,11 +51,12 @@ class PredictionResults {
 
     async loadResults() {
         try {
-            const response = await fetch(`${this.apiBaseUrl}/results/${this.jobId}`);
+            // Only the summary is needed up front; table rows are paged from the server
+            const response = await fetch(`${this.apiBaseUrl}/results/${this.jobId}?per_page=1`);
             const data = await response.json();
             
-            if (data.success && data.results) {
-                this.results = data.results;
+            if (data.success && data.summary) {
+                this.summary = data.summary;
                 this.displayResults();
                 this.hideLoading();
             } else {
@@ -68,87 +69,81 @@ class PredictionResults {
     }
 
     displayResults() {
-        if (!this.results || !this.results.interactions) {
-            this.showError('No interaction data available');
-            return;
-        }
-
-        const interactions = this.results.interactions;
-        
         // Update summary statistics
-        this.updateSummaryStats(interactions);
+        this.updateSummaryStats(this.summary);
         
-        // Populate interactions table
-        this.populateInteractionsTable(interactions);
+        // Server-side paginated interactions table
+        this.initializeDataTable();
         
         // Set completion time
         $('#completion-time').text(new Date().toLocaleString());
     }
 
-    updateSummaryStats(interactions) {
-        const totalInteractions = interactions.length;
-        const highConfidence = interactions.filter(i => i.score >= 0.95).length;
-        const uniqueTargets = new Set(interactions.map(i => i.protein)).size;
-        const avgScore = totalInteractions > 0 ? 
-            (interactions.reduce((sum, i) => sum + i.score, 0) / totalInteractions).toFixed(3) : '0.000';
+    updateSummaryStats(summary) {
+        const avgScore = summary.average_score != null ? summary.average_score.toFixed(3) : '0.000';
 
-        $('#total-interactions').text(totalInteractions.toLocaleString());
-        $('#high-confidence').text(highConfidence.toLocaleString());
-        $('#unique-targets').text(uniqueTargets.toLocaleString());
+        $('#total-interactions').text((summary.total_interactions || 0).toLocaleString());
+        $('#high-confidence').text((summary.high_confidence_count || 0).toLocaleString());
+        $('#unique-targets').text((summary.unique_targets || 0).toLocaleString());
         $('#avg-score').text(avgScore);
     }
 
-    populateInteractionsTable(interactions) {
-        const tbody = $('#interactions-table tbody');
-        tbody.empty();
-
-        // Sort by score (highest first)
-        const sortedInteractions = [...interactions].sort((a, b) => b.score - a.score);
-
-        sortedInteractions.forEach((interaction, index) => {
-            const confidenceLevel = this.getConfidenceLevel(interaction.score);
-            const confidenceClass = this.getConfidenceClass(interaction.score);
-            
-            const row = `
-                <tr data-score="${interaction.score}" data-confidence="${confidenceLevel.toLowerCase()}">
-                    <td>
-                        <div class="d-flex align-items-center">
-                            <code class="small text-truncate" style="max-width: 200px;" title="${interaction.smiles}">
-                                ${interaction.smiles}
-                            </code>
-                        </div>
-                    </td>
-                    <td>
-                        <div>
-                            <span class="fw-medium">${interaction.protein}</span>
-                        </div>
-                    </td>
-                    <td>
-                        <span class="badge bg-light text-dark">${interaction.gene}</span>
-                    </td>
-                    <td>
-                        <span class="fw-bold">${interaction.score.toFixed(4)}</span>
-                    </td>
-                    <td>
-                        <span class="badge bg-${confidenceClass}">${confidenceLevel}</span>
-                    </td>
-                    <td>
-                        <div class="btn-group btn-group-sm">
-                            <button class="btn btn-outline-primary" onclick="viewInteractionDetails('${interaction.id || index}')">
-                                <i class="fas fa-eye"></i>
-                            </button>
-                            <button class="btn btn-outline-info" onclick="view3DStructure('${interaction.id || index}')">
-                                <i class="fas fa-cube"></i>
-                            </button>
-                        </div>
-                    </td>
-                </tr>
-            `;
-            tbody.append(row);
-        });
+    renderInteractionRow(interaction, index) {
+        const confidenceLevel = this.getConfidenceLevel(interaction.score);
+        const confidenceClass = this.getConfidenceClass(interaction.score);
+        
+        return [
+            `<div class="d-flex align-items-center">
+                <code class="small text-truncate" style="max-width: 200px;" title="${interaction.smiles}">
+                    ${interaction.smiles}
+                </code>
+            </div>`,
+            `<div>
+                <span class="fw-medium">${interaction.protein}</span>
+            </div>`,
+            `<span class="badge bg-light text-dark">${interaction.gene}</span>`,
+            `<span class="fw-bold">${interaction.score.toFixed(4)}</span>`,
+            `<span class="badge bg-${confidenceClass}">${confidenceLevel}</span>`,
+            `<div class="btn-group btn-group-sm">
+                <button class="btn btn-outline-primary" onclick="viewInteractionDetails('${interaction.id || index}')">
+                    <i class="fas fa-eye"></i>
+                </button>
+                <button class="btn btn-outline-info" onclick="view3DStructure('${interaction.id || index}')">
+                    <i class="fas fa-cube"></i>
+                </button>
+            </div>`
+        ];
+    }
 
-        // Initialize DataTable
-        this.initializeDataTable();
+    buildResultsQuery(d) {
+        // Map DataTables paging/sorting and the page filters onto the results API
+        const sortColumns = [null, 'protein', 'gene', 'score', 'score', null];
+        const order = d.order && d.order.length ? d.order[0] : { column: 3, dir: 'desc' };
+        const query = {
+            page: Math.floor(d.start / d.length) + 1,
+            per_page: d.length,
+            sort_by: sortColumns[order.column] || 'score',
+            sort_order: order.dir
+        };
+        
+        const searchTerm = $('#table-search').val();
+        if (searchTerm) {
+            query.search = searchTerm;
+        }
+        
+        switch ($('#confidence-filter').val()) {
+            case 'high':
+                query.min_score = 0.95;
+                break;
+            case 'medium':
+                query.min_score = 0.8;
+                query.max_score = 0.95;
+                break;
+            case 'low':
+                query.max_score = 0.8;
+                break;
+        }
+        return query;
     }
 
     initializeDataTable() {
@@ -159,16 +154,32 @@ class PredictionResults {
         
         $('#interactions-table').DataTable({
             pageLength: 25,
+            serverSide: true,
+            searching: false,
             order: [[3, 'desc']], // Sort by score
             columnDefs: [
-                { orderable: false, targets: [0, 5] }, // Disable sorting for compound and actions
-                { searchable: false, targets: [5] } // Disable search for actions column
+                { orderable: false, targets: [0, 5] } // Disable sorting for compound and actions
             ],
-            language: {
-                search: "", // Remove default search label
-                searchPlaceholder: "Search interactions..."
+            ajax: (d, callback) => {
+                $.ajax({
+                    url: `${this.apiBaseUrl}/results/${this.jobId}`,
+                    method: 'GET',
+                    data: this.buildResultsQuery(d),
+                    success: (data) => {
+                        callback({
+                            draw: d.draw,
+                            recordsTotal: data.records_total,
+                            recordsFiltered: data.pagination.total,
+                            data: data.interactions.map((interaction, i) => this.renderInteractionRow(interaction, d.start + i))
+                        });
+                    },
+                    error: () => {
+                        this.showToast('Failed to load interactions', 'danger');
+                        callback({ draw: d.draw, recordsTotal: 0, recordsFiltered: 0, data: [] });
+                    }
+                });
             },
-            dom: '<"row"<"col-sm-6"l><"col-sm-6"f>>rtip'
+            dom: '<"row"<"col-sm-6"l><"col-sm-6">>rtip'
         });
     }
 
@@ -185,30 +196,15 @@ class PredictionResults {
     }
 
     filterTable() {
-        const searchTerm = $('#table-search').val().toLowerCase();
-        const confidenceFilter = $('#confidence-filter').val();
-        
-        const table = $('#interactions-table').DataTable();
-        
-        // Apply confidence filter
-        if (confidenceFilter) {
-            table.column(4).search(confidenceFilter, false, false);
-        } else {
-            table.column(4).search('');
-        }
-        
-        // Apply text search
-        table.search(searchTerm);
-        
-        table.draw();
+        // Filters are applied server-side; reload from the first page
+        $('#interactions-table').DataTable().ajax.reload();
     }
 
     resetFilters() {
         $('#table-search').val('');
         $('#confidence-filter').val('');
         
-        const table = $('#interactions-table').DataTable();
-        table.search('').columns().search('').draw();
+        this.filterTable();
     }
 
     handleTabSwitch(tabId) {
@@ -226,7 +222,7 @@ class PredictionResults {
     }
 
     initializeVisualizations() {
-        if (!this.results || this.charts.initialized) return;
+        if (!this.summary || this.charts.initialized) return;
         
         // Score distribution histogram
         this.createScoreHistogram();
@@ -241,8 +237,7 @@ class PredictionResults {
         const ctx = document.getElementById('score-histogram');
         if (!ctx) return;
 
-        const scores = this.results.interactions.map(i => i.score);
-        const bins = this.createHistogramBins(scores, 20);
+        const bins = this.createHistogramBins(this.summary.score_histogram);
         
         new Chart(ctx, {
             type: 'bar',
@@ -287,16 +282,8 @@ class PredictionResults {
         const ctx = document.getElementById('targets-chart');
         if (!ctx) return;
 
-        // Count interactions per target
-        const targetCounts = {};
-        this.results.interactions.forEach(i => {
-            targetCounts[i.protein] = (targetCounts[i.protein] || 0) + 1;
-        });
-
-        // Get top 10 targets
-        const topTargets = Object.entries(targetCounts)
-            .sort(([,a], [,b]) => b - a)
-            .slice(0, 10);
+        // Top 10 targets by interaction count (computed server-side)
+        const topTargets = (this.summary.top_targets || []).map(t => [String(t.protein), t.count]);
 
         new Chart(ctx, {
             type: 'horizontalBar',
@@ -332,26 +319,16 @@ class PredictionResults {
         });
     }
 
-    createHistogramBins(data, numBins) {
-        const min = Math.min(...data);
-        const max = Math.max(...data);
-        const binWidth = (max - min) / numBins;
-        
-        const bins = Array(numBins).fill(0);
+    createHistogramBins(histogram) {
+        // Server-side histogram: bin_edges has one more entry than counts
+        const edges = histogram?.bin_edges || [];
         const labels = [];
         
-        for (let i = 0; i < numBins; i++) {
-            const binStart = min + i * binWidth;
-            const binEnd = min + (i + 1) * binWidth;
-            labels.push(`${binStart.toFixed(2)}-${binEnd.toFixed(2)}`);
+        for (let i = 0; i + 1 < edges.length; i++) {
+            labels.push(`${edges[i].toFixed(2)}-${edges[i + 1].toFixed(2)}`);
         }
         
-        data.forEach(value => {
-            const binIndex = Math.min(Math.floor((value - min) / binWidth), numBins - 1);
-            bins[binIndex]++;
-        });
-        
-        return { labels, counts: bins };
+        return { labels, counts: histogram?.counts || [] };
     }
 
     initializeNetworkView() {
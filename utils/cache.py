@@ -0,0 +1,244 @@
+import sys
+import time
+import threading
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import pandas as pd
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    估算缓存值占用的内存（字节）
+
+    DataFrame/Series 使用 memory_usage(deep=True)，容器类型递归累加，
+    其余对象使用 sys.getsizeof。
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class Cache:
+    """
+    TTL + LRU 内存缓存
+
+    条目按命名空间分组，超过过期时间的条目在访问时失效；条目数或估算内存
+    超出上限时淘汰最久未使用的条目。缓存值被所有调用方共享，取出后不要修改。
+    get_or_set 对同一个键的并发未命中只计算一次。
+    """
+
+    def __init__(self,
+                 enabled: bool = True,
+                 default_timeout: int = 300,
+                 max_entries: int = 1024,
+                 max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            enabled: 是否启用缓存，禁用时 get 总是未命中、set 不写入
+            default_timeout: 默认过期时间（秒），0 或 None 表示不过期
+            max_entries: 最大条目数
+            max_bytes: 估算内存上限（字节）
+        """
+        self.enabled = enabled
+        self.default_timeout = default_timeout
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (namespace, key) -> (value, expires_at, nbytes)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._compute_locks = {}  # (namespace, key) -> 正在计算该键的锁
+        self._lock = threading.Lock()
+
+    def configure(self, **options) -> None:
+        """更新配置（enabled / default_timeout / max_entries / max_bytes），并按新上限淘汰"""
+        with self._lock:
+            for name, value in options.items():
+                if not hasattr(self, name) or name.startswith('_'):
+                    raise ValueError(f"未知的缓存配置项: {name}")
+                setattr(self, name, value)
+            if not self.enabled:
+                self._entries.clear()
+                self._bytes = 0
+            self._evict()
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        """获取缓存值，未命中或已过期时返回 default"""
+        with self._lock:
+            if not self.enabled:
+                return default
+            value = self._lookup((namespace, key))
+            if value is _MISSING:
+                self._misses += 1
+                return default
+            self._hits += 1
+            return value
+
+    def set(self, namespace: str, key: Hashable, value: Any, timeout: Optional[int] = None) -> None:
+        """
+        写入缓存
+
+        Args:
+            namespace: 命名空间
+            key: 键（需可哈希）
+            value: 缓存值
+            timeout: 过期时间（秒），None 使用默认值，0 表示不过期
+        """
+        if not self.enabled:
+            return
+        timeout = self.default_timeout if timeout is None else timeout
+        expires_at = time.monotonic() + timeout if timeout else None
+        nbytes = estimate_size(value)
+        with self._lock:
+            if nbytes > self.max_bytes:
+                return
+            self._remove((namespace, key))
+            self._entries[(namespace, key)] = (value, expires_at, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def get_or_set(self,
+                   namespace: str,
+                   key: Hashable,
+                   compute_fn: Callable[[], Any],
+                   timeout: Optional[int] = None) -> Any:
+        """获取缓存值，未命中时调用 compute_fn 计算并写入（同一个键的并发未命中只计算一次）"""
+        value = self.get(namespace, key, _MISSING)
+        if value is not _MISSING or not self.enabled:
+            return compute_fn() if value is _MISSING else value
+
+        full_key = (namespace, key)
+        with self._lock:
+            compute_lock = self._compute_locks.setdefault(full_key, threading.Lock())
+
+        with compute_lock:
+            # 等待期间其他线程可能已经算好
+            with self._lock:
+                value = self._lookup(full_key)
+            if value is _MISSING:
+                try:
+                    value = compute_fn()
+                    self.set(namespace, key, value, timeout)
+                finally:
+                    with self._lock:
+                        self._compute_locks.pop(full_key, None)
+        return value
+
+    def delete(self, namespace: str, key: Hashable) -> None:
+        """删除单个条目"""
+        with self._lock:
+            self._remove((namespace, key))
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """
+        使一个命名空间（或全部）的缓存失效
+
+        Returns:
+            int: 删除的条目数
+        """
+        with self._lock:
+            keys = [k for k in self._entries if namespace is None or k[0] == namespace]
+            for k in keys:
+                self._remove(k)
+            return len(keys)
+
+    def stats(self) -> Dict:
+        """命中/未命中/淘汰/过期次数、内存占用与各命名空间条目数"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            namespaces = {}
+            for namespace, _ in self._entries:
+                namespaces[namespace] = namespaces.get(namespace, 0) + 1
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'namespaces': namespaces
+            }
+
+    def _lookup(self, full_key) -> Any:
+        """取出未过期的条目并标记为最近使用，不存在时返回 _MISSING（需持有锁）"""
+        entry = self._entries.get(full_key)
+        if entry is None:
+            return _MISSING
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            self._remove(full_key)
+            self._expirations += 1
+            return _MISSING
+        self._entries.move_to_end(full_key)
+        return entry[0]
+
+    def _remove(self, full_key) -> None:
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _evict(self) -> None:
+        """按LRU淘汰直到满足条目数和内存上限（需持有锁）"""
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self._evictions += 1
+
+
+# 进程级共享缓存
+cache = Cache()
+
+
+def cached(namespace: str, timeout: Optional[int] = None, version: Optional[Callable[[Any], Hashable]] = None):
+    """
+    函数结果缓存装饰器
+
+    以 (函数名, 位置参数, 关键字参数[, 数据版本]) 为键；参数不可哈希时直接调用不缓存。
+    用于实例方法时 self 也是键的一部分（按对象身份区分）。
+
+    Args:
+        namespace: 命名空间，可通过 cache.invalidate(namespace) 整体失效
+        timeout: 过期时间（秒），None 使用 CACHE_TIMEOUT
+        version: 以第一个参数（实例方法的 self）调用、返回当前数据版本的函数；
+                 版本加入键中，数据变化后旧条目不再命中，等待 LRU/过期淘汰
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            if version is not None:
+                key += (version(args[0]),)
+            try:
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            return cache.get_or_set(namespace, key, lambda: func(*args, **kwargs), timeout)
+        wrapper.invalidate = lambda: cache.invalidate(namespace)
+        return wrapper
+    return decorator
+
+
+def init_cache(app) -> Cache:
+    """根据应用配置（CACHE_ENABLED / CACHE_TIMEOUT / CACHE_MAX_ENTRIES / CACHE_MAX_BYTES）配置共享缓存"""
+    cache.configure(
+        enabled=app.config.get('CACHE_ENABLED', True),
+        default_timeout=app.config.get('CACHE_TIMEOUT', 300),
+        max_entries=app.config.get('CACHE_MAX_ENTRIES', cache.max_entries),
+        max_bytes=app.config.get('CACHE_MAX_BYTES', cache.max_bytes)
+    )
+    return cache
@@ -73,3 +73,28 @@ class Paginator:
         }
         
         return paginated_df, pagination_info
+    
+    @staticmethod
+    def paginate_indices(indices, page: int = 1, page_size: int = 20) -> Tuple:
+        """
+        对行号序列进行分页（配合预计算排序使用，只取当前页的行号）
+        
+        Returns:
+            (当前页的行号, 分页信息)
+        """
+        total = len(indices)
+        total_pages = math.ceil(total / page_size)
+        
+        start = (page - 1) * page_size
+        end = start + page_size
+        
+        pagination_info = {
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'total_pages': total_pages,
+            'has_prev': page > 1,
+            'has_next': page < total_pages
+        }
+        
+        return indices[start:end], pagination_info
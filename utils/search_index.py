@@ -0,0 +1,140 @@
+import bisect
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# 文本末尾的填充字符，使长度小于 n 的子串也是某个 n-gram 的前缀
+_PAD = '\x00'
+
+
+def normalize_text(value) -> str:
+    """搜索用的规范化文本（小写，缺失值为空串）"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    return str(value).strip().lower()
+
+
+class NGramIndex:
+    """
+    n-gram 倒排索引（默认 trigram）
+
+    对 DataFrame 的若干文本列建立 n-gram -> 行号的倒排表，子串查询先对查询串的
+    n-gram 求交得到候选行，再在候选行上校验，不再逐行扫描全部文本。
+    查询为不区分大小写的字面子串匹配；短于 n 的查询通过 n-gram 前缀查找。
+    """
+
+    def __init__(self, df: pd.DataFrame, fields: Iterable[str], n: int = 3):
+        """
+        Args:
+            df: 要索引的数据（行号与 df 的位置一致）
+            fields: 参与搜索的列，不存在的列被忽略
+            n: n-gram 长度
+        """
+        self.n = n
+        self.num_rows = len(df)
+        self.fields = [field for field in fields if field in df.columns]
+        self._texts = {field: [normalize_text(v) for v in df[field].tolist()] for field in self.fields}
+
+        postings = {}
+        for field in self.fields:
+            for row, text in enumerate(self._texts[field]):
+                if not text:
+                    continue
+                padded = text + _PAD * (n - 1)
+                for gram in {padded[i:i + n] for i in range(len(text))}:
+                    postings.setdefault((field, gram), set()).add(row)
+
+        self._postings = {key: np.fromiter(sorted(rows), dtype=np.int64, count=len(rows))
+                          for key, rows in postings.items()}
+        # 每列排序后的 n-gram 列表，用于短查询的前缀查找
+        self._grams = {field: sorted(gram for f, gram in self._postings if f == field) for field in self.fields}
+
+    def __len__(self):
+        return self.num_rows
+
+    def _field_candidates(self, field: str, query: str) -> np.ndarray:
+        """单列中可能包含 query 的行号"""
+        n = self.n
+        if len(query) >= n:
+            result = None
+            for gram in {query[i:i + n] for i in range(len(query) - n + 1)}:
+                rows = self._postings.get((field, gram))
+                if rows is None:
+                    return np.empty(0, dtype=np.int64)
+                result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+                if len(result) == 0:
+                    break
+            return result
+
+        grams = self._grams[field]
+        start = bisect.bisect_left(grams, query)
+        matched = []
+        for gram in grams[start:]:
+            if not gram.startswith(query):
+                break
+            matched.append(self._postings[(field, gram)])
+        if not matched:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(matched))
+
+    def search(self, query: str, fields: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        子串搜索并按相关性打分
+
+        得分：完全匹配 3，前缀匹配 2，其他子串匹配 1（取各列最高分）。
+
+        Args:
+            query: 查询串
+            fields: 限定搜索的列，默认为全部索引列
+
+        Returns:
+            (行号, 得分)：按行号升序
+        """
+        query = normalize_text(query)
+        fields = [field for field in (fields or self.fields) if field in self._texts]
+        scores = {}
+        if not query:
+            return np.arange(self.num_rows), np.ones(self.num_rows, dtype=np.int8)
+
+        for field in fields:
+            texts = self._texts[field]
+            for row in self._field_candidates(field, query).tolist():
+                text = texts[row]
+                if text == query:
+                    score = 3
+                elif text.startswith(query):
+                    score = 2
+                elif query in text:
+                    score = 1
+                else:
+                    continue
+                if score > scores.get(row, 0):
+                    scores[row] = score
+
+        rows = np.fromiter(sorted(scores), dtype=np.int64, count=len(scores))
+        return rows, np.fromiter((scores[row] for row in rows.tolist()), dtype=np.int8, count=len(rows))
+
+    def mask(self, query: str, fields: Optional[Iterable[str]] = None) -> np.ndarray:
+        """匹配行的布尔掩码（长度等于行数）"""
+        rows, _ = self.search(query, fields)
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def ranked(self, query: str, fields: Optional[Iterable[str]] = None, order: Optional[np.ndarray] = None) -> List[int]:
+        """
+        按相关性排序的匹配行号，同分时按 order 中的先后（默认行号）排列
+
+        Args:
+            query: 查询串
+            fields: 限定搜索的列
+            order: 作为次序依据的行号排列（如预计算的排序索引）
+        """
+        rows, scores = self.search(query, fields)
+        if order is None:
+            tiebreak = rows
+        else:
+            position = np.empty(self.num_rows, dtype=np.int64)
+            position[np.asarray(order)] = np.arange(len(order))
+            tiebreak = position[rows]
+        return rows[np.lexsort((tiebreak, -scores))].tolist()
@@ -0,0 +1,54 @@
+import threading
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+
+
+class SortIndex:
+    """
+    DataFrame 的预计算排序索引
+
+    为每个可排序列保存升序/降序两种行号排列（稳定排序，缺失值总在最后，
+    与 sort_values(na_position='last') 一致）。未过滤时分页只需切片排列；
+    过滤时用布尔掩码按排列顺序筛选，无需重新排序。
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[Iterable[str]] = None):
+        """
+        Args:
+            df: 要排序的数据（建立索引后不应再修改）
+            columns: 预先计算排列的列，其余列在首次使用时计算
+        """
+        self._df = df
+        self._orders = {}
+        self._lock = threading.Lock()
+        for column in columns or []:
+            if column in df.columns:
+                self.order(column, True)
+                self.order(column, False)
+
+    def __len__(self):
+        return len(self._df)
+
+    def order(self, column: str, ascending: bool = True, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        按列排序后的行号
+
+        Args:
+            column: 排序列
+            ascending: 是否升序
+            mask: 可选的布尔掩码（长度等于行数），只返回掩码为 True 的行
+
+        Returns:
+            np.ndarray: 行号（可直接用于 iloc）
+        """
+        key = (column, bool(ascending))
+        with self._lock:
+            order = self._orders.get(key)
+            if order is None:
+                values = self._df[column].reset_index(drop=True)
+                order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+                self._orders[key] = order
+        if mask is None:
+            return order
+        return order[np.asarray(mask, dtype=bool)[order]]
@@ -1,13 +1,8 @@
 from flask import Blueprint, render_template, request, jsonify, abort
-from services.compound_service import CompoundService
-from services.target_service import TargetService
+from services.container import compound_service, target_service
 
 compounds_view_bp = Blueprint('compounds_view', __name__, url_prefix='/compounds')
 
-# Initialize services
-compound_service = CompoundService()
-target_service = TargetService()
-
 @compounds_view_bp.route('/')
 def compounds_list():
     """Compounds list page"""
@@ -137,12 +132,9 @@ def compounds_api_list():
             sort_order=order_dir
         )
         
-        # Get total count without filters for recordsTotal
-        total_without_filters = compound_service.count(filters=None, search=None)
-        
-        # Current result total is the filtered total
+        # Filtered and unfiltered totals come from the same list call
         filtered_total = result['pagination']['total']
-        records_total = total_without_filters
+        records_total = result['records_total']
         
         # Format return data for DataTables
         return jsonify({
@@ -1,26 +1,14 @@
 from flask import Blueprint, render_template, jsonify, request
-from services.compound_service import CompoundService
-from services.target_service import TargetService
+from services.container import statistics_service
 
 pages_bp = Blueprint('pages', __name__)
 
-# 实例化服务
-compound_service = CompoundService()
-target_service = TargetService()
-
 @pages_bp.route('/')
 def index():
     """首页"""
     try:
-        # 获取统计数据
-        compound_stats = compound_service.get_statistics()
-        target_stats = target_service.get_target_statistics()
-        
-        # 合并统计数据
-        stats = {
-            'compounds': compound_stats,
-            'targets': target_stats
-        }
+        # 获取统计数据（按数据版本预先计算的快照）
+        stats = statistics_service.get_snapshot()
         
         return render_template('pages/index.html', stats=stats)
     except Exception as e:
@@ -50,34 +38,8 @@ def about_page():
 def statistics_page():
     """统计分析页面"""
     try:
-        # 获取详细统计数据
-        compound_stats = compound_service.get_statistics()
-        target_stats = target_service.get_target_statistics()
-        
-        # 合并统计数据
-        stats = {
-            'compounds': compound_stats,
-            'targets': target_stats
-        }
-        # 转换numpy类型为Python原生类型（新增这部分）
-        def convert_numpy_types(obj):
-            if isinstance(obj, dict):
-                return {k: convert_numpy_types(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_numpy_types(item) for item in obj]
-            elif hasattr(obj, 'item'):  # numpy类型
-                return obj.item()
-            else:
-                return obj
-        # 应用转换
-        compound_stats = convert_numpy_types(compound_stats)
-        target_stats = convert_numpy_types(target_stats)
-        
-        # 合并统计数据
-        stats = {
-            'compounds': compound_stats,
-            'targets': target_stats
-        }
+        # 获取详细统计数据（快照中的数值已转换为Python原生类型）
+        stats = statistics_service.get_snapshot()
         
         return render_template('pages/statistics.html', stats=stats)
     except Exception as e:
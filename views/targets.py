@@ -1,13 +1,8 @@
 from flask import Blueprint, render_template, request, abort, jsonify
-from services.target_service import TargetService
-from services.compound_service import CompoundService
+from services.container import target_service, compound_service
 
 targets_view_bp = Blueprint('targets_view', __name__, url_prefix='/targets')
 
-# Initialize services
-target_service = TargetService()
-compound_service = CompoundService()
-
 @targets_view_bp.route('/')
 def targets_list():
     """Targets list page"""
@@ -80,12 +75,9 @@ def targets_api_list():
             sort_order=order_dir
         )
         
-        # Get total count without filters for recordsTotal
-        total_without_filters = target_service.get_targets_count(search=None)
-        
-        # Current result total is the filtered total
+        # Filtered and unfiltered totals come from the same list call
         filtered_total = result['pagination']['total']
-        records_total = total_without_filters
+        records_total = result['records_total']
         
         # Format return data for DataTables
         return jsonify({